@@ -0,0 +1,135 @@
+"""
+Benchmark arsip dingin kits-history (lambda/history_archive.py): laporan dari file Parquet.
+
+Membuat --orders pesanan sintetis (--days hari ke belakang) di folder sementara persis
+seperti archiveCompactor (satu file per tanggal, lewat write_partition), lalu mengukur
+query laporan yang umum: revenue per hari sebulan, riwayat satu userId, filter
+paymentMethod, dan revenue seluruh arsip. Untuk pembanding dilaporkan juga ukuran data
+di DynamoDB (perkiraan dari JSON) dan RCU yang dibutuhkan Scan penuh untuk laporan yang sama.
+
+Butuh: pip install pyarrow
+
+Jalankan dari root repo:
+    python benchmarks/bench_archive.py [--orders 1000000] [--days 365] [--repeat 3] [--keep DIR]
+"""
+import argparse
+import datetime
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from decimal import Decimal
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'lambda'))
+
+# Satu Scan membaca 4 KB per 0.5 RCU (eventually consistent)
+SCAN_BYTES_PER_RCU = 8 * 1024
+PAYMENT_METHODS = ['transfer', 'cod', 'ewallet', 'kartu_kredit']
+STATUSES = ['PENDING', 'PAID', 'SHIPPED', 'DELIVERED', 'CANCELLED']
+
+
+def make_orders(count, days, users, rng):
+    """ Pesanan sintetis berbentuk record kits-history (order_model.archive_record) """
+    today = datetime.datetime(2026, 10, 1)
+    for i in range(count):
+        lines = [{'productId': f'prod-{rng.randrange(10000):06d}', 'name': 'Produk', 'price': Decimal(rng.randrange(5000, 500000, 500)),
+                  'quantity': Decimal(rng.randint(1, 3)), 'imageUrl': 'https://cdn.example.com/img/1.jpg'}
+                 for _ in range(rng.randint(1, 4))]
+        created = today - datetime.timedelta(seconds=rng.randrange(days * 86400))
+        yield {
+            'orderId': f'order-{i:08d}',
+            'userId': f'user-{rng.randrange(users):06d}',
+            'items': lines,
+            'totalPrice': sum(line['price'] * line['quantity'] for line in lines),
+            'createdAt': created.isoformat(),
+            'status': rng.choice(STATUSES),
+            'customerName': 'Pelanggan',
+            'shippingAddress': 'Jl. Contoh No. 1, Jakarta',
+            'paymentMethod': rng.choice(PAYMENT_METHODS),
+        }
+
+
+def timed(fn, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--orders', type=int, default=1000000)
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--users', type=int, default=50000)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--keep', help='simpan arsip di folder ini (default: folder sementara, dihapus)')
+    parser.add_argument('--output', help='simpan hasil sebagai JSON')
+    args = parser.parse_args()
+
+    directory = args.keep or tempfile.mkdtemp(prefix='bench-archive-')
+    # Environment harus lengkap SEBELUM history_archive di-import
+    os.environ['ARCHIVE_URI'] = directory
+    import history_archive
+    from api_response import dumps
+    history_archive.require_pyarrow()
+
+    try:
+        rng = random.Random(args.seed)
+        by_date = {}
+        dynamodb_bytes = 0
+        for order in make_orders(args.orders, args.days, args.users, rng):
+            dynamodb_bytes += len(dumps(order))
+            by_date.setdefault(history_archive.partition_date(order), []).append(order)
+        print(f'{args.orders} pesanan, {len(by_date)} tanggal, {args.users} pengguna')
+
+        start = time.perf_counter()
+        archive_bytes = 0
+        for date, orders in by_date.items():
+            archive_bytes += history_archive.write_partition(date, orders)[1]
+        write_seconds = time.perf_counter() - start
+        sample_user = by_date[max(by_date)][0]['userId']
+        del by_date
+
+        print(f'Tulis arsip: {write_seconds:.1f} s ({args.orders / write_seconds:,.0f} pesanan/s)')
+        print(f'Ukuran: DynamoDB ~{dynamodb_bytes / 1e6:,.1f} MB (JSON), Parquet {archive_bytes / 1e6:,.1f} MB '
+              f'({dynamodb_bytes / archive_bytes:.1f}x lebih kecil)')
+        print(f'Scan penuh DynamoDB untuk laporan yang sama: ~{dynamodb_bytes / SCAN_BYTES_PER_RCU:,.0f} RCU per laporan\n')
+
+        last_date = datetime.date(2026, 10, 1)
+        month_start = (last_date - datetime.timedelta(days=30)).isoformat()
+        queries = [
+            ('revenue per hari, 30 hari', lambda: history_archive.revenue_report(month_start, last_date.isoformat())),
+            ('revenue per metode, semua', lambda: history_archive.revenue_report(group_by=['paymentMethod'])),
+            ('riwayat 1 userId, semua', lambda: history_archive.query(user_id=sample_user, columns=['orderId', 'createdAt', 'totalPrice', 'items'])),
+            ('cod 30 hari, tanpa items', lambda: history_archive.query(month_start, last_date.isoformat(), payment_method='cod',
+                                                                         columns=['orderId', 'userId', 'totalPrice'])),
+            ('semua kolom, 30 hari', lambda: history_archive.query(month_start, last_date.isoformat())),
+        ]
+        print(f'{"query":<28} {"ms":>9} {"hasil":>9}')
+        results = []
+        for label, fn in queries:
+            seconds, result = timed(fn, args.repeat)
+            rows = len(result) if isinstance(result, list) else result.num_rows
+            results.append({'query': label, 'ms': round(seconds * 1000, 1), 'rows': rows})
+            print(f'{label:<28} {seconds * 1000:>9.1f} {rows:>9}')
+
+        if args.output:
+            with open(args.output, 'w') as f:
+                json.dump({'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'), 'params': vars(args),
+                           'write_seconds': round(write_seconds, 2), 'dynamodb_bytes': dynamodb_bytes,
+                           'archive_bytes': archive_bytes, 'results': results}, f, indent=2)
+            print(f'Hasil disimpan ke {args.output}')
+    finally:
+        if not args.keep:
+            shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,194 @@
+"""
+Benchmark Checkout: arsip ditulis langsung (PutItem) vs lewat antrian (SQS + archiveConsumer).
+
+Menjalankan --requests checkout dengan --concurrency thread dua kali terhadap moto server
+(DynamoDB + SQS; atau DynamoDB Local / ElasticMQ lewat --dynamodb-url / --sqs-url):
+  1. langsung : Checkout menulis put_item ke kits-history (ARCHIVE_QUEUE_URL kosong)
+  2. antrian  : Checkout hanya SendMessage; lalu antrian dikuras seperti event source
+                mapping (ReceiveMessage 10 pesan -> consumer_handler -> DeleteMessageBatch
+                untuk pesan yang berhasil)
+
+Yang dilaporkan: p50/p99 latensi checkout (yang dirasakan pembeli), throughput consumer,
+dan jumlah request tulis DynamoDB per record arsip. Semua orderId dicek ada di tabel.
+
+Catatan: moto memproses request satu per satu dan SQS-nya jauh lebih lambat dari SQS
+sungguhan, jadi latensi mode antrian di moto TIDAK representatif; ukur latensi dengan
+ElasticMQ + DynamoDB Local. Angka 'per arsip' (request tulis DynamoDB per record) tidak
+bergantung pada backend.
+
+Butuh: pip install boto3 "moto[server]"
+
+Jalankan dari root repo:
+    python benchmarks/bench_archive_queue.py [--requests 2000] [--concurrency 16]
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from bench_handlers import LAMBDA_DIR, DynamoDBRecorder, api_event, percentile
+
+sys.path.insert(0, LAMBDA_DIR)
+
+TABLE_NAME = 'bench-archive-history'
+QUEUE_NAME = 'bench-archive-queue'
+
+
+def checkout_body(i):
+    return {'orderId': str(uuid.uuid4()), 'userId': f'user-{i % 500:05d}', 'totalPrice': 45000,
+            'createdAt': '2026-10-18T10:00:00', 'paymentMethod': 'transfer',
+            'items': [{'productId': f'prod-{j:06d}', 'name': 'Produk', 'price': 15000, 'quantity': 1} for j in range(3)]}
+
+
+def run_checkouts(checkout, args):
+    """ Kembalikan (latensi ms terurut, orderId yang berhasil, detik total) """
+    bodies = [checkout_body(i) for i in range(args.requests)]
+    latencies = [0.0] * args.requests
+    statuses = [0] * args.requests
+
+    def call(i):
+        start = time.perf_counter()
+        response = checkout.checkout_handler(api_event('POST', '/checkout', body=bodies[i]), None)
+        latencies[i] = (time.perf_counter() - start) * 1000
+        statuses[i] = response['statusCode']
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        list(executor.map(call, range(args.requests)))
+    elapsed = time.perf_counter() - started
+    ok = [body['orderId'] for body, status in zip(bodies, statuses) if status in (201, 202)]
+    return sorted(latencies), ok, elapsed
+
+
+def drain(sqs, queue_url, consumer, concurrency):
+    """ Kuras antrian seperti event source mapping; kembalikan (batch, detik) """
+    def poll(_):
+        batches = 0
+        while True:
+            messages = sqs.receive_message(QueueUrl=queue_url, MaxNumberOfMessages=10,
+                                           WaitTimeSeconds=0).get('Messages', [])
+            if not messages:
+                return batches
+            event = {'Records': [{'messageId': m['MessageId'], 'body': m['Body'], 'eventSource': 'aws:sqs'}
+                                 for m in messages]}
+            failed = {f['itemIdentifier'] for f in consumer.consumer_handler(event, None)['batchItemFailures']}
+            done = [{'Id': str(n), 'ReceiptHandle': m['ReceiptHandle']}
+                    for n, m in enumerate(messages) if m['MessageId'] not in failed]
+            if done:
+                sqs.delete_message_batch(QueueUrl=queue_url, Entries=done)
+            batches += 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        batches = sum(executor.map(poll, range(concurrency)))
+    return batches, time.perf_counter() - started
+
+
+def missing_orders(ddb, order_ids):
+    keys = [{'orderId': order_id} for order_id in order_ids]
+    found = {item['orderId'] for item in ddb.batch_get_items(TABLE_NAME, keys, projection=['orderId'])}
+    return len(set(order_ids) - found)
+
+
+def write_requests(recorder):
+    return recorder.calls['PutItem'] + recorder.calls['BatchWriteItem']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--consumers', type=int, default=4, help='consumer paralel (seperti concurrency Lambda)')
+    parser.add_argument('--dynamodb-url', help='DynamoDB Local; jika kosong, moto server dijalankan otomatis')
+    parser.add_argument('--sqs-url', help='ElasticMQ; jika kosong, moto server dijalankan otomatis')
+    parser.add_argument('--output', help='simpan hasil sebagai JSON')
+    args = parser.parse_args()
+
+    server = None
+    if not (args.dynamodb_url and args.sqs_url):
+        from moto.server import ThreadedMotoServer
+        logging.getLogger('werkzeug').setLevel(logging.ERROR)
+        server = ThreadedMotoServer(port=0, verbose=False)
+        server.start()
+        host, port = server.get_host_and_port()
+        moto_url = f'http://{host}:{port}'
+
+    # Environment harus lengkap SEBELUM modul lambda di-import (dibaca saat import)
+    os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+    os.environ.setdefault('AWS_ACCESS_KEY_ID', 'bench')
+    os.environ.setdefault('AWS_SECRET_ACCESS_KEY', 'bench')
+    os.environ['DYNAMODB_ENDPOINT_URL'] = args.dynamodb_url or moto_url
+    os.environ['SQS_ENDPOINT_URL'] = args.sqs_url or moto_url
+    os.environ.setdefault('METRICS_SAMPLE_RATE', '0')
+    os.environ.setdefault('DDB_MAX_POOL_CONNECTIONS', str(args.concurrency))
+    os.environ['HISTORY_TABLE'] = TABLE_NAME
+
+    try:
+        import ddb
+        import archive_queue
+        import archiveConsumer
+        import Checkout
+        client = ddb.get_client()
+        if TABLE_NAME not in client.list_tables()['TableNames']:
+            client.create_table(TableName=TABLE_NAME, BillingMode='PAY_PER_REQUEST',
+                                KeySchema=[{'AttributeName': 'orderId', 'KeyType': 'HASH'}],
+                                AttributeDefinitions=[{'AttributeName': 'orderId', 'AttributeType': 'S'}])
+        # Client terpisah untuk consumer: client archive_queue memakai timeout pendek jalur checkout
+        import boto3
+        sqs = boto3.client('sqs', endpoint_url=os.environ['SQS_ENDPOINT_URL'])
+        queue_url = sqs.create_queue(QueueName=QUEUE_NAME)['QueueUrl']
+        recorder = DynamoDBRecorder()
+        recorder.install(client)
+
+        results = {}
+        print(f'{args.requests} checkout, concurrency {args.concurrency}\n')
+        print(f'{"mode":<8} {"p50 ms":>8} {"p99 ms":>8} {"rps":>8} {"tulis DDB":>10} {"per arsip":>10} {"hilang":>7}')
+
+        # 1. Langsung: put_item di jalur request
+        archive_queue.ARCHIVE_QUEUE_URL = None
+        recorder.reset()
+        latencies, ok, elapsed = run_checkouts(Checkout, args)
+        writes = write_requests(recorder)
+        results['direct'] = {'p50_ms': round(percentile(latencies, 50), 2), 'p99_ms': round(percentile(latencies, 99), 2),
+                             'rps': round(args.requests / elapsed, 1), 'ddb_writes': writes,
+                             'writes_per_record': round(writes / max(1, len(ok)), 3),
+                             'missing': missing_orders(ddb, ok)}
+
+        # 2. Antrian: SendMessage di jalur request, BatchWriteItem di consumer
+        archive_queue.ARCHIVE_QUEUE_URL = queue_url
+        recorder.reset()
+        latencies, ok, elapsed = run_checkouts(Checkout, args)
+        batches, drain_seconds = drain(sqs, queue_url, archiveConsumer, args.consumers)
+        writes = write_requests(recorder)
+        results['queued'] = {'p50_ms': round(percentile(latencies, 50), 2), 'p99_ms': round(percentile(latencies, 99), 2),
+                             'rps': round(args.requests / elapsed, 1), 'ddb_writes': writes,
+                             'writes_per_record': round(writes / max(1, len(ok)), 3),
+                             'missing': missing_orders(ddb, ok),
+                             'consumer_batches': batches,
+                             'consumer_records_per_s': round(len(ok) / drain_seconds, 1)}
+
+        for mode, row in results.items():
+            print(f'{mode:<8} {row["p50_ms"]:>8} {row["p99_ms"]:>8} {row["rps"]:>8} {row["ddb_writes"]:>10} '
+                  f'{row["writes_per_record"]:>10} {row["missing"]:>7}')
+        queued = results['queued']
+        print(f'\nConsumer: {queued["consumer_batches"]} batch, {queued["consumer_records_per_s"]} arsip/detik '
+              f'({args.consumers} consumer)')
+
+        if args.output:
+            with open(args.output, 'w') as f:
+                json.dump({'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'), 'params': vars(args),
+                           'results': results}, f, indent=2)
+            print(f'Hasil disimpan ke {args.output}')
+        if any(row['missing'] for row in results.values()):
+            sys.exit('Ada arsip yang hilang')
+    finally:
+        if server:
+            server.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,181 @@
+"""
+Benchmark cold start handler Lambda: waktu import dan latensi invocation pertama.
+
+Setiap pengukuran berjalan di proses Python BARU (seperti container Lambda baru):
+  1. `python -X importtime -c "import <handler>"` -> total waktu import modul handler.
+  2. import + invocation pertama + invocation kedua terhadap DynamoDB lokal
+     (moto server otomatis, atau DynamoDB Local lewat --endpoint-url).
+  3. Pembanding: biaya membuat boto3.resource('dynamodb').Table vs client low-level ddb.
+
+Butuh: pip install boto3 "moto[server]"   (moto tidak perlu jika memakai --endpoint-url)
+
+Jalankan dari root repo:
+    python benchmarks/bench_coldstart.py [--runs 5] [--output coldstart.json]
+    python benchmarks/bench_coldstart.py --endpoint-url http://localhost:8000
+"""
+import argparse
+import json
+import logging
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+LAMBDA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'lambda')
+
+TABLES = {
+    'PRODUCTS_TABLE': ('bench-products', 'productId'),
+    'ORDERS_TABLE': ('bench-orders', 'orderId'),
+    'CART_TABLE': ('bench-cart', 'userId'),
+}
+
+# (modul, fungsi handler, event API Gateway)
+HANDLERS = [
+    ('getProduct', 'get_prod_handler', {'httpMethod': 'GET', 'pathParameters': {'productId': 'prod-1'}}),
+    ('getOrder', 'get_handler', {'httpMethod': 'GET', 'pathParameters': {'orderId': 'order-1'}}),
+    ('getCart', 'get_handler', {'httpMethod': 'GET', 'pathParameters': {'userId': 'user-1'}}),
+    ('createProduct', 'create_Prod_handler',
+     {'httpMethod': 'POST', 'body': json.dumps({'name': 'Bench', 'price': 1000})}),
+    ('updateOrder', 'Handler',
+     {'httpMethod': 'PUT', 'pathParameters': {'orderId': 'order-1'}, 'body': json.dumps({'status': 'PENDING'})}),
+]
+
+# Script yang dijalankan di proses anak (cold start sungguhan)
+_CHILD_INVOKE = """
+import json, sys, time
+t0 = time.perf_counter()
+module = __import__(sys.argv[1])
+t1 = time.perf_counter()
+handler = getattr(module, sys.argv[2])
+event = json.loads(sys.argv[3])
+handler(dict(event), None)
+t2 = time.perf_counter()
+handler(dict(event), None)
+t3 = time.perf_counter()
+print(json.dumps({'import_ms': (t1 - t0) * 1000, 'first_ms': (t2 - t1) * 1000, 'warm_ms': (t3 - t2) * 1000}))
+"""
+
+_CHILD_RESOURCE = """
+import json, time
+t0 = time.perf_counter()
+import boto3
+t1 = time.perf_counter()
+table = boto3.resource('dynamodb').Table('bench-products')
+table.get_item(Key={'productId': 'prod-1'})
+t2 = time.perf_counter()
+print(json.dumps({'import_ms': (t1 - t0) * 1000, 'first_ms': (t2 - t1) * 1000}))
+"""
+
+_CHILD_CLIENT = """
+import json, time
+t0 = time.perf_counter()
+import ddb
+t1 = time.perf_counter()
+ddb.Table('bench-products').get_item(Key={'productId': 'prod-1'})
+t2 = time.perf_counter()
+print(json.dumps({'import_ms': (t1 - t0) * 1000, 'first_ms': (t2 - t1) * 1000}))
+"""
+
+
+def child_env(endpoint_url):
+    env = dict(os.environ)
+    env.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+    env.setdefault('AWS_ACCESS_KEY_ID', 'bench')
+    env.setdefault('AWS_SECRET_ACCESS_KEY', 'bench')
+    env['AWS_ENDPOINT_URL_DYNAMODB'] = endpoint_url  # dipakai boto3.resource di pembanding
+    env['DYNAMODB_ENDPOINT_URL'] = endpoint_url      # dipakai ddb.get_client()
+    env['PYTHONPATH'] = LAMBDA_DIR
+    for var, (name, _) in TABLES.items():
+        env[var] = name
+    return env
+
+
+def run_child(code, args, env):
+    output = subprocess.run([sys.executable, '-c', code] + args, cwd=LAMBDA_DIR, env=env,
+                            capture_output=True, text=True, check=True)
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def import_time_ms(module, env):
+    """ Total waktu import (cumulative) dari -X importtime, dalam milidetik """
+    output = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            cwd=LAMBDA_DIR, env=env, capture_output=True, text=True, check=True)
+    pattern = re.compile(r'import time:\s+\d+ \|\s+(\d+) \| ' + re.escape(module) + r'$')
+    for line in output.stderr.splitlines():
+        match = pattern.search(line)
+        if match:
+            return int(match.group(1)) / 1000
+    raise RuntimeError(f'Tidak menemukan {module} di output -X importtime')
+
+
+def seed(endpoint_url):
+    import boto3
+    client = boto3.client('dynamodb', endpoint_url=endpoint_url, region_name='us-east-1',
+                          aws_access_key_id='bench', aws_secret_access_key='bench')
+    existing = set(client.list_tables()['TableNames'])
+    for name, key in TABLES.values():
+        if name not in existing:
+            client.create_table(TableName=name, BillingMode='PAY_PER_REQUEST',
+                                KeySchema=[{'AttributeName': key, 'KeyType': 'HASH'}],
+                                AttributeDefinitions=[{'AttributeName': key, 'AttributeType': 'S'}])
+    client.put_item(TableName='bench-products', Item={
+        'productId': {'S': 'prod-1'}, 'name': {'S': 'Produk'}, 'price': {'N': '15000'}})
+    client.put_item(TableName='bench-orders', Item={
+        'orderId': {'S': 'order-1'}, 'status': {'S': 'PENDING'}, 'totalPrice': {'N': '15000'}})
+    client.put_item(TableName='bench-cart', Item={'userId': {'S': 'user-1'}})
+
+
+def summarize(samples):
+    return {key: round(statistics.median(s[key] for s in samples), 2) for key in samples[0]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5, help='jumlah proses baru per pengukuran')
+    parser.add_argument('--endpoint-url', help='DynamoDB Local; jika kosong, moto server dijalankan otomatis')
+    parser.add_argument('--output', help='simpan hasil sebagai JSON')
+    args = parser.parse_args()
+
+    server = None
+    endpoint_url = args.endpoint_url
+    if not endpoint_url:
+        from moto.server import ThreadedMotoServer
+        logging.getLogger('werkzeug').setLevel(logging.ERROR)
+        server = ThreadedMotoServer(port=0, verbose=False)
+        server.start()
+        host, port = server.get_host_and_port()
+        endpoint_url = f'http://{host}:{port}'
+
+    try:
+        seed(endpoint_url)
+        env = child_env(endpoint_url)
+        results = {'handlers': {}, 'dynamodb_init': {}}
+
+        print(f'{"handler":<16} {"importtime":>11} {"import":>9} {"1st call":>9} {"warm":>8}   (median ms, {args.runs} run)')
+        for module, function, event in HANDLERS:
+            imports = [import_time_ms(module, env) for _ in range(args.runs)]
+            invokes = [run_child(_CHILD_INVOKE, [module, function, json.dumps(event)], env) for _ in range(args.runs)]
+            row = dict(summarize(invokes), importtime_ms=round(statistics.median(imports), 2))
+            results['handlers'][module] = row
+            print(f'{module:<16} {row["importtime_ms"]:>11} {row["import_ms"]:>9} {row["first_ms"]:>9} {row["warm_ms"]:>8}')
+
+        print('\nInisialisasi DynamoDB + get_item pertama (median ms)')
+        for label, code in (('boto3.resource', _CHILD_RESOURCE), ('ddb client', _CHILD_CLIENT)):
+            row = summarize([run_child(code, [], env) for _ in range(args.runs)])
+            results['dynamodb_init'][label] = row
+            print(f'  {label:<16} import {row["import_ms"]:>8}   init+get_item {row["first_ms"]:>8}')
+
+        if args.output:
+            results['timestamp'] = time.strftime('%Y-%m-%dT%H:%M:%S')
+            with open(args.output, 'w') as f:
+                json.dump(results, f, indent=2)
+            print(f'\nHasil disimpan ke {args.output}')
+    finally:
+        if server:
+            server.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""
+Benchmark kompresi respon: level gzip/brotli vs ukuran body vs waktu CPU.
+
+Lambda membagi CPU sebanding dengan memori (1769 MB = 1 vCPU penuh), jadi
+fungsi 128 MB hanya mendapat ~7% vCPU. Waktu yang diukur di mesin ini (1 core)
+diskalakan ke --memory untuk memperkirakan biaya di Lambda, lalu dibandingkan
+dengan waktu transfer yang dihemat pada --bandwidth tertentu.
+
+brotli opsional (pip install brotli); jika tidak ada, hanya gzip yang diukur.
+
+Jalankan dari root repo:
+    python benchmarks/bench_compression.py [--items 2000] [--memory 128] [--bandwidth 10]
+"""
+import argparse
+import gzip
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'lambda'))
+
+from api_response import body_etag, dumps  # noqa: E402
+from bench_serializer import make_orders, make_products  # noqa: E402
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Memori Lambda yang setara dengan 1 vCPU penuh
+FULL_VCPU_MB = 1769
+
+
+def codecs():
+    for level in (1, 3, 5, 6, 9):
+        yield f'gzip -{level}', lambda data, level=level: gzip.compress(data, compresslevel=level, mtime=0)
+    if brotli is not None:
+        for quality in (1, 4, 5, 6, 11):
+            yield f'br q{quality}', lambda data, quality=quality: brotli.compress(data, quality=quality)
+
+
+def best_time(fn, repeat):
+    number = 3
+    return min(timeit.repeat(fn, number=number, repeat=repeat)) / number
+
+
+def bench(label, payload, args):
+    data = dumps(payload).encode('utf-8')
+    cpu_scale = FULL_VCPU_MB / args.memory
+    bytes_per_ms = args.bandwidth * 1e6 / 8 / 1000
+
+    etag_ms = best_time(lambda: body_etag(data), args.repeat) * 1000
+    print(f'\n{label}: {len(payload)} item, {len(data) / 1024:.0f} KB JSON '
+          f'(ETag blake2b: {etag_ms:.2f} ms, ~{etag_ms * cpu_scale:.1f} ms @ {args.memory} MB)')
+    print(f'  {"codec":<9} {"size KB":>8} {"ratio":>6} {"cpu ms":>8} {f"@{args.memory}MB":>9} '
+          f'{"transfer":>9} {"total":>8}')
+    baseline = len(data) / bytes_per_ms
+    print(f'  {"none":<9} {len(data) / 1024:>8.0f} {1:>6.1f} {0:>8.2f} {0:>9.1f} {baseline:>9.1f} {baseline:>8.1f}')
+    for name, fn in codecs():
+        size = len(fn(data))
+        cpu_ms = best_time(lambda: fn(data), args.repeat) * 1000
+        lambda_ms = cpu_ms * cpu_scale
+        transfer_ms = size / bytes_per_ms
+        print(f'  {name:<9} {size / 1024:>8.0f} {len(data) / size:>6.1f} {cpu_ms:>8.2f} {lambda_ms:>9.1f} '
+              f'{transfer_ms:>9.1f} {lambda_ms + transfer_ms:>8.1f}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--items', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--memory', type=int, default=128, help='memori Lambda (MB) untuk estimasi CPU')
+    parser.add_argument('--bandwidth', type=float, default=10, help='bandwidth klien (Mbit/s) untuk estimasi transfer')
+    args = parser.parse_args()
+
+    print(f'Estimasi @{args.memory}MB = waktu lokal x {FULL_VCPU_MB / args.memory:.1f} '
+          f'(bagian vCPU di Lambda); transfer pada {args.bandwidth:g} Mbit/s')
+    bench('Listing produk', make_products(args.items), args)
+    bench('Listing pesanan', make_orders(args.items), args)
+    if brotli is None:
+        print('\n(brotli tidak terpasang: hanya gzip yang diukur)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,416 @@
+"""
+Benchmark beban lokal untuk handler Lambda: latensi, throughput dan biaya DynamoDB per endpoint.
+
+Setiap handler dipanggil LANGSUNG di proses ini (seperti container Lambda yang warm)
+dengan event API Gateway buatan, terhadap DynamoDB lokal: moto server otomatis,
+atau DynamoDB Local lewat --endpoint-url. Data awal (skala penuh, --scale 1):
+10k produk, 100k pesanan (1000 pengguna), keranjang 200 produk.
+
+Per skenario dilaporkan: p50/p90/p99/max latensi, request per detik, jumlah panggilan
+DynamoDB per request (per operasi), ConsumedCapacity (ReturnConsumedCapacity=TOTAL
+disisipkan lewat event botocore; tidak semua operasi dilaporkan oleh moto), serta
+ukuran request/response. Hasil disimpan sebagai JSON agar bisa dibandingkan antar commit.
+
+--concurrency menjalankan beberapa invocation bersamaan di thread pool. Di Lambda
+setiap invocation mendapat container sendiri; di sini yang diuji adalah thread-safety
+dan perebutan DynamoDB, bukan skala Lambda (GIL membatasi CPU ke satu core).
+Untuk angka absolut dan concurrency tinggi, pakai DynamoDB Local: moto server jauh
+lebih lambat untuk Scan dan tidak aman untuk transaksi yang bersamaan.
+
+Butuh: pip install boto3 "moto[server]"   (moto tidak perlu jika memakai --endpoint-url)
+
+Jalankan dari root repo:
+    python benchmarks/bench_handlers.py [--scale 0.1] [--requests 200] [--concurrency 4]
+    python benchmarks/bench_handlers.py --output after.json --compare before.json
+    python benchmarks/bench_handlers.py --only orders. --only cart.
+    python benchmarks/bench_handlers.py --router     (semua skenario lewat router.handler)
+"""
+import argparse
+import importlib
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+LAMBDA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'lambda')
+sys.path.insert(0, LAMBDA_DIR)
+
+# Ukuran data pada --scale 1
+FULL_PRODUCTS = 10000
+FULL_ORDERS = 100000
+FULL_USERS = 1000
+CART_LINES = 200
+
+# Environment variable -> (nama tabel, partition key, GSI [(nama, pk, sk)])
+TABLES = {
+    'PRODUCTS_TABLE': ('bench-products', 'productId', [('syncBucket-syncVersion-index', 'syncBucket', 'syncVersion')]),
+    'ORDERS_TABLE': ('bench-orders', 'orderId', [('status-createdAt-index', 'status', 'createdAt'),
+                                                 ('userId-createdAt-index', 'userId', 'createdAt')]),
+    'CART_TABLE': ('bench-cart', 'userId', []),
+    'HISTORY_TABLE': ('bench-history', 'orderId', []),
+    'STATS_TABLE': ('bench-stats', 'scope', []),
+    'SEARCH_INDEX_TABLE': ('bench-search-index', 'indexId', []),
+    'INVENTORY_TABLE': ('bench-inventory', 'shardId', []),
+}
+
+# Atribut key bertipe Number (selain itu String)
+NUMBER_ATTRIBUTES = {'syncVersion'}
+
+STATUS_WEIGHTS = {'PENDING': 30, 'PAID': 30, 'SHIPPED': 20, 'DELIVERED': 15, 'CANCELLED': 5}
+
+# Operasi DynamoDB yang mendukung ReturnConsumedCapacity
+_CAPACITY_OPERATIONS = {'GetItem', 'PutItem', 'UpdateItem', 'DeleteItem', 'Query', 'Scan',
+                        'BatchGetItem', 'BatchWriteItem', 'TransactWriteItems', 'TransactGetItems'}
+
+
+class DynamoDBRecorder:
+    """ Hitung panggilan DynamoDB, retry dan ConsumedCapacity lewat event botocore """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.calls = Counter()
+            self.capacity = 0.0
+            self.retries = 0
+
+    def install(self, client):
+        client.meta.events.register('provide-client-params.dynamodb', self._add_capacity_param)
+        client.meta.events.register('after-call.dynamodb', self._record)
+
+    def _add_capacity_param(self, params, model, **kwargs):
+        if model.name in _CAPACITY_OPERATIONS:
+            params.setdefault('ReturnConsumedCapacity', 'TOTAL')
+
+    def _record(self, parsed, model, **kwargs):
+        consumed = parsed.get('ConsumedCapacity') or []
+        if isinstance(consumed, dict):
+            consumed = [consumed]
+        with self._lock:
+            self.calls[model.name] += 1
+            self.capacity += sum(entry.get('CapacityUnits', 0) for entry in consumed)
+            self.retries += parsed.get('ResponseMetadata', {}).get('RetryAttempts', 0)
+
+
+# --- Data awal ---
+
+def create_tables(client):
+    existing = set(client.list_tables()['TableNames'])
+    for name, key, indexes in TABLES.values():
+        if name in existing:
+            continue
+        attributes = {key} | {a for _, pk, sk in indexes for a in (pk, sk)}
+        params = {
+            'TableName': name,
+            'BillingMode': 'PAY_PER_REQUEST',
+            'KeySchema': [{'AttributeName': key, 'KeyType': 'HASH'}],
+            'AttributeDefinitions': [{'AttributeName': a, 'AttributeType': 'N' if a in NUMBER_ATTRIBUTES else 'S'}
+                                     for a in sorted(attributes)],
+        }
+        if indexes:
+            params['GlobalSecondaryIndexes'] = [{
+                'IndexName': index,
+                'KeySchema': [{'AttributeName': pk, 'KeyType': 'HASH'}, {'AttributeName': sk, 'KeyType': 'RANGE'}],
+                'Projection': {'ProjectionType': 'ALL'},
+            } for index, pk, sk in indexes]
+        client.create_table(**params)
+
+
+def seed(ddb, sizes, rng):
+    """ Isi tabel dengan data sintetis, kembalikan id yang dipakai skenario """
+    products = [{
+        'productId': f'prod-{i:06d}',
+        'name': f'Produk {i}',
+        'description': 'Deskripsi produk yang cukup panjang untuk kartu katalog di halaman depan.',
+        'price': Decimal(rng.randrange(5000, 500000, 500)),
+        'imageUrl': f'https://cdn.example.com/img/{i}.jpg',
+    } for i in range(sizes['products'])]
+    product_ids = [p['productId'] for p in products]
+
+    statuses = list(STATUS_WEIGHTS)
+    weights = list(STATUS_WEIGHTS.values())
+    users = [f'user-{i:05d}' for i in range(sizes['users'])]
+    orders = []
+    for i in range(sizes['orders']):
+        lines = [{'productId': pid, 'name': 'Produk', 'price': Decimal(15000), 'quantity': rng.randint(1, 3),
+                  'imageUrl': ''} for pid in rng.sample(product_ids, 3)]
+        orders.append({
+            'orderId': f'order-{i:07d}',
+            'userId': rng.choice(users),
+            'items': lines,
+            'itemCount': sum(line['quantity'] for line in lines),
+            'totalPrice': sum(line['price'] * line['quantity'] for line in lines),
+            'status': rng.choices(statuses, weights)[0],
+            'createdAt': f'2026-{rng.randint(7, 10):02d}-{rng.randint(1, 28):02d}T{rng.randint(0, 23):02d}:00:00',
+            'customerName': 'Pelanggan',
+            'shippingAddress': 'Jl. Contoh No. 1, Jakarta',
+            'paymentMethod': 'transfer',
+        })
+    # Pengguna keranjang terpisah dari pemesan: placeOrder mengosongkan keranjang pemesan
+    carts = [{
+        'userId': f'cart-user-{i:05d}',
+        'items': {pid: {'productId': pid, 'quantity': rng.randint(1, 5)}
+                  for pid in rng.sample(product_ids, min(CART_LINES, len(product_ids)))},
+    } for i in range(sizes['carts'])]
+
+    for env, items in (('PRODUCTS_TABLE', products), ('ORDERS_TABLE', orders), ('CART_TABLE', carts)):
+        failed = ddb.batch_write_items(TABLES[env][0], items, max_workers=8)
+        if failed:
+            raise RuntimeError(f'Seed {env}: {len(failed)} item gagal ditulis')
+
+    return {
+        'products': product_ids,
+        'users': users,
+        'orders': [o['orderId'] for o in orders],
+        'pending': [o['orderId'] for o in orders if o['status'] == 'PENDING'],
+        'carts': [c['userId'] for c in carts],
+    }
+
+
+# --- Skenario: (nama, modul, fungsi handler, pembuat event, jumlah request maks) ---
+
+def api_event(method, resource, path_parameters=None, query=None, body=None, headers=None):
+    event = {
+        'httpMethod': method,
+        'resource': resource,
+        'headers': dict({'Accept-Encoding': 'gzip'}, **(headers or {})),
+        'pathParameters': path_parameters,
+        'queryStringParameters': query,
+    }
+    if body is not None:
+        event['body'] = body if isinstance(body, str) else json.dumps(body)
+    return event
+
+
+def build_scenarios(ids):
+    products, users, orders, carts = ids['products'], ids['users'], ids['orders'], ids['carts']
+    pending = ids['pending']
+
+    def order_lines(rng):
+        return [{'productId': pid, 'quantity': rng.randint(1, 3)} for pid in rng.sample(products, 3)]
+
+    def order_body(rng):
+        return {'userId': rng.choice(users), 'items': order_lines(rng), 'nama': 'Bench',
+                'alamat': 'Jl. Bench 1', 'metodePembayaran': 'transfer'}
+
+    return [
+        ('products.list', 'getProduct', 'get_prod_handler', lambda i, rng: api_event('GET', '/products'), None),
+        ('products.list.fields', 'getProduct', 'get_prod_handler',
+         lambda i, rng: api_event('GET', '/products', query={'fields': 'name,price,imageUrl'}), None),
+        ('products.get', 'getProduct', 'get_prod_handler',
+         lambda i, rng: api_event('GET', '/products/{productId}', {'productId': rng.choice(products)}), None),
+        # Request pertama membangun indeks pencarian dari tabel produk (sekali), sisanya dari memori
+        ('products.search', 'searchProduct', 'search_handler',
+         lambda i, rng: api_event('GET', '/products/search', query={'q': f'produk {rng.randrange(100)}'}), None),
+        ('products.search.price', 'searchProduct', 'search_handler',
+         lambda i, rng: api_event('GET', '/products/search', query={
+             'minPrice': '100000', 'maxPrice': '150000', 'sort': 'price', 'limit': '50'}), None),
+        ('products.create', 'createProduct', 'create_Prod_handler',
+         lambda i, rng: api_event('POST', '/products', body={'name': f'Baru {i}', 'price': 12000}), None),
+        ('products.import100', 'createProduct', 'create_Prod_handler',
+         lambda i, rng: api_event('POST', '/products', body=[{'name': f'Import {i}-{j}', 'price': 1000 + j} for j in range(100)]),
+         20),
+        # Sync inkremental: hanya produk yang ditulis skenario create/import di atas, bukan seluruh katalog
+        ('products.sync', 'getProduct', 'get_prod_handler',
+         lambda i, rng: api_event('GET', '/products', query={'since': '0', 'limit': '200'}), None),
+        ('orders.get', 'getOrder', 'get_handler',
+         lambda i, rng: api_event('GET', '/orders/{orderId}', {'orderId': rng.choice(orders)}), None),
+        ('orders.byStatus', 'getOrder', 'get_handler',
+         lambda i, rng: api_event('GET', '/orders', query={'status': 'PENDING', 'limit': '50'}), None),
+        ('orders.byUser.summary', 'getOrder', 'get_handler',
+         lambda i, rng: api_event('GET', '/users/{userId}/orders', {'userId': rng.choice(users)}, {'view': 'summary'}), None),
+        # Ekspor penuh (Parallel Scan): sangat lambat di moto, cukup beberapa request
+        ('orders.scan', 'getOrder', 'get_handler', lambda i, rng: api_event('GET', '/orders'), 2),
+        ('orders.stats', 'getOrderStats', 'stats_handler',
+         lambda i, rng: api_event('GET', '/orders/stats', query={'days': '7', 'date': '2026-10-18'}), None),
+        ('orders.create', 'createOrders', 'lambda_handler',
+         lambda i, rng: api_event('POST', '/orders', body=order_body(rng)), None),
+        ('orders.place', 'placeOrder', 'place_order_handler',
+         lambda i, rng: api_event('POST', '/orders/place', body=dict(order_body(rng), idempotencyKey=str(uuid.uuid4()))), None),
+        ('orders.updateStatus', 'updateOrder', 'Handler',
+         lambda i, rng: api_event('PUT', '/orders/{orderId}', {'orderId': pending[i % len(pending)]}, body={'status': 'PAID'}), None),
+        ('checkout', 'Checkout', 'checkout_handler',
+         lambda i, rng: api_event('POST', '/checkout', body={
+             'orderId': str(uuid.uuid4()), 'userId': rng.choice(users), 'items': order_lines(rng),
+             'totalPrice': 45000, 'createdAt': '2026-10-18T10:00:00'}), None),
+        ('cart.get200', 'getCart', 'get_handler',
+         lambda i, rng: api_event('GET', '/cart/{userId}', {'userId': rng.choice(carts)}), None),
+        ('cart.add', 'manageCart', 'cart_handler',
+         lambda i, rng: api_event('POST', '/cart/{userId}', {'userId': rng.choice(users)},
+                                  body={'productId': rng.choice(products), 'quantity': 1}), None),
+        ('cart.replace200', 'manageCart', 'cart_handler',
+         lambda i, rng: api_event('POST', '/cart/{userId}', {'userId': rng.choice(carts)}, body={
+             'replace': True,
+             'items': [{'productId': pid, 'quantity': 2} for pid in rng.sample(products, min(CART_LINES, len(products)))]}),
+         None),
+    ]
+
+
+# --- Pengukuran ---
+
+def percentile(sorted_values, p):
+    """ Nearest-rank percentile dari list yang sudah diurutkan """
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, int(round(p / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+def run_scenario(handler, make_event, requests, concurrency, recorder, seed_value):
+    events = [make_event(i, random.Random(seed_value + i)) for i in range(requests)]
+    latencies = [0.0] * requests
+    statuses = Counter()
+    response_bytes = [0] * requests
+    lock = threading.Lock()
+
+    def invoke(i):
+        start = time.perf_counter()
+        response = handler(dict(events[i]), None)
+        latencies[i] = (time.perf_counter() - start) * 1000
+        response_bytes[i] = len(response.get('body') or '')
+        with lock:
+            statuses[response.get('statusCode')] += 1
+
+    recorder.reset()
+    started = time.perf_counter()
+    if concurrency <= 1:
+        for i in range(requests):
+            invoke(i)
+    else:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            list(executor.map(invoke, range(requests)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    calls = sum(recorder.calls.values())
+    return {
+        'requests': requests,
+        'errors': sum(count for status, count in statuses.items() if not (200 <= status < 300 or status == 304)),
+        'status_codes': {str(status): count for status, count in sorted(statuses.items())},
+        'rps': round(requests / elapsed, 1),
+        'p50_ms': round(percentile(latencies, 50), 2),
+        'p90_ms': round(percentile(latencies, 90), 2),
+        'p99_ms': round(percentile(latencies, 99), 2),
+        'max_ms': round(latencies[-1], 2),
+        'ddb_calls_per_request': round(calls / requests, 2),
+        'ddb_calls': dict(recorder.calls),
+        'ddb_retries': recorder.retries,
+        'capacity_units_per_request': round(recorder.capacity / requests, 2),
+        'request_bytes': round(sum(len(e.get('body') or '') for e in events) / requests),
+        'response_bytes': round(sum(response_bytes) / requests),
+    }
+
+
+def compare(results, baseline_path):
+    with open(baseline_path) as f:
+        baseline = json.load(f)['scenarios']
+    print(f'\nPerbandingan dengan {baseline_path} (perubahan %, negatif = lebih baik)')
+    print(f'  {"skenario":<24} {"p50":>8} {"p99":>8} {"ddb/req":>8} {"bytes":>8}')
+    for name, row in results.items():
+        old = baseline.get(name)
+        if not old:
+            print(f'  {name:<24} (baru)')
+            continue
+        deltas = []
+        for key in ('p50_ms', 'p99_ms', 'ddb_calls_per_request', 'response_bytes'):
+            deltas.append(f'{(row[key] - old[key]) / old[key] * 100:+7.1f}%' if old[key] else f'{"-":>8}')
+        print(f'  {name:<24} ' + ' '.join(deltas))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--scale', type=float, default=0.1, help='1 = 10k produk / 100k pesanan')
+    parser.add_argument('--requests', type=int, default=200, help='request per skenario')
+    parser.add_argument('--concurrency', type=int, default=1)
+    parser.add_argument('--only', action='append', help='hanya skenario yang namanya diawali teks ini')
+    parser.add_argument('--endpoint-url', help='DynamoDB Local; jika kosong, moto server dijalankan otomatis')
+    parser.add_argument('--router', action='store_true', help='panggil lewat router.handler (fungsi gabungan)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='simpan hasil sebagai JSON')
+    parser.add_argument('--compare', help='JSON hasil sebelumnya untuk dibandingkan')
+    args = parser.parse_args()
+
+    server = None
+    endpoint_url = args.endpoint_url
+    if not endpoint_url:
+        from moto.server import ThreadedMotoServer
+        logging.getLogger('werkzeug').setLevel(logging.ERROR)
+        server = ThreadedMotoServer(port=0, verbose=False)
+        server.start()
+        host, port = server.get_host_and_port()
+        endpoint_url = f'http://{host}:{port}'
+
+    # Environment harus lengkap SEBELUM modul handler di-import (nama tabel dibaca saat import)
+    os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+    os.environ.setdefault('AWS_ACCESS_KEY_ID', 'bench')
+    os.environ.setdefault('AWS_SECRET_ACCESS_KEY', 'bench')
+    os.environ['DYNAMODB_ENDPOINT_URL'] = endpoint_url
+    # moto jauh lebih lambat dari DynamoDB untuk Scan besar: jangan sampai read timeout
+    os.environ.setdefault('DDB_READ_TIMEOUT', '120')
+    # Baris EMF dari metrics.py tidak dibutuhkan di sini (METRICS_SAMPLE_RATE=1 untuk ikut mengukur overhead-nya)
+    os.environ.setdefault('METRICS_SAMPLE_RATE', '0')
+    for env, (name, _, _) in TABLES.items():
+        os.environ[env] = name
+
+    try:
+        import ddb
+        client = ddb.get_client()
+        create_tables(client)
+        sizes = {
+            'products': max(100, int(FULL_PRODUCTS * args.scale)),
+            'orders': max(100, int(FULL_ORDERS * args.scale)),
+            'users': max(10, int(FULL_USERS * args.scale)),
+            'carts': max(10, int(FULL_USERS * args.scale) // 10),
+        }
+        print(f'Seed: {sizes["products"]} produk, {sizes["orders"]} pesanan, '
+              f'{sizes["users"]} pengguna, {sizes["carts"]} keranjang x {CART_LINES} produk ...')
+        started = time.perf_counter()
+        ids = seed(ddb, sizes, random.Random(args.seed))
+        print(f'Seed selesai dalam {time.perf_counter() - started:.1f} detik\n')
+
+        recorder = DynamoDBRecorder()
+        recorder.install(client)
+
+        results = {}
+        print(f'{"skenario":<24} {"p50":>7} {"p90":>7} {"p99":>7} {"rps":>7} {"ddb/req":>8} '
+              f'{"CU/req":>7} {"resp B":>8} {"err":>4}   (ms, concurrency {args.concurrency})')
+        for name, module, function, make_event, max_requests in build_scenarios(ids):
+            if args.only and not any(name.startswith(prefix) for prefix in args.only):
+                continue
+            if args.router:
+                handler = importlib.import_module('router').handler
+            else:
+                handler = getattr(importlib.import_module(module), function)
+            requests = min(args.requests, max_requests or args.requests)
+            row = run_scenario(handler, make_event, requests, args.concurrency, recorder, args.seed)
+            results[name] = row
+            print(f'{name:<24} {row["p50_ms"]:>7} {row["p90_ms"]:>7} {row["p99_ms"]:>7} {row["rps"]:>7} '
+                  f'{row["ddb_calls_per_request"]:>8} {row["capacity_units_per_request"]:>7} '
+                  f'{row["response_bytes"]:>8} {row["errors"]:>4}')
+
+        if args.compare:
+            compare(results, args.compare)
+        if args.output:
+            with open(args.output, 'w') as f:
+                json.dump({
+                    'meta': {'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'), 'sizes': sizes,
+                             'requests': args.requests, 'concurrency': args.concurrency, 'router': args.router,
+                             'endpoint': 'moto' if server else endpoint_url},
+                    'scenarios': results,
+                }, f, indent=2)
+            print(f'\nHasil disimpan ke {args.output}')
+    finally:
+        if server:
+            server.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+"""
+Benchmark hedged read (ddb.Table.hedged_get_item) vs get_item biasa dengan ekor latensi buatan.
+
+--requests GetItem per key acak dijalankan dengan --concurrency thread terhadap moto server
+(atau DynamoDB Local lewat --endpoint-url). Ekor latensi DynamoDB disimulasikan dengan event
+botocore 'before-send': setiap request GetItem (termasuk request hedge) secara independen
+ditahan --slow-ms dengan peluang --slow-rate, seperti partisi/koneksi yang sesekali lambat.
+
+Yang dilaporkan: p50/p99/p99.9/max latensi, dan berapa persen request yang di-hedge /
+dimenangkan hedge (= GetItem tambahan yang dibayar). Hedge dibatasi DDB_HEDGE_MAX_RATIO.
+
+Catatan: moto memproses request satu per satu, jadi request hedge ikut memperlambat
+request lain dan p50 mode hedged di moto naik; di DynamoDB sungguhan tidak.
+
+Butuh: pip install boto3 "moto[server]"   (moto tidak perlu jika memakai --endpoint-url)
+
+Jalankan dari root repo:
+    python benchmarks/bench_hedge.py [--requests 3000] [--slow-rate 0.02] [--slow-ms 300]
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from bench_handlers import LAMBDA_DIR, percentile
+
+sys.path.insert(0, LAMBDA_DIR)
+
+TABLE_NAME = 'bench-hedge'
+KEYS = 1000
+
+
+def run(read, args):
+    rng = random.Random(args.seed)
+    keys = [f'order-{rng.randrange(KEYS):06d}' for _ in range(args.requests)]
+    latencies = [0.0] * args.requests
+
+    def call(i):
+        start = time.perf_counter()
+        read(Key={'orderId': keys[i]})
+        latencies[i] = (time.perf_counter() - start) * 1000
+
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        list(executor.map(call, range(args.requests)))
+    return sorted(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=3000)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--slow-rate', type=float, default=0.02, help='peluang satu GetItem lambat')
+    parser.add_argument('--slow-ms', type=float, default=300)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--endpoint-url', help='DynamoDB Local; jika kosong, moto server dijalankan otomatis')
+    parser.add_argument('--output', help='simpan hasil sebagai JSON')
+    args = parser.parse_args()
+
+    server = None
+    endpoint_url = args.endpoint_url
+    if not endpoint_url:
+        from moto.server import ThreadedMotoServer
+        logging.getLogger('werkzeug').setLevel(logging.ERROR)
+        server = ThreadedMotoServer(port=0, verbose=False)
+        server.start()
+        host, port = server.get_host_and_port()
+        endpoint_url = f'http://{host}:{port}'
+
+    # Environment harus lengkap SEBELUM ddb di-import (dibaca saat import)
+    os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+    os.environ.setdefault('AWS_ACCESS_KEY_ID', 'bench')
+    os.environ.setdefault('AWS_SECRET_ACCESS_KEY', 'bench')
+    os.environ['DYNAMODB_ENDPOINT_URL'] = endpoint_url
+    os.environ.setdefault('METRICS_SAMPLE_RATE', '0')
+    os.environ.setdefault('DDB_MAX_POOL_CONNECTIONS', str(args.concurrency * 2))
+
+    try:
+        import ddb
+        client = ddb.get_client()
+        if TABLE_NAME not in client.list_tables()['TableNames']:
+            client.create_table(TableName=TABLE_NAME, BillingMode='PAY_PER_REQUEST',
+                                KeySchema=[{'AttributeName': 'orderId', 'KeyType': 'HASH'}],
+                                AttributeDefinitions=[{'AttributeName': 'orderId', 'AttributeType': 'S'}])
+        ddb.batch_write_items(TABLE_NAME, [{'orderId': f'order-{i:06d}', 'status': 'PAID'} for i in range(KEYS)])
+
+        slow_rng = random.Random(args.seed)
+
+        def inject_latency(**kwargs):
+            if slow_rng.random() < args.slow_rate:
+                time.sleep(args.slow_ms / 1000)
+
+        client.meta.events.register('before-send.dynamodb.GetItem', inject_latency)
+        table = ddb.Table(TABLE_NAME)
+
+        results = {}
+        print(f'{args.requests} GetItem, concurrency {args.concurrency}, '
+              f'{args.slow_rate:.1%} request lambat {args.slow_ms:.0f} ms\n')
+        print(f'{"mode":<8} {"p50 ms":>8} {"p99 ms":>8} {"p99.9 ms":>9} {"max ms":>8} {"hedge":>7} {"menang":>7}')
+        for mode, read in (('biasa', table.get_item), ('hedged', table.hedged_get_item)):
+            before = dict(ddb.hedge_stats)
+            latencies = run(read, args)
+            fired = ddb.hedge_stats['fired'] - before['fired']
+            won = ddb.hedge_stats['won'] - before['won']
+            results[mode] = {'p50_ms': round(percentile(latencies, 50), 2), 'p99_ms': round(percentile(latencies, 99), 2),
+                             'p999_ms': round(percentile(latencies, 99.9), 2), 'max_ms': round(latencies[-1], 2),
+                             'hedge_rate': round(fired / args.requests, 4), 'won_rate': round(won / args.requests, 4)}
+            row = results[mode]
+            print(f'{mode:<8} {row["p50_ms"]:>8} {row["p99_ms"]:>8} {row["p999_ms"]:>9} {row["max_ms"]:>8} '
+                  f'{row["hedge_rate"]:>7.1%} {row["won_rate"]:>7.1%}')
+
+        if args.output:
+            with open(args.output, 'w') as f:
+                json.dump({'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'), 'params': vars(args),
+                           'results': results}, f, indent=2)
+            print(f'Hasil disimpan ke {args.output}')
+    finally:
+        if server:
+            server.stop()
+
+
+if __name__ == '__main__':
+    main()
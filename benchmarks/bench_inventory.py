@@ -0,0 +1,207 @@
+"""
+Uji beban flash sale: banyak reservasi bersamaan pada SATU SKU (lambda/inventory.py).
+
+Untuk setiap jumlah shard di --shards: stok di-set ke --stock, lalu --requests reservasi
+(quantity 1) dijalankan dengan --concurrency thread terhadap DynamoDB lokal (moto server
+otomatis, atau DynamoDB Local lewat --endpoint-url). Jumlah request sengaja lebih besar
+dari stok, jadi sebagian harus ditolak (OutOfStock).
+
+Yang dicek: tidak ada overselling (reservasi berhasil == stok awal - stok akhir, tidak
+ada shard minus). Yang dilaporkan: throughput, p50/p99 latensi, UpdateItem per reservasi
+(termasuk ConditionalCheckFailed = jatuh ke shard lain), dan sebaran write per shard.
+Dari sebaran itu diperkirakan berapa reservasi/detik yang bisa ditampung sebelum satu
+partisi kena batas ~1000 WCU/detik (throttling) di DynamoDB sungguhan.
+--rebalance-ms menjalankan inventory.rebalance() berkala di thread lain SELAMA beban
+(seperti inventoryRebalance.py), untuk memastikan perataan ulang juga tidak oversell.
+
+Catatan: moto memproses request satu per satu (throughput absolut rendah); angka
+absolut yang lebih realistis didapat dengan DynamoDB Local (--endpoint-url).
+
+Butuh: pip install boto3 "moto[server]"   (moto tidak perlu jika memakai --endpoint-url)
+
+Jalankan dari root repo:
+    python benchmarks/bench_inventory.py [--shards 1,4,16] [--stock 2000] [--requests 3000] [--concurrency 32]
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from bench_handlers import LAMBDA_DIR, percentile
+
+sys.path.insert(0, LAMBDA_DIR)
+
+# Batas write per partisi DynamoDB (WCU/detik, item <= 1 KB)
+PARTITION_WCU = 1000
+TABLE_NAME = 'bench-inventory'
+SKU = 'flash-sale-sku'
+
+
+class ShardRecorder:
+    """ Hitung UpdateItem per shard dan yang gagal karena kondisi (event botocore) """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.writes = Counter()
+            self.conditional_failures = 0
+
+    def install(self, client):
+        client.meta.events.register('provide-client-params.dynamodb.UpdateItem', self._count)
+        client.meta.events.register('after-call.dynamodb.UpdateItem', self._result)
+
+    def _count(self, params, **kwargs):
+        with self._lock:
+            self.writes[params['Key']['shardId']['S']] += 1
+
+    def _result(self, parsed, **kwargs):
+        if parsed.get('Error', {}).get('Code') == 'ConditionalCheckFailedException':
+            with self._lock:
+                self.conditional_failures += 1
+
+
+def run(inventory, recorder, shards, args):
+    inventory.set_stock(SKU, args.stock, shards)
+    recorder.reset()
+    latencies = [0.0] * args.requests
+    outcomes = Counter()
+    lock = threading.Lock()
+
+    def reserve(i):
+        start = time.perf_counter()
+        try:
+            inventory.reserve(SKU, 1)
+            outcome = 'reserved'
+        except inventory.OutOfStock:
+            outcome = 'out_of_stock'
+        except Exception as e:
+            outcome = type(e).__name__
+        latencies[i] = (time.perf_counter() - start) * 1000
+        with lock:
+            outcomes[outcome] += 1
+
+    done = threading.Event()
+    moved = []
+
+    def rebalance_loop():
+        while not done.wait(args.rebalance_ms / 1000):
+            moved.append(inventory.rebalance(SKU))
+
+    rebalancer = threading.Thread(target=rebalance_loop) if args.rebalance_ms and shards > 1 else None
+    started = time.perf_counter()
+    if rebalancer:
+        rebalancer.start()
+    try:
+        with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+            list(executor.map(reserve, range(args.requests)))
+    finally:
+        done.set()
+        if rebalancer:
+            rebalancer.join()
+    elapsed = time.perf_counter() - started
+
+    levels = inventory._levels(SKU, shards)
+    remaining = sum(levels.values())
+    reserved = outcomes['reserved']
+    latencies.sort()
+    writes = sum(recorder.writes.values())
+    hottest = max(recorder.writes.values()) / writes if writes else 0
+    return {
+        'shards': shards,
+        'reserved': reserved,
+        'out_of_stock': outcomes['out_of_stock'],
+        'errors': sum(count for outcome, count in outcomes.items() if outcome not in ('reserved', 'out_of_stock')),
+        'remaining': remaining,
+        # Stok awal = terjual + sisa, dan tidak ada shard yang minus
+        'oversold': reserved + remaining != args.stock or any(level < 0 for level in levels.values()),
+        'rps': round(args.requests / elapsed, 1),
+        'p50_ms': round(percentile(latencies, 50), 2),
+        'p99_ms': round(percentile(latencies, 99), 2),
+        'updates_per_request': round(writes / args.requests, 2),
+        'conditional_failures': recorder.conditional_failures,
+        'hottest_shard_share': round(hottest, 3),
+        # Reservasi/detik sebelum shard terpanas mencapai batas WCU partisi
+        'est_max_rps': round(PARTITION_WCU / hottest) if hottest else None,
+        'rebalances': len(moved),
+        'rebalanced_units': sum(moved),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--shards', default='1,4,16', help='daftar jumlah shard, dipisah koma')
+    parser.add_argument('--stock', type=int, default=2000)
+    parser.add_argument('--requests', type=int, default=3000)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--rebalance-ms', type=float, default=0, help='jalankan rebalance() tiap N ms selama beban (0 = tidak)')
+    parser.add_argument('--endpoint-url', help='DynamoDB Local; jika kosong, moto server dijalankan otomatis')
+    parser.add_argument('--output', help='simpan hasil sebagai JSON')
+    args = parser.parse_args()
+
+    server = None
+    endpoint_url = args.endpoint_url
+    if not endpoint_url:
+        from moto.server import ThreadedMotoServer
+        logging.getLogger('werkzeug').setLevel(logging.ERROR)
+        server = ThreadedMotoServer(port=0, verbose=False)
+        server.start()
+        host, port = server.get_host_and_port()
+        endpoint_url = f'http://{host}:{port}'
+
+    # Environment harus lengkap SEBELUM inventory di-import (nama tabel dibaca saat import)
+    os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+    os.environ.setdefault('AWS_ACCESS_KEY_ID', 'bench')
+    os.environ.setdefault('AWS_SECRET_ACCESS_KEY', 'bench')
+    os.environ['DYNAMODB_ENDPOINT_URL'] = endpoint_url
+    os.environ.setdefault('METRICS_SAMPLE_RATE', '0')
+    os.environ.setdefault('DDB_MAX_POOL_CONNECTIONS', str(args.concurrency))
+    os.environ['INVENTORY_TABLE'] = TABLE_NAME
+
+    try:
+        import ddb
+        import inventory
+        client = ddb.get_client()
+        if TABLE_NAME not in client.list_tables()['TableNames']:
+            client.create_table(TableName=TABLE_NAME, BillingMode='PAY_PER_REQUEST',
+                                KeySchema=[{'AttributeName': 'shardId', 'KeyType': 'HASH'}],
+                                AttributeDefinitions=[{'AttributeName': 'shardId', 'AttributeType': 'S'}])
+        recorder = ShardRecorder()
+        recorder.install(client)
+
+        print(f'Stok {args.stock}, {args.requests} reservasi x 1, concurrency {args.concurrency}\n')
+        print(f'{"shard":>5} {"terjual":>8} {"habis":>6} {"err":>4} {"sisa":>5} {"oversell":>8} {"rps":>7} '
+              f'{"p50":>7} {"p99":>7} {"upd/req":>8} {"shard terpanas":>15} {"maks rps*":>10}')
+        results = []
+        for shards in (int(value) for value in args.shards.split(',')):
+            row = run(inventory, recorder, shards, args)
+            results.append(row)
+            print(f'{row["shards"]:>5} {row["reserved"]:>8} {row["out_of_stock"]:>6} {row["errors"]:>4} '
+                  f'{row["remaining"]:>5} {"YA" if row["oversold"] else "tidak":>8} {row["rps"]:>7} '
+                  f'{row["p50_ms"]:>7} {row["p99_ms"]:>7} {row["updates_per_request"]:>8} '
+                  f'{row["hottest_shard_share"]:>14.1%} {row["est_max_rps"] or "-":>10}')
+        if args.rebalance_ms:
+            for row in results:
+                print(f'  {row["shards"]} shard: rebalance {row["rebalances"]}x, {row["rebalanced_units"]} unit dipindahkan')
+        print(f'\n* perkiraan reservasi/detik sebelum shard terpanas melewati {PARTITION_WCU} WCU/detik')
+
+        if args.output:
+            with open(args.output, 'w') as f:
+                json.dump({'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'), 'params': vars(args),
+                           'results': results}, f, indent=2)
+            print(f'Hasil disimpan ke {args.output}')
+        if any(row['oversold'] for row in results):
+            sys.exit('OVERSELLING terdeteksi')
+    finally:
+        if server:
+            server.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,221 @@
+"""
+Simulasi cold start: satu fungsi per route (seperti sekarang) vs satu fungsi gabungan (router.py).
+
+1. Biaya cold start DIUKUR di proses Python baru (seperti bench_coldstart.py):
+   waktu import tiap modul handler, import router, dan inisialisasi client DynamoDB +
+   panggilan pertama (koneksi TLS). Untuk router juga diukur biaya import modul route
+   secara lazy di container yang sudah warm (boto3/ddb sudah ter-import).
+2. Lalu lalu lintas harian disimulasikan (kedatangan Poisson per route, --traffic-scale).
+   Container dianggap hilang setelah --idle-minutes tanpa request (satu container per
+   fungsi; cocok untuk trafik rendah di mana cold start paling terasa).
+
+Dilaporkan: persentase request yang kena cold start per route dan total, serta
+p50/p99 latensi (warm --warm-ms + penalti cold start / lazy import).
+
+Butuh: pip install boto3 "moto[server]"   (moto tidak perlu jika memakai --endpoint-url)
+
+Jalankan dari root repo:
+    python benchmarks/bench_router.py [--hours 24] [--idle-minutes 10] [--traffic-scale 1]
+"""
+import argparse
+import json
+import logging
+import random
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+from bench_coldstart import LAMBDA_DIR, _CHILD_CLIENT, child_env, import_time_ms, run_child, seed
+
+sys.path.insert(0, LAMBDA_DIR)
+
+from router import ROUTES  # noqa: E402
+
+# Request per jam untuk setiap route (perkiraan toko kecil; skala dengan --traffic-scale)
+TRAFFIC = {
+    ('GET', '/products'): 1200,
+    ('GET', '/products/search'): 300,
+    ('GET', '/products/{productId}'): 400,
+    ('GET', '/cart/{userId}'): 200,
+    ('POST', '/cart/{userId}'): 150,
+    ('GET', '/users/{userId}/orders'): 60,
+    ('POST', '/orders/place'): 30,
+    ('GET', '/orders/{orderId}'): 20,
+    ('GET', '/orders'): 10,
+    ('PUT', '/orders/{orderId}'): 10,
+    ('GET', '/orders/stats'): 6,
+    ('POST', '/orders'): 2,
+    ('POST', '/checkout'): 2,
+    ('POST', '/products'): 1,
+    ('PUT', '/products/{productId}'): 1,
+    ('DELETE', '/products/{productId}'): 0.2,
+}
+
+# Modul yang sudah ter-import sebelum modul route di container router yang warm
+_WARM_PRELUDE = 'import boto3, ddb, api_response, metrics, router'
+
+
+def lazy_import_ms(module, env):
+    """ Waktu import modul route di container yang sudah warm (dependensi bersama sudah ada) """
+    output = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'{_WARM_PRELUDE}; import {module}'],
+                            cwd=LAMBDA_DIR, env=env, capture_output=True, text=True, check=True)
+    pattern = re.compile(r'import time:\s+\d+ \|\s+(\d+) \| ' + re.escape(module) + r'$')
+    for line in output.stderr.splitlines():
+        match = pattern.search(line)
+        if match:
+            return int(match.group(1)) / 1000
+    raise RuntimeError(f'Tidak menemukan {module} di output -X importtime')
+
+
+def measure_costs(env, runs):
+    modules = sorted({module for module, _ in ROUTES.values()})
+    median = statistics.median
+    costs = {
+        'first_call_ms': median(run_child(_CHILD_CLIENT, [], env)['first_ms'] for _ in range(runs)),
+        'router_import_ms': median(import_time_ms('router', env) for _ in range(runs)),
+        'import_ms': {},
+        'lazy_import_ms': {},
+    }
+    for module in modules:
+        costs['import_ms'][module] = median(import_time_ms(module, env) for _ in range(runs))
+        costs['lazy_import_ms'][module] = median(lazy_import_ms(module, env) for _ in range(runs))
+    return costs
+
+
+def arrivals(hours, traffic_scale, rng):
+    """ Daftar (detik, route) terurut waktu: proses Poisson per route """
+    events = []
+    horizon = hours * 3600
+    for route, per_hour in TRAFFIC.items():
+        rate = per_hour * traffic_scale / 3600
+        if rate <= 0:
+            continue
+        t = rng.expovariate(rate)
+        while t < horizon:
+            events.append((t, route))
+            t += rng.expovariate(rate)
+    events.sort()
+    return events
+
+
+def simulate(events, costs, args):
+    """ Hitung cold start & latensi untuk mode 'split' (per route) dan 'router' (gabungan) """
+    idle = args.idle_minutes * 60
+    runtime = args.runtime_init_ms
+    split_last = {}      # modul -> waktu request terakhir di container fungsi itu
+    router_last = None   # waktu request terakhir di container router
+    router_loaded = set()
+
+    stats = {route: {'requests': 0, 'split_cold': 0, 'router_cold': 0, 'router_lazy': 0} for route in TRAFFIC}
+    latencies = {'split': [], 'router': []}
+    for t, route in events:
+        module = ROUTES[route][0]
+        row = stats[route]
+        row['requests'] += 1
+
+        # Satu fungsi per route (modul): cold jika container modul ini sudah idle terlalu lama
+        last = split_last.get(module)
+        if last is None or t - last > idle:
+            row['split_cold'] += 1
+            latencies['split'].append(args.warm_ms + runtime + costs['import_ms'][module] + costs['first_call_ms'])
+        else:
+            latencies['split'].append(args.warm_ms)
+        split_last[module] = t
+
+        # Fungsi gabungan: SEMUA route menjaga container yang sama tetap warm
+        if router_last is None or t - router_last > idle:
+            row['router_cold'] += 1
+            router_loaded = {module}
+            latencies['router'].append(args.warm_ms + runtime + costs['router_import_ms']
+                                       + costs['lazy_import_ms'][module] + costs['first_call_ms'])
+        elif module not in router_loaded:
+            row['router_lazy'] += 1
+            router_loaded.add(module)
+            latencies['router'].append(args.warm_ms + costs['lazy_import_ms'][module])
+        else:
+            latencies['router'].append(args.warm_ms)
+        router_last = t
+    return stats, latencies
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(p / 100 * len(values)))] if values else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--hours', type=float, default=24)
+    parser.add_argument('--idle-minutes', type=float, default=10, help='container dianggap hilang setelah idle selama ini')
+    parser.add_argument('--traffic-scale', type=float, default=1, help='pengali request per jam di TRAFFIC')
+    parser.add_argument('--warm-ms', type=float, default=15, help='latensi invocation warm (asumsi, sama untuk semua route)')
+    parser.add_argument('--runtime-init-ms', type=float, default=150, help='init runtime Lambda (di luar import Python)')
+    parser.add_argument('--runs', type=int, default=3, help='jumlah proses baru per pengukuran')
+    parser.add_argument('--endpoint-url', help='DynamoDB Local; jika kosong, moto server dijalankan otomatis')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='simpan hasil sebagai JSON')
+    args = parser.parse_args()
+
+    server = None
+    endpoint_url = args.endpoint_url
+    if not endpoint_url:
+        from moto.server import ThreadedMotoServer
+        logging.getLogger('werkzeug').setLevel(logging.ERROR)
+        server = ThreadedMotoServer(port=0, verbose=False)
+        server.start()
+        host, port = server.get_host_and_port()
+        endpoint_url = f'http://{host}:{port}'
+
+    try:
+        seed(endpoint_url)
+        costs = measure_costs(child_env(endpoint_url), args.runs)
+    finally:
+        if server:
+            server.stop()
+
+    print(f'Biaya terukur (median ms): client DynamoDB + panggilan pertama {costs["first_call_ms"]:.1f}, '
+          f'import router {costs["router_import_ms"]:.1f}')
+    print(f'  {"modul":<24} {"import (cold)":>14} {"lazy (warm)":>12}')
+    for module, cold in costs['import_ms'].items():
+        print(f'  {module:<24} {cold:>14.1f} {costs["lazy_import_ms"][module]:>12.1f}')
+
+    events = arrivals(args.hours, args.traffic_scale, random.Random(args.seed))
+    stats, latencies = simulate(events, costs, args)
+
+    print(f'\nSimulasi {args.hours:g} jam, {len(events)} request, idle timeout {args.idle_minutes:g} menit')
+    print(f'  {"route":<34} {"req":>6} {"cold split":>11} {"cold router":>12} {"lazy router":>12}')
+    for (method, resource), row in stats.items():
+        n = row['requests'] or 1
+        print(f'  {method + " " + resource:<34} {row["requests"]:>6} {row["split_cold"] / n:>10.1%} '
+              f'{row["router_cold"] / n:>11.1%} {row["router_lazy"] / n:>11.1%}')
+
+    total = len(events) or 1
+    summary = {}
+    for mode in ('split', 'router'):
+        cold = sum(row[f'{mode}_cold'] for row in stats.values())
+        summary[mode] = {
+            'cold_start_rate': round(cold / total, 4),
+            'p50_ms': round(percentile(latencies[mode], 50), 1),
+            'p99_ms': round(percentile(latencies[mode], 99), 1),
+            'mean_ms': round(statistics.fmean(latencies[mode]), 1) if latencies[mode] else 0.0,
+        }
+    print(f'\n  {"mode":<8} {"cold start":>11} {"p50 ms":>8} {"p99 ms":>8} {"mean ms":>8}')
+    for mode, row in summary.items():
+        print(f'  {mode:<8} {row["cold_start_rate"]:>10.2%} {row["p50_ms"]:>8} {row["p99_ms"]:>8} {row["mean_ms"]:>8}')
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({
+                'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'params': vars(args),
+                'costs': costs,
+                'routes': {f'{m} {r}': row for (m, r), row in stats.items()},
+                'summary': summary,
+            }, f, indent=2)
+        print(f'\nHasil disimpan ke {args.output}')
+
+
+if __name__ == '__main__':
+    main()
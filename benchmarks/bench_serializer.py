@@ -0,0 +1,82 @@
+"""
+Micro-benchmark: serialisasi JSON listing besar (10k item) dari DynamoDB.
+
+Membandingkan encoder lama yang dulu disalin di setiap handler
+(json.dumps(cls=DecimalEncoder)) dengan api_response.dumps.
+
+Jalankan dari root repo:
+    python benchmarks/bench_serializer.py [--items 10000] [--repeat 7]
+"""
+import argparse
+import json
+import os
+import sys
+import timeit
+from decimal import Decimal
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'lambda'))
+
+from api_response import dumps  # noqa: E402
+
+
+class LegacyDecimalEncoder(json.JSONEncoder):
+    """ Salinan encoder lama (sebelum api_response) sebagai pembanding """
+    def default(self, obj):
+        if isinstance(obj, Decimal):
+            return int(obj) if obj % 1 == 0 else float(obj)
+        return super(LegacyDecimalEncoder, self).default(obj)
+
+
+def legacy_dumps(body):
+    return json.dumps(body, cls=LegacyDecimalEncoder)
+
+
+def make_products(n):
+    return [{
+        'productId': f'prod-{i:06d}',
+        'name': f'Produk {i}',
+        'description': 'Deskripsi produk yang cukup panjang untuk listing katalog.',
+        'price': Decimal(15000 + i),
+        'imageUrl': f'https://cdn.example.com/img/{i}.jpg'
+    } for i in range(n)]
+
+
+def make_orders(n):
+    return [{
+        'orderId': f'order-{i:06d}',
+        'userId': f'user-{i % 500}',
+        'status': 'PENDING',
+        'createdAt': '2026-10-18T10:00:00',
+        'totalPrice': Decimal('225000.50'),
+        'items': [
+            {'productId': f'prod-{j}', 'quantity': Decimal(j + 1), 'price': Decimal('75000.5')}
+            for j in range(3)
+        ]
+    } for i in range(n)]
+
+
+def bench(label, payload, repeat):
+    assert legacy_dumps(payload) == dumps(payload), 'Output serializer berbeda!'
+    number = 3
+    results = {}
+    for name, fn in (('legacy DecimalEncoder', legacy_dumps), ('api_response.dumps', dumps)):
+        best = min(timeit.repeat(lambda: fn(payload), number=number, repeat=repeat)) / number
+        results[name] = best
+    base = results['legacy DecimalEncoder']
+    print(f'\n{label} ({len(payload)} item, {len(dumps(payload)) / 1024:.0f} KB JSON)')
+    for name, best in results.items():
+        print(f'  {name:<24} {best * 1000:8.1f} ms   ({base / best:.2f}x)')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--items', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=7)
+    args = parser.parse_args()
+
+    bench('Listing produk', make_products(args.items), args.repeat)
+    bench('Listing pesanan', make_orders(args.items), args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,67 +1,50 @@
-import boto3
 import json
 import os
 from decimal import Decimal
-
-# Inisialisasi DynamoDB resource
-dynamodb = boto3.resource('dynamodb')
+from api_response import create_response
+from order_model import archive_record, validate_archive_record
+import archive_queue
+import ddb
+import metrics
 
 # Ambil nama tabel dari environment variable
 # Ini tabel BARU Anda untuk arsip, misal "CheckoutHistory"
-HISTORY_TABLE = "kits-history"
-table = dynamodb.Table(HISTORY_TABLE)
-
-# --- Helper Functions ---
+HISTORY_TABLE = os.environ.get('HISTORY_TABLE', 'kits-history')
+table = ddb.Table(HISTORY_TABLE)
 
-def create_response(status_code, body):
-    """ Helper untuk membuat respon API Gateway """
-    return {
-        'statusCode': status_code,
-        'headers': {
-            'Content-Type': 'application/json',
-            'Access-Control-Allow-Origin': '*',
-        },
-        'body': json.dumps(body)
-    }
+# Jika ARCHIVE_QUEUE_URL diisi, arsip dikirim ke antrian dan ditulis archiveConsumer
+# secara batch; pembeli hanya menunggu SendMessage (lihat archive_queue.py)
 
 # --- Fungsi Handler Utama ---
 
+@metrics.instrument('Checkout')
 def checkout_handler(event, context):
     try:
-        data = json.loads(event['body'])
-        
-        # Ambil semua data dari 'data' (yaitu 'newOrder' dari frontend)
-        order_id = data['orderId']
-        user_id = data['userId']
-        items = data['items']
-        total_price = Decimal(str(data['totalPrice']))
-        created_at = data['createdAt']
+        with metrics.phase('parse'):
+            data = json.loads(event['body'], parse_float=Decimal)
         
-        # ---!! AMBIL DATA BARU !! ---
-        nama_pelanggan = data.get('customerName', 'N/A') # Nama field dari 'newOrder'
-        alamat_pelanggan = data.get('shippingAddress', 'N/A')
-        metode_pembayaran = data.get('paymentMethod', 'N/A')
+        # Ambil semua data dari 'data' (yaitu 'newOrder' dari frontend):
+        # orderId, userId, items, totalPrice, createdAt + customerName,
+        # shippingAddress, paymentMethod
+        # Tipe field kunci dicek di sini: record yang rusak tidak boleh masuk antrian
+        archive_item = validate_archive_record(archive_record(data))
         
     except Exception as e:
         return create_response(400, {'message': f"Body JSON tidak valid: {str(e)}"})
 
+    if archive_queue.enabled():
+        try:
+            with metrics.phase('enqueue'):
+                archive_queue.send(archive_item)
+            return create_response(202, {'message': 'Checkout diterima, arsip sedang diproses', 'archivedOrderId': archive_item['orderId']})
+        except Exception as e:
+            # Antrian bermasalah: jangan gagalkan checkout, tulis langsung seperti biasa
+            print(f"ERROR: Gagal mengirim arsip ke antrian, menulis langsung: {e}")
+
     try:
-        archive_item = {
-            'orderId': order_id,
-            'userId': user_id,
-            'items': items,
-            'totalPrice': total_price,
-            'createdAt': created_at,
-            
-            # ---!! SIMPAN DATA BARU KE TABEL ARSIP !! ---
-            'customerName': nama_pelanggan,
-            'shippingAddress': alamat_pelanggan,
-            'paymentMethod': metode_pembayaran
-        }
-        
         table.put_item(Item=archive_item)
         
-        return create_response(201, {'message': 'Checkout berhasil diarsipkan', 'archivedOrderId': order_id})
+        return create_response(201, {'message': 'Checkout berhasil diarsipkan', 'archivedOrderId': archive_item['orderId']})
         
     except Exception as e:
         print(f"ERROR: Gagal menyimpan arsip ke DynamoDB: {e}")
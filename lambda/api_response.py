@@ -0,0 +1,168 @@
+import base64
+import gzip
+import hashlib
+import json
+import os
+from decimal import Decimal
+import metrics
+
+try:
+    # Opsional: brotli tidak ada di runtime Lambda standar (tambahkan lewat Layer jika perlu)
+    import brotli
+except ImportError:
+    brotli = None
+
+# Modul bersama (bukan handler Lambda): helper respon API Gateway untuk SEMUA handler.
+# Menggantikan DecimalEncoder + create_response yang dulu disalin di setiap file.
+#     from api_response import create_response
+#
+# Jika 'event' ikut dikirim ke create_response, respon juga:
+# - dikompresi (br/gzip sesuai Accept-Encoding) jika body >= COMPRESSION_MIN_BYTES
+# - diberi ETag kuat (hash body) dan dijawab 304 jika cocok dengan If-None-Match
+#
+# Catatan: body terkompresi dikirim dengan isBase64Encoded. Untuk REST API, API Gateway
+# harus punya Binary Media Types '*/*' agar body di-decode; HTTP API otomatis.
+
+# Body lebih kecil dari ini tidak dikompresi (header + CPU tidak sebanding dengan hematnya)
+COMPRESSION_MIN_BYTES = int(os.environ.get('COMPRESSION_MIN_BYTES', '1024'))
+# Level kompresi, lihat benchmarks/bench_compression.py untuk trade-off CPU vs ukuran
+GZIP_LEVEL = int(os.environ.get('GZIP_LEVEL', '1'))
+BROTLI_QUALITY = int(os.environ.get('BROTLI_QUALITY', '4'))
+
+
+def _decimal_to_number(obj):
+    """
+    Dipanggil json HANYA untuk tipe yang tidak dikenal (di sini: Decimal dari DynamoDB).
+    Konversi ke int jika tidak ada koma, jika tidak, ke float.
+    """
+    if type(obj) is Decimal:
+        return int(obj) if obj == obj.to_integral_value() else float(obj)
+    raise TypeError(f'Object of type {type(obj).__name__} is not JSON serializable')
+
+
+# Encoder dibuat SEKALI saat modul di-load (bukan per panggilan seperti json.dumps(cls=...)).
+# check_circular=False melewati pengecekan referensi melingkar yang tidak mungkin
+# terjadi pada data dari DynamoDB, sehingga serialisasi listing besar lebih cepat.
+_encoder = json.JSONEncoder(default=_decimal_to_number, check_circular=False)
+
+
+def dumps(body):
+    """ Serialisasi body ke JSON (mendukung Decimal), output sama dengan json.dumps biasa """
+    return _encoder.encode(body)
+
+
+def create_response(status_code, body, headers=None, event=None):
+    """
+    Helper untuk membuat respon API Gateway (Lambda Proxy Integration).
+    event (opsional): request asli, dipakai untuk ETag/If-None-Match dan Accept-Encoding.
+    """
+    response_headers = {
+        'Content-Type': 'application/json',
+        'Access-Control-Allow-Origin': '*',
+    }
+    if headers:
+        response_headers.update(headers)
+    with metrics.phase('serialize'):
+        text = dumps(body)
+    if event is None:
+        return {
+            'statusCode': status_code,
+            'headers': response_headers,
+            'body': text
+        }
+
+    data = text.encode('utf-8')
+    if status_code == 200 and (event.get('httpMethod') or 'GET') in ('GET', 'HEAD'):
+        # ETag dari handler (misal versi katalog) dipakai apa adanya
+        if 'ETag' not in response_headers:
+            response_headers['ETag'] = body_etag(data)
+            response_headers['Access-Control-Expose-Headers'] = 'ETag'
+        if not_modified(event, response_headers['ETag']):
+            return not_modified_response(response_headers)
+
+    encoding = choose_encoding(get_header(event, 'Accept-Encoding')) if len(data) >= COMPRESSION_MIN_BYTES else None
+    response_headers['Vary'] = 'Accept-Encoding'
+    if encoding is None:
+        return {
+            'statusCode': status_code,
+            'headers': response_headers,
+            'body': text
+        }
+    response_headers['Content-Encoding'] = encoding
+    return {
+        'statusCode': status_code,
+        'headers': response_headers,
+        'body': compressed_body(data, encoding),
+        'isBase64Encoded': True
+    }
+
+
+def timeout_response():
+    """
+    503 saat DynamoDB tidak menjawab dalam sisa waktu invocation (ddb.is_timeout):
+    lebih jelas bagi klien daripada 502 karena Lambda diputus, dan boleh dicoba ulang.
+    """
+    return create_response(503, {'message': 'Layanan sedang sibuk, silakan coba lagi'}, headers={'Retry-After': '1'})
+
+
+def body_etag(data):
+    """ ETag kuat dari body (blake2b 128-bit: jauh lebih murah dari serialisasinya sendiri) """
+    return '"' + hashlib.blake2b(data, digest_size=16).hexdigest() + '"'
+
+
+def not_modified(event, etag):
+    """ True jika browser/CDN sudah punya versi yang sama (If-None-Match) """
+    if_none_match = get_header(event, 'If-None-Match')
+    if not if_none_match:
+        return False
+    return if_none_match.strip() == '*' or etag in [tag.strip() for tag in if_none_match.split(',')]
+
+
+def not_modified_response(headers):
+    """ Respon 304 tanpa body; header cache (ETag, Cache-Control, ...) tetap dikirim """
+    response_headers = {'Access-Control-Allow-Origin': '*', 'Access-Control-Expose-Headers': 'ETag'}
+    response_headers.update(headers)
+    response_headers.pop('Content-Type', None)
+    return {
+        'statusCode': 304,
+        'headers': response_headers,
+        'body': ''
+    }
+
+
+def choose_encoding(accept_encoding):
+    """ Pilih 'br' (jika modul brotli tersedia) atau 'gzip' dari header Accept-Encoding """
+    if not accept_encoding:
+        return None
+    accepted = set()
+    for part in accept_encoding.split(','):
+        name, _, params = part.strip().partition(';')
+        if params.replace(' ', '') in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000'):
+            continue
+        accepted.add(name.strip().lower())
+    if brotli is not None and 'br' in accepted:
+        return 'br'
+    if 'gzip' in accepted or '*' in accepted:
+        return 'gzip'
+    return None
+
+
+def compressed_body(data, encoding):
+    with metrics.phase('compress'):
+        return base64.b64encode(compress(data, encoding)).decode('ascii')
+
+
+def compress(data, encoding):
+    if encoding == 'br':
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    # mtime=0: output sama untuk body yang sama
+    return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def get_header(event, name):
+    """ Ambil header request tanpa peduli huruf besar/kecil """
+    name = name.lower()
+    for key, value in (event.get('headers') or {}).items():
+        if key.lower() == name:
+            return value
+    return None
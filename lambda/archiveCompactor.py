@@ -0,0 +1,131 @@
+import datetime
+import os
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from boto3.dynamodb.conditions import Attr
+from scan_engine import parallel_scan
+import history_archive
+import ddb
+import metrics
+
+# Dijalankan berkala (misal EventBridge Scheduler, cron(0 19 * * ? *) = 02:00 WIB):
+# memindahkan record kits-history yang lebih tua dari ARCHIVE_AFTER_DAYS ke file Parquet
+# per tanggal (lihat history_archive.py), lalu menandai record itu dengan archivedAt dan
+# expiresAt. TTL DynamoDB pada atribut 'expiresAt' (harus diaktifkan di HISTORY_TABLE)
+# menghapusnya setelah ARCHIVE_TTL_GRACE_DAYS, jadi penghapusan tidak memakan WCU.
+#
+# Urutan aman: file ditulis DULU, baru record ditandai. Jika run gagal di tengah jalan,
+# record yang belum ditandai diarsipkan lagi di run berikutnya (query() di
+# history_archive membuang salinan ganda). Penandaan bersyarat (status belum berubah
+# sejak dibaca), jadi pesanan yang berubah di tengah jalan tidak ikut kedaluwarsa.
+#
+# Butuh pyarrow (Layer). Event opsional {"olderThanDays": 30, "maxRecords": 50000}
+
+HISTORY_TABLE = os.environ.get('HISTORY_TABLE', 'kits-history')
+table = ddb.Table(HISTORY_TABLE)
+
+ARCHIVE_AFTER_DAYS = int(os.environ.get('ARCHIVE_AFTER_DAYS', '90'))
+ARCHIVE_TTL_GRACE_DAYS = int(os.environ.get('ARCHIVE_TTL_GRACE_DAYS', '7'))
+# Batas record per run (memori Lambda); sisanya dikerjakan run berikutnya
+ARCHIVE_MAX_RECORDS = int(os.environ.get('ARCHIVE_MAX_RECORDS', '100000'))
+ARCHIVE_WRITE_WORKERS = int(os.environ.get('ARCHIVE_WRITE_WORKERS', '16'))
+
+
+def cold_records(cutoff, max_records):
+    """ Record dengan createdAt < cutoff yang belum diarsipkan, maksimal max_records """
+    records = []
+    for record in parallel_scan(table, FilterExpression=Attr('createdAt').lt(cutoff) & Attr('archivedAt').not_exists()):
+        records.append(record)
+        if len(records) >= max_records:
+            break
+    return records
+
+
+def mark_archived(record, archived_at, expires_at):
+    """ Tandai record sudah diarsipkan (TTL menghapusnya nanti). False jika record berubah """
+    values = {':a': archived_at, ':e': expires_at}
+    condition = 'attribute_exists(orderId) AND attribute_not_exists(archivedAt) AND '
+    if record.get('status') is None:
+        condition += 'attribute_not_exists(#s)'
+    else:
+        condition += '#s = :s'
+        values[':s'] = record['status']
+    try:
+        table.update_item(
+            Key={'orderId': record['orderId']},
+            UpdateExpression='SET archivedAt = :a, expiresAt = :e',
+            ConditionExpression=condition,
+            ExpressionAttributeNames={'#s': 'status'},
+            ExpressionAttributeValues=values
+        )
+        return True
+    except Exception as e:
+        if ddb.error_code(e) != 'ConditionalCheckFailedException':
+            raise
+        return False
+
+
+@metrics.instrument('archiveCompactor')
+def compact_handler(event, context):
+    event = event or {}
+    history_archive.require_pyarrow()
+    older_than_days = int(event.get('olderThanDays', ARCHIVE_AFTER_DAYS))
+    max_records = int(event.get('maxRecords', ARCHIVE_MAX_RECORDS))
+
+    # createdAt disimpan sebagai waktu lokal tanpa zona (UTC di Lambda), dibandingkan sebagai string ISO
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cutoff = (now.replace(tzinfo=None) - datetime.timedelta(days=older_than_days)).isoformat()
+    with metrics.phase('scan'):
+        records = cold_records(cutoff, max_records)
+
+    by_date = defaultdict(list)
+    for record in records:
+        by_date[history_archive.partition_date(record)].append(record)
+
+    # 1. Satu file Parquet baru per tanggal
+    files = []
+    archived = []
+    failed_dates = []
+    with metrics.phase('write'):
+        for date, date_records in sorted(by_date.items()):
+            try:
+                path, size = history_archive.write_partition(date, date_records, compacted_at=now)
+            except Exception as e:
+                print(f"ERROR: Gagal menulis arsip {date}: {e}")
+                failed_dates.append(date)
+                continue
+            files.append({'path': path, 'records': len(date_records), 'bytes': size})
+            archived.extend(date_records)
+
+    # 2. Baru setelah file aman tersimpan: record ditandai dan diberi TTL
+    archived_at = now.isoformat()
+    expires_at = int(time.time()) + ARCHIVE_TTL_GRACE_DAYS * 24 * 3600
+    marked = changed = 0
+    errors = []
+    with metrics.phase('mark'):
+        with ThreadPoolExecutor(max_workers=ARCHIVE_WRITE_WORKERS) as executor:
+            futures = [(record['orderId'], executor.submit(mark_archived, record, archived_at, expires_at))
+                       for record in archived]
+            for order_id, future in futures:
+                try:
+                    if future.result():
+                        marked += 1
+                    else:
+                        changed += 1
+                except Exception as e:
+                    errors.append(order_id)
+                    print(f"ERROR: Gagal menandai {order_id}: {e}")
+
+    return {
+        'cutoff': cutoff,
+        'scanned': len(records),
+        'files': files,
+        'marked': marked,
+        # Berubah sejak dibaca: tetap di DynamoDB, diarsipkan ulang run berikutnya
+        'changed': changed,
+        'failedDates': failed_dates,
+        'failedOrders': errors[:100],
+        # True jika batas maxRecords tercapai: jalankan lagi untuk sisanya
+        'more': len(records) >= max_records
+    }
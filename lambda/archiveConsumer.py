@@ -0,0 +1,49 @@
+import json
+import os
+from decimal import Decimal
+import ddb
+import metrics
+
+# Consumer SQS antrian arsip checkout (lihat archive_queue.py dan Checkout.py).
+# Setiap batch (maks. 10 pesan) ditulis ke HISTORY_TABLE dengan SATU BatchWriteItem;
+# UnprocessedItems dicoba ulang dengan backoff (ddb.batch_write_items).
+#
+# Event source mapping: BatchSize 10 (boleh dengan MaximumBatchingWindowInSeconds agar
+# batch lebih penuh) dan FunctionResponseTypes: ReportBatchItemFailures. Hanya pesan
+# yang gagal dilaporkan, jadi hanya pesan itu yang dikirim ulang SQS; pasang DLQ
+# (maxReceiveCount) untuk pesan yang terus gagal, misal body rusak.
+#
+# Jika BatchWriteItem ditolak karena isi salah satu item, ddb.batch_write_items menulis
+# item satu per satu, jadi hanya pesan item yang rusak yang dikirim ulang.
+#
+# Menulis arsip idempoten (put dengan orderId yang sama), jadi pesan ganda aman.
+
+HISTORY_TABLE = os.environ.get('HISTORY_TABLE', 'kits-history')
+
+
+@metrics.instrument('archiveConsumer')
+def consumer_handler(event, context):
+    failures = []
+    # BatchWriteItem tidak boleh key ganda: satu item per orderId, pesan terakhir menang
+    latest = {}
+    message_ids = {}
+    for record in event.get('Records', []):
+        try:
+            item = json.loads(record['body'], parse_float=Decimal)
+            order_id = item['orderId']
+            if not isinstance(order_id, str) or not order_id:
+                raise ValueError(f'orderId harus string yang tidak kosong, bukan {order_id!r}')
+        except (KeyError, TypeError, ValueError) as e:
+            print(f"ERROR: Pesan {record.get('messageId')} tidak valid: {e}")
+            failures.append(record['messageId'])
+            continue
+        latest[order_id] = item
+        message_ids.setdefault(order_id, []).append(record['messageId'])
+
+    with metrics.phase('write'):
+        failed = ddb.batch_write_items(HISTORY_TABLE, list(latest.values()))
+    for item, message in failed:
+        print(f"ERROR: Gagal mengarsipkan {item['orderId']}: {message}")
+        failures.extend(message_ids[item['orderId']])
+
+    return {'batchItemFailures': [{'itemIdentifier': message_id} for message_id in failures]}
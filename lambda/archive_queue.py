@@ -0,0 +1,127 @@
+import os
+import threading
+import uuid
+from collections import deque
+
+import boto3
+from botocore.config import Config
+from api_response import dumps
+
+# Modul bersama (bukan handler Lambda): antrian arsip checkout.
+# Checkout mengirim record arsip ke antrian lalu langsung menjawab pembeli;
+# archiveConsumer.py menulisnya ke kits-history secara batch (BatchWriteItem).
+#
+# ARCHIVE_QUEUE_URL:
+# - URL SQS (https://sqs.<region>.amazonaws.com/<akun>/<nama>). Untuk ElasticMQ /
+#   SQS lokal, isi juga SQS_ENDPOINT_URL (misal http://localhost:9324)
+# - 'memory://<nama>': antrian in-memory di proses yang sama, untuk pengujian lokal;
+#   isinya diproses dengan drain_memory_queue(archiveConsumer.consumer_handler)
+# - kosong: antrian tidak dipakai, Checkout menulis langsung ke DynamoDB seperti dulu
+
+ARCHIVE_QUEUE_URL = os.environ.get('ARCHIVE_QUEUE_URL') or None
+SQS_ENDPOINT_URL = os.environ.get('SQS_ENDPOINT_URL') or None
+# Timeout pendek: send_message ada di jalur request pembeli (gagal = tulis langsung)
+SQS_CONNECT_TIMEOUT = float(os.environ.get('SQS_CONNECT_TIMEOUT', '1'))
+SQS_READ_TIMEOUT = float(os.environ.get('SQS_READ_TIMEOUT', '2'))
+
+# Batas pesan per ReceiveMessage / per batch event SQS
+MAX_BATCH = 10
+MEMORY_SCHEME = 'memory://'
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """ Client SQS, dibuat saat pertama kali dibutuhkan lalu di-cache """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                config = Config(
+                    tcp_keepalive=True,
+                    connect_timeout=SQS_CONNECT_TIMEOUT,
+                    read_timeout=SQS_READ_TIMEOUT,
+                    retries={'mode': 'standard', 'max_attempts': 2}
+                )
+                _client = boto3.client('sqs', endpoint_url=SQS_ENDPOINT_URL, config=config)
+    return _client
+
+
+class MemoryQueue:
+    """ Pengganti SQS di memori: pesan yang tidak di-ack kembali ke antrian (seperti visibility timeout) """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._messages = deque()
+        self.sent = 0
+
+    def send(self, body):
+        message_id = str(uuid.uuid4())
+        with self._lock:
+            self._messages.append({'messageId': message_id, 'body': body, 'receiveCount': 0})
+            self.sent += 1
+        return message_id
+
+    def receive(self, max_messages=MAX_BATCH):
+        with self._lock:
+            messages = [self._messages.popleft() for _ in range(min(max_messages, len(self._messages)))]
+        for message in messages:
+            message['receiveCount'] += 1
+        return messages
+
+    def requeue(self, messages):
+        with self._lock:
+            self._messages.extend(messages)
+
+    def __len__(self):
+        return len(self._messages)
+
+
+_memory_queues = {}
+
+
+def memory_queue(url=None):
+    """ Antrian in-memory untuk url 'memory://<nama>' (default ARCHIVE_QUEUE_URL) """
+    return _memory_queues.setdefault(url or ARCHIVE_QUEUE_URL, MemoryQueue())
+
+
+def enabled():
+    return bool(ARCHIVE_QUEUE_URL)
+
+
+def send(record):
+    """ Kirim satu record arsip ke antrian, kembalikan messageId """
+    body = dumps(record)
+    if ARCHIVE_QUEUE_URL.startswith(MEMORY_SCHEME):
+        return memory_queue().send(body)
+    return get_client().send_message(QueueUrl=ARCHIVE_QUEUE_URL, MessageBody=body)['MessageId']
+
+
+def sqs_event(messages):
+    """ Pesan -> event Lambda dengan bentuk yang sama seperti dari event source mapping SQS """
+    return {'Records': [{
+        'messageId': message['messageId'],
+        'body': message['body'],
+        'eventSource': 'aws:sqs',
+        'attributes': {'ApproximateReceiveCount': str(message['receiveCount'])},
+    } for message in messages]}
+
+
+def drain_memory_queue(handler, max_receives=3, batch_size=MAX_BATCH):
+    """
+    Proses antrian in-memory sampai kosong dengan handler consumer (batch <= 10).
+    Pesan di batchItemFailures dikirim ulang, maksimal max_receives kali (lalu
+    dibuang, seperti DLQ). Kembalikan {'batches', 'processed', 'dropped'}.
+    """
+    queue = memory_queue()
+    stats = {'batches': 0, 'processed': 0, 'dropped': 0}
+    while len(queue):
+        messages = queue.receive(batch_size)
+        response = handler(sqs_event(messages), None) or {}
+        failed = {failure['itemIdentifier'] for failure in response.get('batchItemFailures', [])}
+        retry = [message for message in messages if message['messageId'] in failed]
+        stats['batches'] += 1
+        stats['processed'] += len(messages) - len(retry)
+        stats['dropped'] += sum(1 for message in retry if message['receiveCount'] >= max_receives)
+        queue.requeue([message for message in retry if message['receiveCount'] < max_receives])
+    return stats
@@ -0,0 +1,176 @@
+from decimal import Decimal
+import ddb
+
+# Modul bersama (bukan handler Lambda): penyimpanan keranjang di CART_TABLE.
+#
+# Format penyimpanan: 'items' adalah MAP dengan key productId, misal
+#     {'userId': 'u1', 'items': {'p1': {'productId': 'p1', 'quantity': 2}}}
+# sehingga satu produk bisa ditambah/diubah/dihapus dengan SATU update_item
+# (SET items.#pid = :line / REMOVE items.#pid) tanpa membaca keranjang dulu.
+#
+# Keranjang lama yang 'items'-nya masih LIST dimigrasikan otomatis ke MAP
+# saat pertama kali diubah. API tetap mengembalikan 'items' sebagai list.
+
+# Berapa kali update diulang jika keranjang perlu dibuat/dimigrasikan dulu
+MAX_ATTEMPTS = 3
+
+# UpdateExpression DynamoDB dibatasi 4 KB; 100 perubahan per update masih jauh di bawahnya
+MAX_CHANGES_PER_UPDATE = 100
+
+
+def cart_lines(items):
+    """ Ubah atribut 'items' (MAP baru atau LIST lama) menjadi list baris keranjang """
+    if isinstance(items, dict):
+        return list(items.values())
+    return list(items or [])
+
+
+def cart_view(cart, user_id):
+    """ Bentuk respon API untuk satu keranjang (items selalu berupa list) """
+    cart = dict(cart or {'userId': user_id})
+    cart['items'] = cart_lines(cart.get('items'))
+    return cart
+
+
+def cart_detail(cart, user_id, products):
+    """
+    Keranjang lengkap untuk ditampilkan: setiap baris digabung dengan data produk
+    (name, price, imageUrl) + subtotal, ditambah total dan jumlah barang.
+    products: {productId: produk} hasil product_lookup.get_products.
+    Baris yang produknya sudah dihapus tidak ditampilkan (productId-nya dilaporkan
+    di 'removedProductIds').
+    """
+    view = cart_view(cart, user_id)
+    lines = []
+    removed = []
+    total = Decimal(0)
+    count = 0
+    for line in view['items']:
+        product = products.get(line['productId'])
+        if product is None:
+            removed.append(line['productId'])
+            continue
+        price = Decimal(str(product['price']))
+        quantity = Decimal(str(line['quantity']))
+        subtotal = price * quantity
+        lines.append({
+            'productId': line['productId'],
+            'name': product.get('name', ''),
+            'price': price,
+            'imageUrl': product.get('imageUrl', ''),
+            'quantity': quantity,
+            'subtotal': subtotal
+        })
+        total += subtotal
+        count += quantity
+    view['items'] = lines
+    view['total'] = total
+    view['itemCount'] = count
+    view['removedProductIds'] = removed
+    return view
+
+
+def _ensure_items_map(table, user_id):
+    """
+    Pastikan atribut 'items' ada dan bertipe MAP.
+    Dipanggil hanya jika update bersyarat gagal (keranjang belum ada / masih format list).
+    """
+    response = table.get_item(Key={'userId': user_id}, ConsistentRead=True)
+    items = response.get('Item', {}).get('items')
+    if isinstance(items, dict):
+        return
+
+    new_items = {line['productId']: line for line in cart_lines(items)}
+    if items is None:
+        condition = 'attribute_not_exists(#items)'
+        values = {':new': new_items}
+    else:
+        # Migrasi list -> map, hanya jika list-nya belum diubah orang lain
+        condition = '#items = :old'
+        values = {':new': new_items, ':old': items}
+
+    try:
+        table.update_item(
+            Key={'userId': user_id},
+            UpdateExpression='SET #items = :new',
+            ConditionExpression=condition,
+            ExpressionAttributeNames={'#items': 'items'},
+            ExpressionAttributeValues=values
+        )
+    except Exception as e:
+        # Request lain sudah membuat/memigrasikan keranjang duluan: tidak masalah
+        if ddb.error_code(e) != 'ConditionalCheckFailedException':
+            raise
+
+
+def apply_changes(table, user_id, changes):
+    """
+    Terapkan perubahan {productId: quantity} ke keranjang dalam SATU update_item
+    (per MAX_CHANGES_PER_UPDATE perubahan). quantity <= 0 berarti hapus produk.
+    Aman untuk request yang bersamaan: setiap produk diubah di path-nya sendiri.
+    Mengembalikan keranjang terbaru (format API).
+    """
+    changes = list(changes.items())
+    if not changes:
+        return cart_view(table.get_item(Key={'userId': user_id}).get('Item'), user_id)
+
+    for start in range(0, len(changes), MAX_CHANGES_PER_UPDATE):
+        cart = _apply_chunk(table, user_id, changes[start:start + MAX_CHANGES_PER_UPDATE])
+    return cart
+
+
+def replace_items(table, user_id, changes):
+    """
+    Ganti SELURUH isi keranjang dengan {productId: quantity} dalam satu update_item
+    (dipakai untuk sinkronisasi keranjang dari localStorage). quantity <= 0 diabaikan.
+    """
+    new_items = {
+        product_id: {'productId': product_id, 'quantity': quantity}
+        for product_id, quantity in changes.items() if quantity > 0
+    }
+    response = table.update_item(
+        Key={'userId': user_id},
+        UpdateExpression='SET #items = :new',
+        ExpressionAttributeNames={'#items': 'items'},
+        ExpressionAttributeValues={':new': new_items},
+        ReturnValues='ALL_NEW'
+    )
+    return cart_view(response.get('Attributes'), user_id)
+
+
+def _apply_chunk(table, user_id, changes):
+    names = {'#items': 'items'}
+    values = {':map': 'M'}
+    set_parts = []
+    remove_parts = []
+
+    for i, (product_id, quantity) in enumerate(changes):
+        names[f'#p{i}'] = product_id
+        if quantity > 0:
+            values[f':l{i}'] = {'productId': product_id, 'quantity': quantity}
+            set_parts.append(f'#items.#p{i} = :l{i}')
+        else:
+            remove_parts.append(f'#items.#p{i}')
+
+    update_expression = ''
+    if set_parts:
+        update_expression += 'SET ' + ', '.join(set_parts)
+    if remove_parts:
+        update_expression += ' REMOVE ' + ', '.join(remove_parts)
+
+    for attempt in range(MAX_ATTEMPTS):
+        try:
+            response = table.update_item(
+                Key={'userId': user_id},
+                UpdateExpression=update_expression.strip(),
+                # Path items.#pid hanya valid jika 'items' sudah berupa MAP
+                ConditionExpression='attribute_type(#items, :map)',
+                ExpressionAttributeNames=names,
+                ExpressionAttributeValues=values,
+                ReturnValues='ALL_NEW'
+            )
+            return cart_view(response.get('Attributes'), user_id)
+        except Exception as e:
+            if ddb.error_code(e) != 'ConditionalCheckFailedException' or attempt == MAX_ATTEMPTS - 1:
+                raise
+            _ensure_items_map(table, user_id)
@@ -0,0 +1,136 @@
+import datetime
+import os
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from boto3.dynamodb.conditions import Attr, Key
+from catalog_version import CATALOG_VERSION_KEY
+from list_params import decode_next_token, encode_next_token
+from scan_engine import build_projection
+
+# Modul bersama (bukan handler Lambda): sinkronisasi katalog inkremental (delta sync).
+#
+# Setiap penulisan produk (create/import/update/delete) mengambil nomor urut baru
+# (catalog_version.reserve_sync_version) dan menyimpannya di produk sebagai 'syncVersion',
+# bersama 'updatedAt' dan 'syncBucket'. DELETE tidak lagi menghapus item, tetapi
+# menggantinya dengan TOMBSTONE {'deleted': True, 'expiresAt': ...}; TTL DynamoDB
+# (atribut 'expiresAt') menghapusnya setelah PRODUCT_TOMBSTONE_TTL_SECONDS.
+#
+# GSI sparse PRODUCTS_VERSION_INDEX (partition key 'syncBucket', sort key 'syncVersion',
+# projection ALL) berisi semua produk yang pernah ditulis sejak fitur ini ada. Produk
+# dibagi ke CATALOG_SYNC_BUCKETS bucket (crc32 productId) agar import massal tidak
+# menumpuk di satu partisi GSI. GET /products?since=<versi> meng-query semua bucket
+# secara paralel: biaya sebanding jumlah PERUBAHAN, bukan ukuran katalog.
+#
+# Kursor ('version' di respon / header X-Sync-Version) hanya maju melewati perubahan
+# yang sudah 'mengendap' (updatedAt lebih tua dari CATALOG_SYNC_SETTLE_SECONDS), jadi
+# penulisan yang masih berjalan atau GSI yang tertinggal (eventually consistent) tidak
+# terlewat. Perubahan yang lebih baru ikut dikirim lagi di sync berikutnya (idempoten).
+
+PRODUCTS_VERSION_INDEX = os.environ.get('PRODUCTS_VERSION_INDEX', 'syncBucket-syncVersion-index')
+SYNC_BUCKETS = int(os.environ.get('CATALOG_SYNC_BUCKETS', '4'))
+SETTLE_SECONDS = float(os.environ.get('CATALOG_SYNC_SETTLE_SECONDS', '10'))
+TOMBSTONE_TTL_SECONDS = int(os.environ.get('PRODUCT_TOMBSTONE_TTL_SECONDS', str(7 * 24 * 3600)))
+
+# Atribut yang dibutuhkan untuk menghitung kursor / mengenali tombstone
+SYNC_FIELDS = ['syncVersion', 'updatedAt', 'deleted']
+
+
+def _timestamp(moment):
+    return moment.isoformat(timespec='milliseconds')
+
+
+def sync_bucket(product_id):
+    return f'products#{zlib.crc32(product_id.encode("utf-8")) % SYNC_BUCKETS}'
+
+
+def sync_attributes(product_id, sync_version):
+    """ Atribut sinkronisasi untuk produk yang ditulis dengan nomor urut sync_version """
+    return {
+        'syncVersion': sync_version,
+        'updatedAt': _timestamp(datetime.datetime.now(datetime.timezone.utc)),
+        'syncBucket': sync_bucket(product_id),
+    }
+
+
+def stamp(item, sync_version):
+    """ Tambahkan atribut sinkronisasi ke item produk sebelum put_item """
+    item.update(sync_attributes(item['productId'], sync_version))
+    return item
+
+
+def tombstone(product_id, sync_version):
+    """ Item pengganti produk yang dihapus (dihapus otomatis oleh TTL DynamoDB) """
+    return dict(sync_attributes(product_id, sync_version), productId=product_id, deleted=True,
+                expiresAt=int(time.time()) + TOMBSTONE_TTL_SECONDS)
+
+
+def is_deleted(item):
+    return bool(item and item.get('deleted'))
+
+
+def live_products_filter():
+    """ FilterExpression untuk Scan tabel produk: tanpa item versi katalog dan tanpa tombstone """
+    return Attr('productId').ne(CATALOG_VERSION_KEY) & Attr('deleted').not_exists()
+
+
+def settled_cursor(items, since=0):
+    """
+    Kursor sync: syncVersion terbesar di antara items yang sudah mengendap
+    (updatedAt <= sekarang - SETTLE_SECONDS). Tidak pernah lebih kecil dari since.
+    """
+    cutoff = _timestamp(datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(seconds=SETTLE_SECONDS))
+    cursor = since
+    for item in items:
+        version = item.get('syncVersion')
+        updated_at = item.get('updatedAt')
+        if version is not None and updated_at and updated_at <= cutoff and version > cursor:
+            cursor = int(version)
+    return cursor
+
+
+def changes_since(table, since, limit, token=None, fields=None):
+    """
+    Satu halaman perubahan dengan syncVersion > since dari semua bucket.
+    Mengembalikan (items, next_token, cursor): items terurut per syncVersion (tombstone
+    ikut, kenali dengan is_deleted); cursor hanya terisi di halaman TERAKHIR
+    (next_token None). Raise ValueError jika token tidak cocok.
+    """
+    if token:
+        state = decode_next_token(token)
+        if state.get('since') != since or not isinstance(state.get('buckets'), dict):
+            raise ValueError("nextToken tidak valid untuk parameter 'since' ini")
+    else:
+        state = {'since': since, 'cursor': since, 'buckets': {str(bucket): None for bucket in range(SYNC_BUCKETS)}}
+
+    buckets = state['buckets']
+    per_bucket = max(1, -(-limit // max(1, len(buckets))))
+    projection = None
+    if fields:
+        projection = build_projection(list(dict.fromkeys(['productId', 'syncBucket'] + list(fields) + SYNC_FIELDS)))
+
+    def query(bucket):
+        kwargs = {
+            'IndexName': PRODUCTS_VERSION_INDEX,
+            'KeyConditionExpression': Key('syncBucket').eq(f'products#{bucket}') & Key('syncVersion').gt(since),
+            'Limit': per_bucket,
+        }
+        if projection:
+            kwargs['ProjectionExpression'], kwargs['ExpressionAttributeNames'] = projection
+        if buckets[bucket]:
+            kwargs['ExclusiveStartKey'] = buckets[bucket]
+        return bucket, table.query(**kwargs)
+
+    items = []
+    remaining = {}
+    with ThreadPoolExecutor(max_workers=max(1, len(buckets))) as executor:
+        for bucket, response in executor.map(query, list(buckets)):
+            items.extend(response.get('Items', []))
+            if response.get('LastEvaluatedKey'):
+                remaining[bucket] = response['LastEvaluatedKey']
+
+    items.sort(key=lambda item: (item.get('syncVersion', 0), item['productId']))
+    cursor = settled_cursor(items, int(state.get('cursor', since)))
+    if remaining:
+        return items, encode_next_token({'since': since, 'cursor': cursor, 'buckets': remaining}), None
+    return items, None, cursor
@@ -0,0 +1,48 @@
+from decimal import Decimal
+
+# Modul bersama (bukan handler Lambda): penghitung versi katalog produk.
+# Disimpan sebagai SATU item khusus di tabel produk. Setiap penulisan produk
+# (create/update/delete) menaikkan versi ini, sehingga cache di getProduct
+# (dan ETag yang dikirim ke browser) otomatis tidak berlaku lagi.
+
+CATALOG_VERSION_KEY = '__catalog_version__'
+
+
+def get_catalog_version(table):
+    """ Baca versi katalog saat ini (0 jika belum pernah ada penulisan) """
+    # Dibaca di SETIAP request getProduct: hedged agar ekor latensinya tidak ikut ke semua request
+    response = table.hedged_get_item(
+        Key={'productId': CATALOG_VERSION_KEY},
+        ProjectionExpression='#v',
+        ExpressionAttributeNames={'#v': 'version'}
+    )
+    return int(response.get('Item', {}).get('version', 0))
+
+
+def bump_catalog_version(table):
+    """ Naikkan versi katalog secara atomik (ADD), kembalikan versi baru """
+    response = table.update_item(
+        Key={'productId': CATALOG_VERSION_KEY},
+        UpdateExpression='ADD #v :one',
+        ExpressionAttributeNames={'#v': 'version'},
+        ExpressionAttributeValues={':one': Decimal(1)},
+        ReturnValues='UPDATED_NEW'
+    )
+    return int(response['Attributes']['version'])
+
+
+def reserve_sync_version(table):
+    """
+    Ambil nomor urut perubahan produk berikutnya (atribut 'syncVersion' di item yang
+    sama, ADD atomik). Dipanggil SEBELUM produk ditulis, nomornya disimpan di produk
+    (lihat catalog_sync.py). Berbeda dari 'version' yang dinaikkan SETELAH penulisan
+    agar cache berbasis versi tidak pernah menyimpan data lama dengan versi baru.
+    """
+    response = table.update_item(
+        Key={'productId': CATALOG_VERSION_KEY},
+        UpdateExpression='ADD #v :one',
+        ExpressionAttributeNames={'#v': 'syncVersion'},
+        ExpressionAttributeValues={':one': Decimal(1)},
+        ReturnValues='UPDATED_NEW'
+    )
+    return int(response['Attributes']['syncVersion'])
@@ -1,70 +1,58 @@
-import boto3
 import json
 import os
-import uuid
-import datetime
 from decimal import Decimal
+from api_response import create_response
+from order_model import parse_order_request, price_line_items, new_order
+from product_lookup import get_products
+from inventory import OutOfStock, reserve_items, release_items, reserved_quantities
+import ddb
+import metrics
 
-# Inisialisasi DynamoDB resource
-dynamodb = boto3.resource('dynamodb')
 ORDERS_TABLE = os.environ.get('ORDERS_TABLE')
-table = dynamodb.Table(ORDERS_TABLE)
-
-# --- FUNGSI HELPER (PASTIKAN INI ADA) ---
-class DecimalEncoder(json.JSONEncoder):
-    def default(self, obj):
-        if isinstance(obj, Decimal):
-            return int(obj) if obj % 1 == 0 else float(obj)
-        return super(DecimalEncoder, self).default(obj)
-
-def create_response(status_code, body):
-    return {
-        'statusCode': status_code,
-        'headers': {
-            'Content-Type': 'application/json',
-            'Access-Control-Allow-Origin': '*'  # <-- INI BAGIAN PENTING UNTUK CORS
-        },
-        'body': json.dumps(body, cls=DecimalEncoder)
-    }
+table = ddb.Table(ORDERS_TABLE)
 
 # --- FUNGSI HANDLER UTAMA ---
+@metrics.instrument('createOrders')
 def lambda_handler(event, context):
     
     try:
-        data = json.loads(event['body'])
-        user_id = data['userId']
-        items = data['items']
-        
-        # ---!! PASTIKAN ANDA MENGAMBIL DATA BARU INI !! ---
-        nama_pelanggan = data.get('nama', 'N/A')
-        alamat_pelanggan = data.get('alamat', 'N/A')
-        metode_pembayaran = data.get('metodePembayaran', 'N/A')
+        # parse_float=Decimal: harga berkoma dari JSON langsung jadi Decimal (DynamoDB menolak float)
+        with metrics.phase('parse'):
+            data = json.loads(event['body'], parse_float=Decimal)
+        # userId, items, dan data baru (nama, alamat, metodePembayaran)
+        order_request = parse_order_request(data)
         
     except Exception as e:
         # Jika JSON tidak valid, ini akan CRASH dan log ke CloudWatch
         print(f"JSON Body tidak valid: {e}")
         return create_response(400, {'message': f"Body JSON tidak valid: {str(e)}"})
 
+    try:
+        # Harga diambil dari tabel produk (satu BatchGetItem), BUKAN dari harga kiriman client
+        products = get_products([item['productId'] for item in order_request['items']])
+        order_request['items'] = price_line_items(order_request['items'], products)
+    except ValueError as e:
+        return create_response(400, {'message': str(e)})
+    except Exception as e:
+        print(f"Error saat membaca produk: {e}")
+        return create_response(500, {'message': f"Error internal server: {str(e)}"})
+
+    try:
+        # Kurangi stok (ADD bersyarat per shard) SEBELUM pesanan disimpan: tidak ada overselling
+        reservation = reserve_items(order_request['items'])
+    except OutOfStock as e:
+        return create_response(409, {'message': str(e), 'productId': e.product_id,
+                                     'requested': e.requested, 'available': e.available})
+    except Exception as e:
+        print(f"Error saat reservasi stok: {e}")
+        return create_response(500, {'message': f"Error internal server: {str(e)}"})
+
     try:
         # Hitung total harga di backend
-        total_price = sum(Decimal(str(item['price'])) * Decimal(str(item['quantity'])) for item in items)
-        
-        order_id = str(uuid.uuid4())
-        created_at = datetime.datetime.now().isoformat()
-        
-        order_item = {
-            'orderId': order_id,
-            'userId': user_id,
-            'items': items,
-            'totalPrice': total_price,
-            'status': 'PENDING', # Status awal pesanan
-            'createdAt': created_at,
-            
-            # ---!! PASTIKAN ANDA MENYIMPAN DATA BARU INI !! ---
-            'customerName': nama_pelanggan,
-            'shippingAddress': alamat_pelanggan,
-            'paymentMethod': metode_pembayaran
-        }
+        order_item = new_order(**order_request)
+        if reservation:
+            # Dipakai orderStream.py untuk mengembalikan stok jika pesanan dibatalkan
+            order_item['reservedStock'] = reserved_quantities(reservation)
         
         # Simpan pesanan baru ke DynamoDB
         table.put_item(Item=order_item)
@@ -75,4 +63,6 @@ def lambda_handler(event, context):
     except Exception as e:
         # Jika ada error lain (misal DDB gagal), ini akan CRASH
         print(f"Error saat menyimpan ke DDB: {e}")
-        return create_response(500, {'message': f"Error internal server: {str(e)}"})
\ No newline at end of file
+        # Pesanan tidak tersimpan: stok yang sudah diambil dikembalikan
+        release_items(reservation)
+        return create_response(500, {'message': f"Error internal server: {str(e)}"})
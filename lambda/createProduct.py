@@ -1,77 +1,217 @@
-import boto3
+import base64
 import json
 import os
 import uuid
-from decimal import Decimal
-
-# Inisialisasi DynamoDB resource menggunakan Boto3
-# 'resource' adalah high-level API yang lebih mudah dipakai daripada 'client'
-dynamodb = boto3.resource('dynamodb')
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal, InvalidOperation
+from catalog_version import bump_catalog_version, reserve_sync_version, CATALOG_VERSION_KEY
+from catalog_sync import stamp
+from search_index import sync_after_write
+from inventory import parse_stock, set_stock
+from api_response import create_response, get_header
+import ddb
+import metrics
 
 # Ambil nama tabel dari environment variable yang Anda set di Lambda
 PRODUCTS_TABLE = os.environ.get('PRODUCTS_TABLE')
-table = dynamodb.Table(PRODUCTS_TABLE)
+table = ddb.Table(PRODUCTS_TABLE)
 
-# --- Helper Functions ---
+# Import massal: batas baris per request dan jumlah batch BatchWriteItem yang dikirim paralel
+MAX_IMPORT_ROWS = int(os.environ.get('MAX_IMPORT_ROWS', '10000'))
+IMPORT_WRITE_WORKERS = int(os.environ.get('IMPORT_WRITE_WORKERS', '8'))
 
-class DecimalEncoder(json.JSONEncoder):
-    """
-    Helper class untuk mengubah tipe data Decimal dari DynamoDB
-    menjadi float/int agar bisa di-serialize oleh json.dumps()
-    """
-    def default(self, obj):
-        if isinstance(obj, Decimal):
-            # Konversi ke int jika tidak ada koma, jika tidak, ke float
-            return int(obj) if obj % 1 == 0 else float(obj)
-        return super(DecimalEncoder, self).default(obj)
+# (Tambahkan kode Prasyarat dari atas di sini)
 
-def create_response(status_code, body):
+def build_product(data, product_id=None):
     """
-    Fungsi helper untuk membuat respon standar 
-    yang dimengerti oleh API Gateway (Lambda Proxy Integration)
+    Validasi data produk dan bentuk item DynamoDB.
+    Raise ValueError jika tidak valid. Dipakai untuk produk tunggal maupun import massal.
     """
+    # Validasi input sederhana
+    if not isinstance(data, dict) or 'name' not in data or 'price' not in data:
+        raise ValueError("Field 'name' dan 'price' wajib diisi")
+
+    try:
+        # Penting: DynamoDB butuh tipe data Decimal untuk angka
+        # Konversi int/float dari JSON ke Decimal
+        price = Decimal(str(data['price']))
+    except InvalidOperation:
+        raise ValueError("Field 'price' harus berupa angka")
+    if not price.is_finite():
+        raise ValueError("Field 'price' harus berupa angka")
+
     return {
-        'statusCode': status_code,
-        'headers': {
-            'Content-Type': 'application/json',
-            'Access-Control-Allow-Origin': '*',  # Aktifkan CORS untuk pengembangan
-        },
-        # Gunakan encoder khusus kita untuk menangani tipe Decimal
-        'body': json.dumps(body, cls=DecimalEncoder)
+        # Buat ID unik menggunakan uuid
+        'productId': product_id or str(uuid.uuid4()),
+        'name': data['name'],
+        'description': data.get('description', ''), # .get() aman jika 'description' tidak ada
+        'price': price,
+        'imageUrl': data.get('imageUrl', '')
     }
 
-# (Tambahkan kode Prasyarat dari atas di sini)
+def read_body(event):
+    """ Body request sebagai string (API Gateway bisa mengirim body biner dalam base64) """
+    body = event.get('body') or ''
+    if event.get('isBase64Encoded'):
+        body = base64.b64decode(body).decode('utf-8')
+    return body
+
+def parse_body(event, body):
+    """
+    Kembalikan (rows, data): rows = list baris produk untuk import massal
+    (None jika ini request produk tunggal), data = body JSON yang sudah di-parse.
+    Format import: JSON array, {"products": [...]}, atau NDJSON (satu JSON per baris).
+    Baris NDJSON yang rusak dikembalikan sebagai ValueError agar dilaporkan per baris.
+    """
+    content_type = (get_header(event, 'Content-Type') or '').split(';')[0].strip().lower()
+    if content_type in ('application/x-ndjson', 'application/ndjson', 'application/jsonl'):
+        rows = []
+        for line in body.splitlines():
+            if not line.strip():
+                continue
+            try:
+                rows.append(json.loads(line, parse_float=Decimal))
+            except json.JSONDecodeError as e:
+                rows.append(ValueError(f'Baris JSON tidak valid: {e}'))
+        return rows, None
+
+    data = json.loads(body, parse_float=Decimal)
+    if isinstance(data, list):
+        return data, data
+    if isinstance(data, dict) and isinstance(data.get('products'), list):
+        return data['products'], data
+    return None, data
+
+def apply_stock(entry):
+    """ set_stock untuk satu (productId, (stock, shards)); pesan error atau None """
+    product_id, (stock, shards) = entry
+    try:
+        set_stock(product_id, stock, shards)
+    except Exception as e:
+        return str(e)
+    return None
 
+def write_chunk(items):
+    """
+    Tulis <= 25 produk dengan satu BatchWriteItem. Nomor urut sync diambil dan updatedAt
+    dicap TEPAT sebelum chunk ini ditulis (bukan sekali untuk seluruh import): kursor
+    sync hanya melewati nomor yang sudah mengendap, jadi chunk yang masih antre tidak boleh
+    memakai nomor (atau updatedAt) yang lebih lama. Kembalikan [(item, pesan_error)].
+    """
+    try:
+        sync_version = reserve_sync_version(table)
+    except Exception as e:
+        return [(item, str(e)) for item in items]
+    for item in items:
+        stamp(item, sync_version)
+    return ddb.batch_write_items(PRODUCTS_TABLE, items)
+
+def import_products(rows):
+    """ Validasi semua baris lalu tulis yang valid dengan BatchWriteItem. Kembalikan (hasil per baris, item yang tersimpan) """
+    results = []
+    valid = {}  # productId -> index hasil (upsert: productId yang sama, baris terakhir menang)
+    stocks = {}  # productId -> (stock, shards) untuk baris yang menyertakan 'stock'
+
+    for index, row in enumerate(rows):
+        try:
+            if isinstance(row, Exception):
+                raise row
+            product_id = row.get('productId') if isinstance(row, dict) else None
+            if product_id is not None and (not isinstance(product_id, str) or product_id == CATALOG_VERSION_KEY):
+                raise ValueError("Field 'productId' tidak valid")
+            item = build_product(row, product_id)
+            stock, shards = parse_stock(row)
+        except ValueError as e:
+            results.append({'row': index, 'status': 'invalid', 'message': str(e)})
+            continue
+
+        previous = valid.get(item['productId'])
+        if previous is not None:
+            results[previous]['status'] = 'skipped'
+            results[previous]['message'] = f"Digantikan oleh baris {index} (productId sama)"
+            results[previous].pop('item')
+        valid[item['productId']] = len(results)
+        stocks.pop(item['productId'], None)
+        if stock is not None:
+            stocks[item['productId']] = (stock, shards)
+        results.append({'row': index, 'status': 'created', 'productId': item['productId'], 'item': item})
+
+    items = [results[i]['item'] for i in valid.values()]
+    chunks = [items[i:i + ddb.BATCH_WRITE_LIMIT] for i in range(0, len(items), ddb.BATCH_WRITE_LIMIT)]
+    failed = []
+    with ThreadPoolExecutor(max_workers=IMPORT_WRITE_WORKERS) as executor:
+        for failures in executor.map(write_chunk, chunks):
+            failed.extend(failures)
+    for item, message in failed:
+        result = results[valid[item['productId']]]
+        result['status'] = 'failed'
+        result['message'] = message
+
+    # Stok (opsional) hanya untuk produk yang berhasil ditulis; beberapa produk sekaligus
+    pending = [(product_id, stock) for product_id, stock in stocks.items()
+               if results[valid[product_id]]['status'] == 'created']
+    if pending:
+        with ThreadPoolExecutor(max_workers=IMPORT_WRITE_WORKERS) as executor:
+            for (product_id, _), error in zip(pending, executor.map(apply_stock, pending)):
+                if error:
+                    results[valid[product_id]]['message'] = f"Produk tersimpan, tetapi stok gagal disimpan: {error}"
+
+    created = []
+    for result in results:
+        item = result.pop('item', None)
+        if item is not None and result['status'] == 'created':
+            created.append(item)
+    return results, created
+
+@metrics.instrument('createProduct')
 def create_Prod_handler(event, context):
     try:
         # Ambil data produk dari body permintaan
-        # event['body'] adalah string JSON
-        data = json.loads(event['body'])
-    except json.JSONDecodeError:
+        # event['body'] adalah string JSON (atau NDJSON untuk import massal)
+        with metrics.phase('parse'):
+            rows, data = parse_body(event, read_body(event))
+    except (json.JSONDecodeError, UnicodeDecodeError, ValueError):
         return create_response(400, {'message': 'Body JSON tidak valid'})
 
-    # Validasi input sederhana
-    if 'name' not in data or 'price' not in data:
-        return create_response(400, {'message': "Field 'name' dan 'price' wajib diisi"})
-
-    # Buat ID unik menggunakan uuid
-    product_id = str(uuid.uuid4())
-    
-    item = {
-        'productId': product_id,
-        'name': data['name'],
-        'description': data.get('description', ''), # .get() aman jika 'description' tidak ada
-        # Penting: DynamoDB butuh tipe data Decimal untuk angka
-        # Konversi int/float dari JSON ke Decimal
-        'price': Decimal(str(data['price'])),
-        'imageUrl': data.get('imageUrl', '')
-    }
+    # --- IMPORT MASSAL (array / NDJSON) ---
+    if rows is not None:
+        if not rows:
+            return create_response(400, {'message': 'Tidak ada produk untuk diimpor'})
+        if len(rows) > MAX_IMPORT_ROWS:
+            return create_response(400, {'message': f'Maksimal {MAX_IMPORT_ROWS} produk per request'})
+        try:
+            results, created = import_products(rows)
+            summary = {status: 0 for status in ('created', 'invalid', 'skipped', 'failed')}
+            for result in results:
+                summary[result['status']] += 1
+            if summary['created']:
+                # Satu kali naik versi (dan satu kali update indeks pencarian) untuk seluruh import
+                version = bump_catalog_version(table)
+                sync_after_write(upserts=created, catalog_version=version)
+            return create_response(200, {'summary': summary, 'results': results})
+        except Exception as e:
+            print(e)
+            return create_response(500, {'message': f"Error internal: {str(e)}"})
+
+    # --- PRODUK TUNGGAL ---
+    try:
+        item = build_product(data)
+        stock, stock_shards = parse_stock(data)
+    except ValueError as e:
+        return create_response(400, {'message': str(e)})
 
     try:
-        # Simpan item ke DynamoDB
+        # Simpan item ke DynamoDB, dengan nomor urut sync untuk GET /products?since=
+        stamp(item, reserve_sync_version(table))
         table.put_item(Item=item)
+        # Stok (opsional) disimpan terpisah sebagai counter yang di-shard (lihat inventory.py)
+        if stock is not None:
+            set_stock(item['productId'], stock, stock_shards)
+        # Naikkan versi katalog agar cache getProduct tidak basi, lalu perbarui indeks pencarian
+        version = bump_catalog_version(table)
+        sync_after_write(upserts=[item], catalog_version=version)
         # Kembalikan item yang baru dibuat
-        return create_response(201, item)
+        return create_response(201, item if stock is None else dict(item, stock=stock))
     except Exception as e:
         print(e)
-        return create_response(500, {'message': f"Error internal: {str(e)}"})
\ No newline at end of file
+        return create_response(500, {'message': f"Error internal: {str(e)}"})
@@ -0,0 +1,542 @@
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from decimal import Decimal
+
+import boto3
+from boto3.dynamodb.conditions import ConditionBase, ConditionExpressionBuilder
+from botocore.config import Config
+from botocore.exceptions import ConnectTimeoutError, ReadTimeoutError
+import metrics
+
+# Modul bersama (bukan handler Lambda): akses DynamoDB yang dioptimalkan untuk cold start.
+#
+# - Memakai client low-level (bukan boto3.resource yang lebih lambat dibuat dan lebih
+#   boros memori). Client dibuat SEKALI saat pertama kali dipakai (lazy), lalu di-cache
+#   untuk semua invocation berikutnya di container yang sama.
+# - Class Table di bawah meniru API boto3 Table yang sudah dipakai handler
+#   (get_item, put_item, query, ...), termasuk Key/Attr dari boto3.dynamodb.conditions,
+#   jadi kode handler tetap sama.
+#
+#     import ddb
+#     table = ddb.Table(os.environ.get('PRODUCTS_TABLE'))
+#
+# - Baca per key dibatasi sisa waktu invocation (lihat 'Batas waktu' di bawah), dan bisa
+#   memakai Table.hedged_get_item (lihat 'Hedged read').
+
+# Konfigurasi botocore (bisa diatur lewat environment variable)
+MAX_POOL_CONNECTIONS = int(os.environ.get('DDB_MAX_POOL_CONNECTIONS', '16'))
+MAX_ATTEMPTS = int(os.environ.get('DDB_MAX_ATTEMPTS', '3'))
+CONNECT_TIMEOUT = float(os.environ.get('DDB_CONNECT_TIMEOUT', '1'))
+READ_TIMEOUT = float(os.environ.get('DDB_READ_TIMEOUT', '3'))
+# Isi dengan URL DynamoDB Local (misal http://localhost:8000) untuk pengujian lokal
+ENDPOINT_URL = os.environ.get('DYNAMODB_ENDPOINT_URL') or None
+
+# --- Batas waktu (deadline) ---
+# Baca per key (GetItem / BatchGetItem, idempoten) dibatasi sisa waktu invocation
+# (metrics.remaining_time, dari context Lambda). Client utama boleh memakai sampai
+# (CONNECT_TIMEOUT + READ_TIMEOUT) x (MAX_ATTEMPTS + 1): 'max_attempts' botocore adalah
+# jumlah RETRY. Jika sisa waktu lebih kecil, baca per key memakai client dengan read
+# timeout dari DDB_TIMEOUT_TIERS dan 2 atau 1 percobaan total, atau langsung gagal dengan
+# DeadlineExceeded. Handler jadi sempat menjawab 503 sendiri (api_response.timeout_response)
+# alih-alih diputus Lambda dan menjadi 502 API Gateway.
+#
+# Operasi lain tetap memakai client utama: Scan/Query per halaman bisa lebih lama dari
+# tier terkecil, dan penulisan (misal UpdateItem ADD) tidak boleh di-retry setelah read
+# timeout yang lebih pendek karena mungkin sudah diterapkan. Scan/Query hanya langsung
+# gagal dengan DeadlineExceeded jika sisa waktu sudah habis.
+#
+# Timeout botocore berlaku per client, jadi setiap (tier, percobaan) punya client sendiri.
+# Sisa waktu di awal invocation hampir selalu sama (timeout fungsi), jadi satu container
+# praktis memakai satu client tier untuk baca per key, dibuat sekali lalu dipakai ulang.
+TIMEOUT_TIERS = sorted(float(value) for value in os.environ.get('DDB_TIMEOUT_TIERS', '0.2,0.5,1').split(','))
+# Waktu yang selalu disisakan untuk membentuk respon setelah panggilan DynamoDB terakhir
+DEADLINE_RESERVE = float(os.environ.get('DDB_DEADLINE_RESERVE', '0.2'))
+
+# Operasi baca per key yang boleh memakai client tier
+_POINT_READS = {'get_item', 'batch_get_item'}
+_DEADLINE_READS = {'query', 'scan'}
+
+_clients = {}
+_client_lock = threading.Lock()
+
+
+class DeadlineExceeded(Exception):
+    """ Sisa waktu invocation tidak cukup untuk satu panggilan DynamoDB lagi """
+
+
+def _create_client(connect_timeout, read_timeout, retries):
+    config = Config(
+        tcp_keepalive=True,
+        max_pool_connections=MAX_POOL_CONNECTIONS,
+        connect_timeout=connect_timeout,
+        read_timeout=read_timeout,
+        retries=dict(retries, mode='adaptive')
+    )
+    client = boto3.client('dynamodb', endpoint_url=ENDPOINT_URL, config=config)
+    # Hitung panggilan/waktu/ConsumedCapacity DynamoDB per invocation
+    metrics.install(client)
+    return client
+
+
+def _cached_client(key, create):
+    client = _clients.get(key)
+    if client is None:
+        with _client_lock:
+            client = _clients.get(key)
+            if client is None:
+                client = _clients[key] = create()
+    return client
+
+
+def get_client():
+    """ Client DynamoDB low-level (timeout penuh), dibuat saat pertama kali dibutuhkan lalu di-cache """
+    return _cached_client('default', lambda: _create_client(
+        CONNECT_TIMEOUT, READ_TIMEOUT, {'max_attempts': MAX_ATTEMPTS}))
+
+
+def _tier_client(read_timeout, total_attempts):
+    """ Client baca per key dengan read timeout tier dan total_attempts percobaan (termasuk yang pertama) """
+    return _cached_client((read_timeout, total_attempts), lambda: _create_client(
+        min(CONNECT_TIMEOUT, read_timeout), read_timeout, {'total_max_attempts': total_attempts}))
+
+
+def _attempt_seconds(read_timeout):
+    """ Waktu terlama satu percobaan: connect + read """
+    return min(CONNECT_TIMEOUT, read_timeout) + read_timeout
+
+
+def _budget():
+    """ Sisa waktu untuk DynamoDB (detik) setelah DEADLINE_RESERVE, None di luar Lambda """
+    remaining = metrics.remaining_time()
+    return None if remaining is None else remaining - DEADLINE_RESERVE
+
+
+def read_client():
+    """
+    Client untuk baca per key, sesuai sisa waktu invocation: client utama jika semua
+    percobaannya muat; jika tidak, tier dengan read timeout terbesar yang muat 2 percobaan,
+    lalu 1 percobaan dengan tier terkecil. Raise DeadlineExceeded jika tidak ada yang muat.
+    """
+    budget = _budget()
+    if budget is None or budget >= _attempt_seconds(READ_TIMEOUT) * (MAX_ATTEMPTS + 1):
+        return get_client()
+    for read_timeout in reversed(TIMEOUT_TIERS):
+        if budget >= _attempt_seconds(read_timeout) * 2:
+            return _tier_client(read_timeout, 2)
+    if budget >= _attempt_seconds(TIMEOUT_TIERS[0]):
+        return _tier_client(TIMEOUT_TIERS[0], 1)
+    raise DeadlineExceeded(f'Sisa waktu invocation {budget * 1000 + DEADLINE_RESERVE * 1000:.0f} ms, '
+                           'tidak cukup untuk DynamoDB')
+
+
+def client_for(operation):
+    """ Client untuk operasi Table (nama method botocore), lihat 'Batas waktu' di atas """
+    if operation in _POINT_READS:
+        return read_client()
+    if operation in _DEADLINE_READS:
+        budget = _budget()
+        if budget is not None and budget <= 0:
+            raise DeadlineExceeded(f'Sisa waktu invocation habis, {operation} tidak dijalankan')
+    return get_client()
+
+
+def is_timeout(error):
+    """ True jika error karena batas waktu (deadline atau timeout koneksi/baca) """
+    return isinstance(error, (DeadlineExceeded, ReadTimeoutError, ConnectTimeoutError))
+
+
+# --- Konversi tipe Python <-> tipe DynamoDB ---
+
+def serialize(value):
+    """ Ubah nilai Python menjadi AttributeValue DynamoDB, misal 'a' -> {'S': 'a'} """
+    value_type = type(value)
+    if value_type is str:
+        return {'S': value}
+    if value_type is bool:
+        return {'BOOL': value}
+    if value_type is int or value_type is Decimal:
+        return {'N': str(value)}
+    if value_type is dict:
+        return {'M': {k: serialize(v) for k, v in value.items()}}
+    if value_type is list or value_type is tuple:
+        return {'L': [serialize(v) for v in value]}
+    if value is None:
+        return {'NULL': True}
+    if value_type is bytes or value_type is bytearray:
+        return {'B': bytes(value)}
+    if value_type is set or value_type is frozenset:
+        if all(type(v) is str for v in value):
+            return {'SS': list(value)}
+        if all(type(v) in (int, Decimal) for v in value):
+            return {'NS': [str(v) for v in value]}
+        if all(type(v) in (bytes, bytearray) for v in value):
+            return {'BS': [bytes(v) for v in value]}
+    if value_type is float:
+        raise TypeError('Tipe float tidak didukung DynamoDB, gunakan Decimal(str(nilai))')
+    raise TypeError(f'Tipe {value_type.__name__} tidak didukung DynamoDB')
+
+
+def _number(text):
+    # Angka bulat dikembalikan sebagai int (langsung bisa di-serialize ke JSON tanpa
+    # DecimalEncoder), angka berkoma tetap Decimal agar tidak kehilangan presisi.
+    if '.' in text or 'e' in text or 'E' in text:
+        return Decimal(text)
+    return int(text)
+
+
+def deserialize(attribute_value):
+    """ Kebalikan dari serialize: {'S': 'a'} -> 'a' """
+    (type_key, value), = attribute_value.items()
+    if type_key == 'S':
+        return value
+    if type_key == 'N':
+        return _number(value)
+    if type_key == 'M':
+        return {k: deserialize(v) for k, v in value.items()}
+    if type_key == 'L':
+        return [deserialize(v) for v in value]
+    if type_key == 'BOOL':
+        return value
+    if type_key == 'NULL':
+        return None
+    if type_key == 'SS':
+        return set(value)
+    if type_key == 'NS':
+        return set(_number(v) for v in value)
+    if type_key == 'B':
+        return bytes(value)
+    if type_key == 'BS':
+        return set(bytes(v) for v in value)
+    raise TypeError(f'Tipe DynamoDB {type_key} tidak dikenal')
+
+
+def serialize_item(item):
+    return {k: serialize(v) for k, v in item.items()}
+
+
+def deserialize_item(item):
+    return {k: deserialize(v) for k, v in item.items()}
+
+
+# Parameter yang berisi item/key utuh (map nama -> nilai)
+_ITEM_PARAMS = ('Key', 'Item', 'ExclusiveStartKey', 'ExpressionAttributeValues')
+# Parameter yang boleh berupa objek Key(...)/Attr(...) dari boto3.dynamodb.conditions
+_CONDITION_PARAMS = ('KeyConditionExpression', 'FilterExpression', 'ConditionExpression')
+
+
+def serialize_params(params):
+    """ Siapkan parameter gaya boto3 Table (nilai Python) untuk client low-level """
+    params = dict(params)
+    builder = None
+    for name in _CONDITION_PARAMS:
+        condition = params.get(name)
+        if isinstance(condition, ConditionBase):
+            builder = builder or ConditionExpressionBuilder()
+            built = builder.build_expression(condition, is_key_condition=(name == 'KeyConditionExpression'))
+            params[name] = built.condition_expression
+            if built.attribute_name_placeholders:
+                params['ExpressionAttributeNames'] = dict(
+                    params.get('ExpressionAttributeNames', {}), **built.attribute_name_placeholders)
+            if built.attribute_value_placeholders:
+                params['ExpressionAttributeValues'] = dict(
+                    params.get('ExpressionAttributeValues', {}), **built.attribute_value_placeholders)
+    for name in _ITEM_PARAMS:
+        if name in params:
+            params[name] = serialize_item(params[name])
+    return params
+
+
+def deserialize_response(response):
+    """ Ubah item-item pada respon client low-level menjadi nilai Python """
+    for name in ('Item', 'Attributes', 'LastEvaluatedKey'):
+        if name in response:
+            response[name] = deserialize_item(response[name])
+    if 'Items' in response:
+        response['Items'] = [deserialize_item(item) for item in response['Items']]
+    return response
+
+
+class Table:
+    """
+    Pengganti ringan untuk boto3.resource('dynamodb').Table(name).
+    Membuat objek ini TIDAK membuat koneksi apa pun; client baru dibuat saat
+    method pertama dipanggil (lalu di-cache, lihat get_client), jadi aman dibuat di
+    level modul handler. Aman dipakai dari beberapa thread.
+    """
+    def __init__(self, name):
+        self.name = name
+
+    def _call(self, operation, params):
+        params = serialize_params(params)
+        params['TableName'] = self.name
+        response = getattr(client_for(operation), operation)(**params)
+        return deserialize_response(response)
+
+    def get_item(self, **kwargs):
+        return self._call('get_item', kwargs)
+
+    def hedged_get_item(self, **kwargs):
+        """
+        get_item untuk baca per key (idempoten): jika belum ada jawaban setelah ~p95
+        latensi get_item tabel ini, request yang sama dikirim lagi dan jawaban yang
+        datang duluan dipakai. Lihat 'Hedged read' di bawah.
+        """
+        if not HEDGE_ENABLED:
+            return self.get_item(**kwargs)
+        return _hedged_get_item(self, kwargs)
+
+    def put_item(self, **kwargs):
+        return self._call('put_item', kwargs)
+
+    def update_item(self, **kwargs):
+        return self._call('update_item', kwargs)
+
+    def delete_item(self, **kwargs):
+        return self._call('delete_item', kwargs)
+
+    def query(self, **kwargs):
+        return self._call('query', kwargs)
+
+    def scan(self, **kwargs):
+        return self._call('scan', kwargs)
+
+
+def error_code(error):
+    """ Kode error DynamoDB (misal 'ConditionalCheckFailedException') dari exception botocore """
+    response = getattr(error, 'response', None) or {}
+    return response.get('Error', {}).get('Code')
+
+
+def transact_write_items(operations, **kwargs):
+    """
+    TransactWriteItems dengan parameter gaya Table, misal
+        [{'Put': {'TableName': 'orders', 'Item': {...}, 'ConditionExpression': ...}},
+         {'Delete': {'TableName': 'cart', 'Key': {'userId': 'u1'}}}]
+    Semua operasi berhasil bersama, atau gagal bersama.
+    """
+    transact_items = []
+    for operation in operations:
+        (action, params), = operation.items()
+        transact_items.append({action: serialize_params(params)})
+    return get_client().transact_write_items(TransactItems=transact_items, **kwargs)
+
+
+# BatchGetItem dibatasi 100 key per request
+BATCH_GET_LIMIT = 100
+# Percobaan ulang untuk UnprocessedKeys/UnprocessedItems (dengan backoff eksponensial)
+BATCH_MAX_RETRIES = int(os.environ.get('DDB_BATCH_MAX_RETRIES', '5'))
+BATCH_BASE_DELAY = 0.05
+
+
+def _backoff(attempt):
+    # Jitter acak agar banyak container tidak mencoba ulang di saat yang sama
+    time.sleep(BATCH_BASE_DELAY * (2 ** attempt) * (0.5 + random.random() / 2))
+
+
+def _get_chunk(table_name, request, keys):
+    """ Ambil <= 100 key, coba ulang UnprocessedKeys dengan backoff """
+    items = []
+    pending = dict(request, Keys=[serialize_item(key) for key in keys])
+    for attempt in range(BATCH_MAX_RETRIES + 1):
+        response = read_client().batch_get_item(RequestItems={table_name: pending})
+        items.extend(deserialize_item(item) for item in response.get('Responses', {}).get(table_name, []))
+        pending = response.get('UnprocessedKeys', {}).get(table_name)
+        if not pending:
+            return items
+        if attempt == BATCH_MAX_RETRIES:
+            raise RuntimeError(f'BatchGetItem: {len(pending["Keys"])} key tetap tidak terproses')
+        _backoff(attempt)
+    return items
+
+
+def batch_get_items(table_name, keys, projection=None, consistent_read=False, max_workers=4):
+    """
+    Ambil banyak item sekaligus dengan BatchGetItem.
+    - keys dipecah per 100 (batas DynamoDB); beberapa chunk dikirim paralel
+    - UnprocessedKeys dicoba ulang dengan backoff
+    - projection: daftar field yang ingin diambil saja (opsional)
+    Mengembalikan list item (urutan tidak dijamin, key yang tidak ada dilewati).
+    """
+    request = {'ConsistentRead': consistent_read}
+    if projection:
+        request['ProjectionExpression'] = ', '.join(f'#f{i}' for i in range(len(projection)))
+        request['ExpressionAttributeNames'] = {f'#f{i}': field for i, field in enumerate(projection)}
+
+    chunks = [keys[i:i + BATCH_GET_LIMIT] for i in range(0, len(keys), BATCH_GET_LIMIT)]
+    if len(chunks) <= 1 or max_workers <= 1:
+        return [item for chunk in chunks for item in _get_chunk(table_name, request, chunk)]
+
+    items = []
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for chunk_items in executor.map(lambda chunk: _get_chunk(table_name, request, chunk), chunks):
+            items.extend(chunk_items)
+    return items
+
+
+# BatchWriteItem dibatasi 25 item per request
+BATCH_WRITE_LIMIT = 25
+
+
+def _put_each(table_name, items):
+    """ put_item satu per satu; kembalikan [(item, pesan_error)] yang gagal """
+    failed = []
+    for item in items:
+        try:
+            get_client().put_item(TableName=table_name, Item=serialize_item(item))
+        except Exception as e:
+            failed.append((item, str(e)))
+    return failed
+
+
+def _write_chunk(table_name, items):
+    """ Tulis <= 25 item, coba ulang UnprocessedItems. Kembalikan [(item, pesan_error)] yang gagal """
+    try:
+        pending = [{'PutRequest': {'Item': serialize_item(item)}} for item in items]
+        for attempt in range(BATCH_MAX_RETRIES + 1):
+            response = get_client().batch_write_item(RequestItems={table_name: pending})
+            pending = response.get('UnprocessedItems', {}).get(table_name)
+            if not pending:
+                return []
+            if attempt < BATCH_MAX_RETRIES:
+                _backoff(attempt)
+        return [(deserialize_item(request['PutRequest']['Item']), 'Tidak terproses setelah retry')
+                for request in pending]
+    except Exception as e:
+        # Seluruh request ditolak karena ISI-nya (misal satu key bertipe salah): tulis satu
+        # per satu agar hanya item yang rusak yang dilaporkan gagal. Error lain (throttling,
+        # jaringan): semua item di chunk ini dianggap gagal
+        if len(items) > 1 and (error_code(e) == 'ValidationException' or isinstance(e, (TypeError, ValueError))):
+            return _put_each(table_name, items)
+        return [(item, str(e)) for item in items]
+
+
+def batch_write_items(table_name, items, max_workers=4):
+    """
+    Tulis (put) banyak item dengan BatchWriteItem: dipecah per 25 item,
+    beberapa chunk dikirim paralel, UnprocessedItems dicoba ulang dengan backoff.
+    Item dalam satu panggilan tidak boleh punya key yang sama.
+    Mengembalikan list (item, pesan_error) untuk item yang GAGAL ditulis.
+    """
+    chunks = [items[i:i + BATCH_WRITE_LIMIT] for i in range(0, len(items), BATCH_WRITE_LIMIT)]
+    if len(chunks) <= 1 or max_workers <= 1:
+        return [failure for chunk in chunks for failure in _write_chunk(table_name, chunk)]
+
+    failed = []
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for failures in executor.map(lambda chunk: _write_chunk(table_name, chunk), chunks):
+            failed.extend(failures)
+    return failed
+
+
+# --- Hedged read ---
+# Ekor latensi DynamoDB (GC, partisi sibuk, koneksi lambat) biasanya menimpa satu request
+# saja. Untuk get_item yang idempoten, request kedua yang dikirim setelah ~p95 latensi
+# biasanya menjawab jauh lebih cepat daripada menunggu yang pertama; biayanya hanya
+# ~5% baca tambahan. Jumlah hedge dibatasi HEDGE_MAX_RATIO dari semua panggilan agar
+# saat DynamoDB memang lambat secara merata, beban tidak ikut berlipat.
+HEDGE_ENABLED = os.environ.get('DDB_HEDGE', '1') != '0'
+HEDGE_PERCENTILE = float(os.environ.get('DDB_HEDGE_PERCENTILE', '95'))
+# Delay sebelum cukup sampel latensi, dan batas bawah delay
+HEDGE_DEFAULT_DELAY = float(os.environ.get('DDB_HEDGE_DELAY_MS', '50')) / 1000
+HEDGE_MIN_DELAY = float(os.environ.get('DDB_HEDGE_MIN_DELAY_MS', '5')) / 1000
+HEDGE_MAX_RATIO = float(os.environ.get('DDB_HEDGE_MAX_RATIO', '0.1'))
+HEDGE_WORKERS = int(os.environ.get('DDB_HEDGE_WORKERS', '8'))
+_HEDGE_SAMPLES = 256
+_HEDGE_MIN_SAMPLES = 20
+_HEDGE_BURST = 5
+
+# Penghitung sejak container dibuat (per invocation: DynamoDBHedges/DynamoDBHedgesWon di metrics)
+hedge_stats = {'calls': 0, 'fired': 0, 'won': 0}
+
+_hedge_lock = threading.Lock()
+_hedge_tokens = float(_HEDGE_BURST)
+_hedge_executor = None
+_latency_windows = {}
+
+
+class _LatencyWindow:
+    """ Latensi get_item terakhir satu tabel; delay hedge = persentil HEDGE_PERCENTILE """
+    def __init__(self):
+        self._samples = deque(maxlen=_HEDGE_SAMPLES)
+        self._delay = HEDGE_DEFAULT_DELAY
+        self._added = 0
+
+    def add(self, seconds):
+        with _hedge_lock:
+            self._samples.append(seconds)
+            self._added += 1
+            # Hitung ulang sesekali saja, bukan di setiap panggilan
+            if len(self._samples) >= _HEDGE_MIN_SAMPLES and self._added % 16 == 0:
+                ordered = sorted(self._samples)
+                index = min(len(ordered) - 1, int(len(ordered) * HEDGE_PERCENTILE / 100))
+                self._delay = max(HEDGE_MIN_DELAY, ordered[index])
+
+    @property
+    def delay(self):
+        return self._delay
+
+
+def _hedge_pool():
+    global _hedge_executor
+    if _hedge_executor is None:
+        with _hedge_lock:
+            if _hedge_executor is None:
+                _hedge_executor = ThreadPoolExecutor(max_workers=HEDGE_WORKERS, thread_name_prefix='ddb-hedge')
+    return _hedge_executor
+
+
+def _take_hedge_token():
+    """ Token bucket: setiap panggilan menambah HEDGE_MAX_RATIO token, satu hedge memakai satu """
+    global _hedge_tokens
+    with _hedge_lock:
+        if _hedge_tokens < 1:
+            return False
+        _hedge_tokens -= 1
+        hedge_stats['fired'] += 1
+        return True
+
+
+def _hedged_get_item(table, kwargs):
+    global _hedge_tokens
+    window = _latency_windows.get(table.name)
+    if window is None:
+        window = _latency_windows.setdefault(table.name, _LatencyWindow())
+    with _hedge_lock:
+        hedge_stats['calls'] += 1
+        _hedge_tokens = min(_HEDGE_BURST, _hedge_tokens + HEDGE_MAX_RATIO)
+
+    def attempt():
+        start = time.perf_counter()
+        response = table.get_item(**kwargs)
+        window.add(time.perf_counter() - start)
+        return response
+
+    delay = window.delay
+    primary = _hedge_pool().submit(attempt)
+    done, _ = wait([primary], timeout=delay)
+    budget = _budget()
+    # Tidak perlu hedge: sudah dijawab, waktu invocation hampir habis, atau kuota hedge habis
+    if done or (budget is not None and budget < _attempt_seconds(TIMEOUT_TIERS[0])) or not _take_hedge_token():
+        return primary.result()
+
+    hedge = _hedge_pool().submit(attempt)
+    pending = {primary, hedge}
+    error = None
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                won = future is hedge
+                if won:
+                    with _hedge_lock:
+                        hedge_stats['won'] += 1
+                metrics.record_hedge(won)
+                # Request yang kalah dibiarkan selesai di background (tidak bisa dibatalkan)
+                return future.result()
+            error = future.exception()
+    metrics.record_hedge(False)
+    raise error
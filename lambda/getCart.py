@@ -1,37 +1,17 @@
-import boto3
-import json
 import os
-from decimal import Decimal
-
-# Inisialisasi DynamoDB resource
-dynamodb = boto3.resource('dynamodb')
+from api_response import create_response, timeout_response
+from cart_store import cart_view, cart_detail, cart_lines
+from product_lookup import get_products
+import ddb
+import metrics
 
 # Ambil nama tabel dari environment variable
 CART_TABLE = os.environ.get('CART_TABLE')
-table = dynamodb.Table(CART_TABLE)
-
-# --- Helper Functions ---
-
-class DecimalEncoder(json.JSONEncoder):
-    """ Helper untuk mengubah Decimal dari DynamoDB menjadi JSON """
-    def default(self, obj):
-        if isinstance(obj, Decimal):
-            return int(obj) if obj % 1 == 0 else float(obj)
-        return super(DecimalEncoder, self).default(obj)
-
-def create_response(status_code, body):
-    """ Helper untuk membuat respon API Gateway """
-    return {
-        'statusCode': status_code,
-        'headers': {
-            'Content-Type': 'application/json',
-            'Access-Control-Allow-Origin': '*',
-        },
-        'body': json.dumps(body, cls=DecimalEncoder)
-    }
+table = ddb.Table(CART_TABLE)
 
 # (Tambahkan kode Prasyarat dari atas di sini)
 
+@metrics.instrument('getCart')
 def get_handler(event, context):
     try:
         # Ambil userId dari path URL
@@ -39,20 +19,31 @@ def get_handler(event, context):
     except KeyError:
         return create_response(400, {'message': 'Missing userId di path'})
 
+    # ?view=raw -> hanya {productId, quantity} seperti yang disimpan (tanpa join produk)
+    query_params = event.get('queryStringParameters') or {}
+    raw = query_params.get('view') == 'raw'
+
     try:
-        response = table.get_item(
+        response = table.hedged_get_item(
             Key={'userId': user_id}
         )
         
         item = response.get('Item')
         
-        if item:
-            # Ditemukan, kembalikan data keranjang
-            return create_response(200, item)
-        else:
-            # Keranjang pengguna ini belum ada, kembalikan keranjang kosong
-            return create_response(200, {'userId': user_id, 'items': []})
+        # Jika keranjang belum ada, cart_view mengembalikan keranjang kosong.
+        # 'items' selalu berupa list, baik disimpan sebagai map (baru) maupun list (lama)
+        if raw:
+            return create_response(200, cart_view(item, user_id), event=event)
+
+        # Data produk (nama, harga, gambar) untuk SEMUA baris diambil sekaligus
+        # (BatchGetItem per 100 produk, paralel + cache), jadi frontend tidak perlu
+        # memanggil /products/{id} untuk setiap baris
+        product_ids = [line['productId'] for line in cart_lines((item or {}).get('items'))]
+        products = get_products(product_ids) if product_ids else {}
+        return create_response(200, cart_detail(item, user_id, products), event=event)
             
     except Exception as e:
         print(e)
+        if ddb.is_timeout(e):
+            return timeout_response()
         return create_response(500, {'message': f"Error internal: {str(e)}"})
\ No newline at end of file
@@ -1,36 +1,69 @@
-import boto3
-import json
 import os
-from decimal import Decimal
-from boto3.dynamodb.conditions import Key, Attr # Impor Attr untuk FilterExpression
-
-# Inisialisasi DynamoDB resource
-dynamodb = boto3.resource('dynamodb')
+from boto3.dynamodb.conditions import Key # Impor Key untuk KeyConditionExpression
+from scan_engine import parallel_scan, build_projection
+from api_response import create_response, timeout_response
+from list_params import encode_next_token, decode_next_token, parse_limit, parse_fields
+from order_model import ORDER_SUMMARY_FIELDS, item_count, order_summary
+import ddb
+import metrics
 
 # Ambil nama tabel dari environment variable
 ORDERS_TABLE = os.environ.get('ORDERS_TABLE')
-table = dynamodb.Table(ORDERS_TABLE)
-
-# --- Helper Functions (Sama seperti sebelumnya) ---
-
-class DecimalEncoder(json.JSONEncoder):
-    def default(self, obj):
-        if isinstance(obj, Decimal):
-            return int(obj) if obj % 1 == 0 else float(obj)
-        return super(DecimalEncoder, self).default(obj)
-
-def create_response(status_code, body):
-    return {
-        'statusCode': status_code,
-        'headers': {
-            'Content-Type': 'application/json',
-            'Access-Control-Allow-Origin': '*',
-        },
-        'body': json.dumps(body, cls=DecimalEncoder)
-    }
+table = ddb.Table(ORDERS_TABLE)
+
+# GSI untuk daftar pesanan per status.
+# Partition key: 'status' (String), Sort key: 'createdAt' (String), Projection: ALL
+ORDERS_STATUS_INDEX = os.environ.get('ORDERS_STATUS_INDEX', 'status-createdAt-index')
+
+# GSI untuk riwayat pesanan per pengguna.
+# Partition key: 'userId' (String), Sort key: 'createdAt' (String), Projection: ALL
+ORDERS_USER_INDEX = os.environ.get('ORDERS_USER_INDEX', 'userId-createdAt-index')
+
+# --- Helper Functions ---
+
+def parse_projection(query_params):
+    """
+    Field yang dibaca untuk endpoint daftar pesanan:
+    - view=summary      -> ORDER_SUMMARY_FIELDS (orderId, status, totalPrice, createdAt, itemCount)
+    - fields=a,b,c      -> hanya field tersebut (+ orderId)
+    - tanpa keduanya    -> semua field
+    Mengembalikan (fields atau None, summary?). Raise ValueError jika tidak valid.
+    """
+    view = query_params.get('view')
+    if view == 'summary':
+        return ORDER_SUMMARY_FIELDS, True
+    if view not in (None, 'full'):
+        raise ValueError("Parameter 'view' harus 'summary' atau 'full'")
+    return parse_fields(query_params.get('fields'), required=['orderId']), False
+
+def projection_kwargs(fields):
+    """ ProjectionExpression untuk Query/Scan (kosong = semua field) """
+    if not fields:
+        return {}
+    expression, names = build_projection(fields)
+    return {'ProjectionExpression': expression, 'ExpressionAttributeNames': names}
+
+def summarize_orders(items):
+    """
+    Bentuk ringkas pesanan. Pesanan lama belum punya 'itemCount':
+    hitung dari 'items' yang diambil sekaligus dengan BatchGetItem.
+    """
+    missing = [item['orderId'] for item in items if 'itemCount' not in item]
+    if missing:
+        lines = {
+            order['orderId']: order.get('items', [])
+            for order in ddb.batch_get_items(ORDERS_TABLE, [{'orderId': order_id} for order_id in missing],
+                                             projection=['orderId', 'items'])
+        }
+        items = [
+            item if 'itemCount' in item else dict(item, itemCount=item_count(lines.get(item['orderId'], [])))
+            for item in items
+        ]
+    return [order_summary(item) for item in items]
 
 # --- Fungsi Handler Utama (YANG DIMODIFIKASI) ---
 
+@metrics.instrument('getOrder')
 def get_handler(event, context):
     
     # Periksa apakah 'pathParameters' ada DAN 'orderId' ada di dalamnya
@@ -41,47 +74,113 @@ def get_handler(event, context):
         # ----------------------------------------------------
         try:
             order_id = event['pathParameters']['orderId']
-            response = table.get_item(
+            response = table.hedged_get_item(
                 Key={'orderId': order_id}
             )
             item = response.get('Item')
             
             if item:
-                return create_response(200, item)
+                return create_response(200, item, event=event)
             else:
                 return create_response(404, {'message': 'Pesanan tidak ditemukan'})
         
         except Exception as e:
+            if ddb.is_timeout(e):
+                return timeout_response()
             return create_response(500, {'message': f"Error internal: {str(e)}"})
             
+    elif event.get('pathParameters') and 'userId' in event['pathParameters']:
+        # ----------------------------------------------------
+        # JALUR 3: RIWAYAT PESANAN PENGGUNA (Query By userId)
+        # Ini adalah panggilan ke /users/{userId}/orders?limit=...&nextToken=...&fields=...
+        # ----------------------------------------------------
+        user_id = event['pathParameters']['userId']
+        query_params = event.get('queryStringParameters') or {}
+
+        try:
+            query_kwargs = {
+                'IndexName': ORDERS_USER_INDEX,
+                'KeyConditionExpression': Key('userId').eq(user_id),
+                'ScanIndexForward': False,  # Pesanan terbaru lebih dulu
+                'Limit': parse_limit(query_params.get('limit'))
+            }
+            # Hanya field yang diminta yang dibaca & dikirim
+            fields, summary = parse_projection(query_params)
+            query_kwargs.update(projection_kwargs(fields))
+            if query_params.get('nextToken'):
+                query_kwargs['ExclusiveStartKey'] = decode_next_token(query_params['nextToken'])
+        except ValueError as e:
+            return create_response(400, {'message': str(e)})
+
+        try:
+            response = table.query(**query_kwargs)
+            items = response.get('Items', [])
+            return create_response(200, {
+                'items': summarize_orders(items) if summary else items,
+                'nextToken': encode_next_token(response.get('LastEvaluatedKey'))
+            }, event=event)
+        except Exception as e:
+            print(f"ERROR: Gagal melakukan Query: {e}")
+            if ddb.is_timeout(e):
+                return timeout_response()
+            return create_response(500, {'message': f"Gagal mengambil data: {str(e)}"})
+
     else:
         # ----------------------------------------------------
-        # JALUR 2: FUNGSI BARU (Scan By Status)
-        # Ini adalah panggilan ke /orders?status=...
+        # JALUR 2: FUNGSI BARU (Query By Status, dengan paginasi)
+        # Ini adalah panggilan ke /orders?status=...&limit=...&nextToken=...
         # ----------------------------------------------------
         
-        # Ambil 'status' dari query string
-        query_params = event.get('queryStringParameters')
-        status_to_query = None
-        
-        if query_params and 'status' in query_params:
-            status_to_query = query_params['status']
-            
+        # Ambil 'status', 'limit' dan 'nextToken' dari query string
+        query_params = event.get('queryStringParameters') or {}
+        status_to_query = query_params.get('status')
+
+        if status_to_query:
+            # ----- JIKA ADA STATUS, QUERY KE GSI (BUKAN SCAN) -----
+            # Hanya membaca item dengan status tersebut, per halaman
+            try:
+                limit = parse_limit(query_params.get('limit'))
+                query_kwargs = {
+                    'IndexName': ORDERS_STATUS_INDEX,
+                    'KeyConditionExpression': Key('status').eq(status_to_query),
+                    'ScanIndexForward': False,  # Pesanan terbaru lebih dulu
+                    'Limit': limit
+                }
+                fields, summary = parse_projection(query_params)
+                query_kwargs.update(projection_kwargs(fields))
+                if query_params.get('nextToken'):
+                    query_kwargs['ExclusiveStartKey'] = decode_next_token(query_params['nextToken'])
+            except ValueError as e:
+                return create_response(400, {'message': str(e)})
+
+            try:
+                response = table.query(**query_kwargs)
+                items = response.get('Items', [])
+                return create_response(200, {
+                    'items': summarize_orders(items) if summary else items,
+                    'nextToken': encode_next_token(response.get('LastEvaluatedKey'))
+                }, event=event)
+            except Exception as e:
+                print(f"ERROR: Gagal melakukan Query: {e}")
+                if ddb.is_timeout(e):
+                    return timeout_response()
+                return create_response(500, {'message': f"Gagal mengambil data: {str(e)}"})
+
         try:
-            if status_to_query:
-                # ----- JIKA ADA STATUS, LAKUKAN SCAN DENGAN FILTER -----
-                # PERINGATAN: Ini membaca SELURUH tabel lalu memfilter
-                response = table.scan(
-                    FilterExpression=Attr('status').eq(status_to_query)
-                )
-            else:
-                # ----- JIKA TIDAK ADA STATUS, KEMBALIKAN SEMUA -----
-                # PERINGATAN: Ini membaca SELURUH tabel
-                response = table.scan()
-            
-            items = response.get('Items', [])
-            return create_response(200, items)
-            
+            fields, summary = parse_projection(query_params)
+        except ValueError as e:
+            return create_response(400, {'message': str(e)})
+
+        try:
+            # ----- JIKA TIDAK ADA STATUS, KEMBALIKAN SEMUA (EKSPOR) -----
+            # PERINGATAN: Ini membaca SELURUH tabel (dengan Parallel Scan)
+            items = list(parallel_scan(table, projection=fields))
+            if summary:
+                items = summarize_orders(items)
+            return create_response(200, items, event=event)
+
         except Exception as e:
             print(f"ERROR: Gagal melakukan Scan: {e}")
+            if ddb.is_timeout(e):
+                return timeout_response()
             return create_response(500, {'message': f"Gagal mengambil data: {str(e)}"})
\ No newline at end of file
@@ -0,0 +1,58 @@
+import datetime
+import os
+from api_response import create_response
+from order_stats import STATS_TABLE, ALL_SCOPE, day_scope, stats_view
+import ddb
+import metrics
+
+# Statistik pesanan yang sudah diagregasi oleh orderStream.py (lihat order_stats.py).
+# Dashboard cukup membaca beberapa item kecil, BUKAN scan seluruh tabel pesanan.
+
+# Maksimal rentang hari dalam satu permintaan (?days=...)
+MAX_DAYS = int(os.environ.get('STATS_MAX_DAYS', '31'))
+
+# --- Helper Functions ---
+
+def parse_days(query_params):
+    """ Tanggal (YYYY-MM-DD) yang diminta: 'days' hari sampai 'date' (default hari ini) """
+    try:
+        end = datetime.date.fromisoformat(query_params['date']) if query_params.get('date') else datetime.date.today()
+    except ValueError:
+        raise ValueError("Parameter 'date' harus berformat YYYY-MM-DD")
+    try:
+        days = int(query_params.get('days') or 1)
+    except ValueError:
+        raise ValueError("Parameter 'days' harus berupa angka")
+    if days < 1 or days > MAX_DAYS:
+        raise ValueError(f"Parameter 'days' harus di antara 1 dan {MAX_DAYS}")
+    return [(end - datetime.timedelta(days=offset)).isoformat() for offset in range(days)]
+
+# --- Fungsi Handler Utama ---
+# GET /orders/stats?date=2026-10-18&days=7
+
+@metrics.instrument('getOrderStats')
+def stats_handler(event, context):
+    query_params = event.get('queryStringParameters') or {}
+    try:
+        dates = parse_days(query_params)
+    except ValueError as e:
+        return create_response(400, {'message': str(e)})
+
+    scopes = [ALL_SCOPE] + [day_scope(date) for date in dates]
+    try:
+        # Semua scope dibaca sekaligus (satu BatchGetItem)
+        items = {
+            item['scope']: item
+            for item in ddb.batch_get_items(STATS_TABLE, [{'scope': scope} for scope in scopes])
+        }
+    except Exception as e:
+        print(f"ERROR: Gagal membaca statistik: {e}")
+        return create_response(500, {'message': f"Gagal mengambil statistik: {str(e)}"})
+
+    return create_response(200, {
+        'total': stats_view(ALL_SCOPE, items.get(ALL_SCOPE)),
+        'days': [
+            dict(stats_view(day_scope(date), items.get(day_scope(date))), date=date)
+            for date in dates
+        ]
+    }, event=event)
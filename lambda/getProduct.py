@@ -1,51 +1,175 @@
-import boto3
-import json
 import os
-from decimal import Decimal
-from boto3.dynamodb.conditions import Attr
+from scan_engine import parallel_scan
+from list_params import parse_fields, parse_limit
+from ttl_cache import TTLCache
+from catalog_version import CATALOG_VERSION_KEY, get_catalog_version
+from catalog_sync import TOMBSTONE_TTL_SECONDS, changes_since, is_deleted, live_products_filter, settled_cursor
+from inventory import get_stock
+from api_response import create_response, not_modified, not_modified_response, timeout_response
+import ddb
+import metrics
 
-dynamodb = boto3.resource('dynamodb')
 PRODUCTS_TABLE = os.environ.get('PRODUCTS_TABLE')
-table = dynamodb.Table(PRODUCTS_TABLE)
+table = ddb.Table(PRODUCTS_TABLE)
 
-# --- Helper Functions (Salin dari yang lain) ---
-class DecimalEncoder(json.JSONEncoder):
-    def default(self, obj):
-        if isinstance(obj, Decimal):
-            return int(obj) if obj % 1 == 0 else float(obj)
-        return super(DecimalEncoder, self).default(obj)
+# Cache-Control untuk browser & CDN. Setelah max-age habis, salinan lama masih boleh
+# dipakai sambil divalidasi ulang (If-None-Match -> 304 jika versi katalog sama)
+PRODUCT_CACHE_CONTROL = os.environ.get(
+    'PRODUCT_CACHE_CONTROL', 'public, max-age=60, s-maxage=60, stale-while-revalidate=300')
 
-def create_response(status_code, body):
+# Field yang dibutuhkan halaman daftar produk (frontend)
+PRODUCT_LIST_FIELDS = ['productId', 'name', 'description', 'price', 'imageUrl']
+
+# Ukuran halaman GET /products?since= (perubahan katalog untuk sync klien)
+DEFAULT_SYNC_LIMIT = 200
+MAX_SYNC_LIMIT = 1000
+
+# Cache in-memory (bertahan selama container Lambda masih warm).
+# Key selalu menyertakan versi katalog, jadi setiap penulisan produk
+# (yang menaikkan versi) otomatis membuat isi cache lama tidak terpakai.
+listing_cache = TTLCache(maxsize=16)
+product_cache = TTLCache()
+
+# --- Helper Functions ---
+def catalog_etag(version):
+    return f'"catalog-{version}"'
+
+def parse_since(value):
+    try:
+        since = int(value)
+    except (TypeError, ValueError):
+        raise ValueError("Parameter 'since' harus berupa angka")
+    if since < 0:
+        raise ValueError("Parameter 'since' tidak boleh negatif")
+    return since
+
+def sync_changes(query_params, fields):
+    """
+    GET /products?since=<versi>: produk yang berubah dan productId yang dihapus sejak
+    <versi> (lihat catalog_sync.py). 'version' hanya ada di halaman terakhir; simpan dan
+    kirim sebagai 'since' berikutnya. Setelah tombstoneTtlSeconds tanpa sync, tombstone
+    lama mungkin sudah hilang: klien harus memuat ulang katalog penuh (GET /products).
+    """
+    since = parse_since(query_params.get('since'))
+    limit = parse_limit(query_params.get('limit'), default=DEFAULT_SYNC_LIMIT, maximum=MAX_SYNC_LIMIT)
+    with metrics.phase('sync'):
+        changes, next_token, cursor = changes_since(table, since, limit, query_params.get('nextToken'), fields)
+    items = []
+    deleted = []
+    for item in changes:
+        if is_deleted(item):
+            deleted.append(item['productId'])
+        else:
+            items.append({field: item[field] for field in fields if field in item})
     return {
-        'statusCode': status_code,
-        'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
-        'body': json.dumps(body, cls=DecimalEncoder)
+        'items': items,
+        'deleted': deleted,
+        'version': cursor,
+        'nextToken': next_token,
+        'tombstoneTtlSeconds': TOMBSTONE_TTL_SECONDS
     }
 
 # --- Handler Utama (YANG DIMODIFIKASI) ---
+@metrics.instrument('getProduct')
 def get_prod_handler(event, context):
-    
+
+    # Versi katalog dipakai sebagai ETag dan sebagai bagian dari key cache
+    try:
+        version = get_catalog_version(table)
+    except Exception as e:
+        if ddb.is_timeout(e):
+            return timeout_response()
+        return create_response(500, {'message': f"Error internal: {str(e)}"})
+
+    etag = catalog_etag(version)
+    cache_headers = {'ETag': etag, 'Access-Control-Expose-Headers': 'ETag', 'Cache-Control': PRODUCT_CACHE_CONTROL}
+
     # JALUR 1: Mengambil SATU produk (panggilan ke /products/{productId})
     if 'pathParameters' in event and event['pathParameters'] and 'productId' in event['pathParameters']:
         try:
             product_id = event['pathParameters']['productId']
-            response = table.get_item(Key={'productId': product_id})
-            item = response.get('Item')
-            
-            if item:
-                return create_response(200, item)
+            if product_id == CATALOG_VERSION_KEY:
+                return create_response(404, {'message': 'Produk tidak ditemukan'})
+
+            # Stok (jika dilacak) berubah tanpa menaikkan versi katalog, jadi ikut di ETag.
+            # Jumlah semua shard stok = satu BatchGetItem kecil (lihat inventory.py)
+            try:
+                stock = get_stock(product_id)
+            except Exception as e:
+                # Tampilan produk tidak boleh gagal hanya karena stok tidak terbaca
+                print(f"Gagal membaca stok {product_id}: {e}")
+                stock = None
+            if stock is not None:
+                cache_headers['ETag'] = f'"catalog-{version}-stock-{stock}"'
+
+            if not_modified(event, cache_headers['ETag']):
+                return not_modified_response(cache_headers)
+
+            item = product_cache.get((version, product_id))
+            if item is None:
+                response = table.hedged_get_item(Key={'productId': product_id})
+                item = response.get('Item')
+                if item:
+                    product_cache.set((version, product_id), item)
+
+            if item and not is_deleted(item):
+                return create_response(200, item if stock is None else dict(item, stock=stock), cache_headers, event)
             else:
                 return create_response(404, {'message': 'Produk tidak ditemukan'})
         except Exception as e:
+            if ddb.is_timeout(e):
+                return timeout_response()
             return create_response(500, {'message': f"Error internal: {str(e)}"})
             
-    # JALUR 2: Mengambil SEMUA produk (panggilan ke /products)
+    # JALUR 2: Mengambil SEMUA produk (panggilan ke /products?fields=...)
     else:
+        # fields=productId,name,price,imageUrl -> hanya field itu yang dibaca dari DynamoDB
+        query_params = event.get('queryStringParameters') or {}
+        try:
+            fields = parse_fields(query_params.get('fields'), required=['productId']) or PRODUCT_LIST_FIELDS
+        except ValueError as e:
+            return create_response(400, {'message': str(e)})
+
+        # Sync inkremental: hanya perubahan sejak versi yang dimiliki klien
+        if query_params.get('since') is not None:
+            try:
+                return create_response(200, sync_changes(query_params, fields), event=event)
+            except ValueError as e:
+                return create_response(400, {'message': str(e)})
+            except Exception as e:
+                if ddb.is_timeout(e):
+                    return timeout_response()
+                return create_response(500, {'message': f"Gagal mengambil perubahan produk: {str(e)}"})
+
+        # ETag cukup per versi katalog: query string sudah bagian dari URL yang di-cache browser
+        if not_modified(event, etag):
+            return not_modified_response(cache_headers)
+
         try:
-            # PERINGATAN: Scan membaca seluruh tabel.
-            # Untuk aplikasi besar, gunakan GSI atau query
-            response = table.scan() 
-            items = response.get('Items', [])
-            return create_response(200, items)
+            cache_key = (version, tuple(fields))
+            cached = listing_cache.get(cache_key)
+            if cached is None:
+                # Parallel Scan: semua segmen dibaca bersamaan dan
+                # semua halaman diikuti, jadi katalog besar tidak terpotong.
+                # syncVersion/updatedAt ikut dibaca untuk kursor sync (header X-Sync-Version)
+                extra = [field for field in ('syncVersion', 'updatedAt') if field not in fields]
+                items = list(parallel_scan(
+                    table,
+                    projection=fields + extra,
+                    FilterExpression=live_products_filter()
+                ))
+                cursor = settled_cursor(items)
+                for item in items:
+                    for field in extra:
+                        item.pop(field, None)
+                cached = (items, cursor)
+                listing_cache.set(cache_key, cached)
+            items, cursor = cached
+            # Katalog penuh + kursor: klien lanjut dengan GET /products?since=<X-Sync-Version>
+            headers = dict(cache_headers, **{'X-Sync-Version': str(cursor),
+                                             'Access-Control-Expose-Headers': 'ETag, X-Sync-Version'})
+            return create_response(200, items, headers, event)
         except Exception as e:
+            if ddb.is_timeout(e):
+                return timeout_response()
             return create_response(500, {'message': f"Gagal mengambil semua produk: {str(e)}"})
\ No newline at end of file
@@ -0,0 +1,226 @@
+import datetime
+import os
+import uuid
+from decimal import Decimal
+
+try:
+    # Opsional: pyarrow tidak ada di runtime Lambda standar (tambahkan lewat Layer,
+    # misal AWS SDK for pandas). Hanya archiveCompactor dan laporan yang membutuhkannya.
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+    import pyarrow.fs as pafs
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+# Modul bersama (bukan handler Lambda): arsip DINGIN kits-history dalam file Parquet.
+#
+# Record kits-history yang sudah tua dipindahkan archiveCompactor.py ke file Parquet
+# (kolumnar, zstd) di S3 (atau folder lokal / MinIO untuk uji coba), dipartisi per
+# tanggal pesanan:
+#     <ARCHIVE_URI>/date=2026-07-01/part-20261018T020000-1a2b3c4d.parquet
+# lalu dihapus dari DynamoDB oleh TTL. Laporan membaca file ini (query()), bukan
+# Scan DynamoDB:
+# - filter tanggal memangkas partisi (folder) yang tidak perlu dibuka sama sekali
+# - setiap file diurutkan per userId, jadi statistik min/max row group Parquet
+#   membuat filter userId hanya membaca sebagian kecil file
+# - hanya kolom yang diminta yang dibaca (misal tanpa 'items')
+#
+# Pesanan yang diubah setelah diarsipkan bisa diarsipkan lagi di run berikutnya;
+# query() hanya mengambil baris dengan compactedAt terbaru per orderId.
+
+# s3://bucket/prefix, file:///path atau path lokal
+ARCHIVE_URI = os.environ.get('ARCHIVE_URI', 's3://kits-history-archive/orders')
+# MinIO / S3 lokal, misal http://localhost:9000
+ARCHIVE_S3_ENDPOINT_URL = os.environ.get('ARCHIVE_S3_ENDPOINT_URL')
+# Baris per row group Parquet (unit terkecil yang bisa dilewati filter)
+ARCHIVE_ROW_GROUP_SIZE = int(os.environ.get('ARCHIVE_ROW_GROUP_SIZE', '50000'))
+ARCHIVE_COMPRESSION = os.environ.get('ARCHIVE_COMPRESSION', 'zstd')
+
+PARTITION_FIELD = 'date'
+
+# Uang disimpan sebagai decimal (bukan float) agar total laporan tepat
+MONEY = pa.decimal128(18, 2) if pa else None
+
+SCHEMA = pa.schema([
+    ('orderId', pa.string()),
+    ('userId', pa.string()),
+    ('createdAt', pa.string()),
+    ('status', pa.string()),
+    ('totalPrice', MONEY),
+    ('itemCount', pa.int32()),
+    ('customerName', pa.string()),
+    ('shippingAddress', pa.string()),
+    ('paymentMethod', pa.string()),
+    ('items', pa.list_(pa.struct([
+        ('productId', pa.string()),
+        ('name', pa.string()),
+        ('price', MONEY),
+        ('quantity', pa.int32()),
+        ('imageUrl', pa.string()),
+    ]))),
+    ('compactedAt', pa.timestamp('ms', tz='UTC')),
+]) if pa else None
+
+_filesystem = None
+
+
+def require_pyarrow():
+    if pa is None:
+        raise RuntimeError('pyarrow tidak terpasang: tambahkan Layer pyarrow untuk arsip kits-history')
+
+
+def filesystem():
+    """ (filesystem pyarrow, path dasar arsip) dari ARCHIVE_URI, dibuat sekali lalu di-cache """
+    global _filesystem
+    require_pyarrow()
+    if _filesystem is None:
+        if ARCHIVE_URI.startswith('s3://') and ARCHIVE_S3_ENDPOINT_URL:
+            scheme, endpoint = ARCHIVE_S3_ENDPOINT_URL.split('://', 1)
+            _filesystem = (pafs.S3FileSystem(endpoint_override=endpoint, scheme=scheme),
+                           ARCHIVE_URI[len('s3://'):].rstrip('/'))
+        elif '://' in ARCHIVE_URI:
+            _filesystem = pafs.FileSystem.from_uri(ARCHIVE_URI)
+        else:
+            _filesystem = (pafs.LocalFileSystem(), os.path.abspath(ARCHIVE_URI))
+    return _filesystem
+
+
+def _money(value):
+    if value is None:
+        return None
+    return Decimal(str(value)).quantize(Decimal('0.01'))
+
+
+def _quantity(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+def to_row(record, compacted_at):
+    """ Satu record kits-history (hasil DynamoDB) -> baris sesuai SCHEMA """
+    items = [{
+        'productId': line.get('productId'),
+        'name': line.get('name'),
+        'price': _money(line.get('price')),
+        'quantity': _quantity(line.get('quantity')),
+        'imageUrl': line.get('imageUrl'),
+    } for line in record.get('items') or [] if isinstance(line, dict)]
+    return {
+        'orderId': record['orderId'],
+        'userId': record.get('userId'),
+        'createdAt': record.get('createdAt'),
+        'status': record.get('status'),
+        'totalPrice': _money(record.get('totalPrice')),
+        'itemCount': sum(line['quantity'] for line in items),
+        'customerName': record.get('customerName'),
+        'shippingAddress': record.get('shippingAddress'),
+        'paymentMethod': record.get('paymentMethod'),
+        'items': items,
+        'compactedAt': compacted_at,
+    }
+
+
+def partition_date(record):
+    """ Partisi = tanggal dari createdAt ('YYYY-MM-DD') """
+    return str(record.get('createdAt') or '')[:10] or 'unknown'
+
+
+def write_partition(date, records, compacted_at=None):
+    """
+    Tulis records (satu tanggal) sebagai SATU file Parquet baru, diurutkan per
+    (userId, createdAt). File tidak pernah ditimpa. Kembalikan (path, ukuran byte).
+    """
+    fs, base = filesystem()
+    compacted_at = compacted_at or datetime.datetime.now(datetime.timezone.utc)
+    rows = sorted((to_row(record, compacted_at) for record in records),
+                  key=lambda row: (row['userId'] or '', row['createdAt'] or ''))
+    table = pa.Table.from_pylist(rows, schema=SCHEMA)
+
+    directory = f'{base}/{PARTITION_FIELD}={date}'
+    path = f"{directory}/part-{compacted_at.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}.parquet"
+    fs.create_dir(directory, recursive=True)
+    pq.write_table(table, path, filesystem=fs, compression=ARCHIVE_COMPRESSION,
+                   row_group_size=ARCHIVE_ROW_GROUP_SIZE,
+                   use_dictionary=['userId', 'status', 'paymentMethod'])
+    return path, fs.get_file_info(path).size
+
+
+def dataset():
+    """ Seluruh arsip sebagai pyarrow Dataset (partisi date=... dikenali otomatis) """
+    fs, base = filesystem()
+    partitioning = ds.partitioning(pa.schema([(PARTITION_FIELD, pa.string())]), flavor='hive')
+    return ds.dataset(base, filesystem=fs, format='parquet', partitioning=partitioning,
+                      schema=SCHEMA.append(pa.field(PARTITION_FIELD, pa.string())))
+
+
+def build_filter(start=None, end=None, user_id=None, payment_method=None, status=None):
+    """
+    Filter dataset: createdAt di [start, end) (string ISO, misal '2026-07-01'),
+    userId, paymentMethod, status. None = tanpa filter.
+    """
+    conditions = []
+    if start:
+        conditions += [ds.field(PARTITION_FIELD) >= start[:10], ds.field('createdAt') >= start]
+    if end:
+        conditions += [ds.field(PARTITION_FIELD) <= end[:10], ds.field('createdAt') < end]
+    for field, value in (('userId', user_id), ('paymentMethod', payment_method), ('status', status)):
+        if value is not None:
+            conditions.append(ds.field(field) == value)
+    expression = None
+    for condition in conditions:
+        expression = condition if expression is None else expression & condition
+    return expression
+
+
+def latest_rows(table):
+    """ Satu baris per orderId: yang compactedAt-nya paling baru """
+    if table.num_rows == 0:
+        return table
+    ordered = table.sort_by([('compactedAt', 'ascending')])
+    ordered = ordered.append_column('_row', pa.array(range(ordered.num_rows), pa.int64()))
+    keep = ordered.group_by('orderId').aggregate([('_row', 'max')]).column('_row_max')
+    return ordered.take(keep).drop_columns(['_row'])
+
+
+def query(start=None, end=None, user_id=None, payment_method=None, status=None, columns=None, latest=True):
+    """
+    Baca arsip dengan filter (predicate pushdown) dan kolom terpilih.
+    Kembalikan pyarrow.Table; misal query('2026-07-01', '2026-08-01', columns=['totalPrice']).
+    """
+    require_pyarrow()
+    columns = list(dict.fromkeys(columns)) if columns else None
+    read_columns = list(columns) if columns else None
+    if read_columns and latest:
+        # status bisa berubah antar salinan: difilter SETELAH memilih salinan terbaru
+        extra = ['orderId', 'compactedAt'] + (['status'] if status is not None else [])
+        read_columns += [field for field in extra if field not in read_columns]
+    table = dataset().to_table(columns=read_columns,
+                               filter=build_filter(start, end, user_id, payment_method,
+                                                   None if latest else status))
+    if latest:
+        table = latest_rows(table)
+        if status is not None:
+            table = table.filter(pc.field('status') == status)
+    if columns:
+        table = table.select(columns)
+    return table
+
+
+def revenue_report(start=None, end=None, group_by=(PARTITION_FIELD,), **filters):
+    """
+    Jumlah pesanan dan revenue per kelompok (default per tanggal), pesanan CANCELLED
+    tidak dihitung. Kembalikan list dict terurut, misal
+        [{'date': '2026-07-01', 'orderCount': 120, 'revenue': Decimal('8400000.00')}]
+    """
+    group_by = list(group_by)
+    table = query(start, end, columns=group_by + ['totalPrice', 'status'], **filters)
+    table = table.filter(pc.field('status') != 'CANCELLED')
+    result = table.group_by(group_by).aggregate([('totalPrice', 'count'), ('totalPrice', 'sum')])
+    rows = [{**{field: row[field] for field in group_by},
+             'orderCount': row['totalPrice_count'], 'revenue': row['totalPrice_sum']}
+            for row in result.to_pylist()]
+    return sorted(rows, key=lambda row: tuple(str(row[field]) for field in group_by))
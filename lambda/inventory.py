@@ -0,0 +1,315 @@
+import os
+import random
+import uuid
+from ttl_cache import TTLCache
+import ddb
+
+# Modul bersama (bukan handler Lambda): stok produk dengan counter yang di-shard.
+#
+# Stok satu produk disimpan sebagai N item di INVENTORY_TABLE (key 'shardId'):
+#     {'shardId': '<productId>#<n>', 'productId': ..., 'shard': n, 'shardCount': N, 'available': ...}
+# Setiap shard punya partition key sendiri, jadi SKU yang sedang flash sale tidak
+# menumpuk di satu partisi (batas ~1000 write/detik per partisi): N shard ~ N x 1000.
+#
+# Reservasi = ADD negatif BERSYARAT ('available >= :q') pada shard acak; jika stok shard
+# itu tidak cukup, dicoba shard lain, lalu (jarang) dibagi ke beberapa shard berdasarkan
+# pembacaan konsisten. Stok tidak pernah minus, jadi tidak ada overselling.
+# Produk tanpa item inventory dianggap stoknya tidak dilacak (tidak dibatasi).
+#
+# Total stok = jumlah semua shard (satu BatchGetItem, lihat get_stock).
+# rebalance() meratakan ulang stok antar shard (dijalankan berkala oleh inventoryRebalance.py).
+
+INVENTORY_TABLE = os.environ.get('INVENTORY_TABLE', 'inventory')
+DEFAULT_SHARDS = int(os.environ.get('INVENTORY_DEFAULT_SHARDS', '1'))
+# Set stok menulis shard baru + menghapus shard lama dalam satu transaksi (maks 100 operasi)
+MAX_SHARDS = 50
+# Berapa shard acak yang dicoba dengan ADD bersyarat sebelum membaca semua shard
+RANDOM_ATTEMPTS = int(os.environ.get('INVENTORY_RANDOM_ATTEMPTS', '3'))
+SPLIT_RETRIES = 3
+TRANSACT_LIMIT = 100
+
+# Jumlah shard per produk jarang berubah: cache di container (0 = stok tidak dilacak).
+# Akibatnya perubahan jumlah shard / produk yang baru dilacak baru terlihat setelah TTL.
+_config_cache = TTLCache(ttl=float(os.environ.get('INVENTORY_CONFIG_TTL_SECONDS', '60')))
+# Total stok untuk tampilan (getProduct) boleh sedikit basi; reservasi selalu ke DynamoDB
+_stock_cache = TTLCache(ttl=float(os.environ.get('INVENTORY_STOCK_CACHE_TTL_SECONDS', '1')))
+
+# Namespace tetap untuk ClientRequestToken pelepasan stok dari stream
+_TOKEN_NAMESPACE = uuid.UUID('0d8c5a52-5a0e-4f43-9b55-3f0c6a6f2e17')
+
+table = ddb.Table(INVENTORY_TABLE)
+
+
+class OutOfStock(Exception):
+    """ Stok produk tidak cukup untuk quantity yang diminta """
+    def __init__(self, product_id, requested, available):
+        super().__init__(f"Stok produk {product_id} tidak cukup (diminta {requested}, tersedia {available})")
+        self.product_id = product_id
+        self.requested = requested
+        self.available = available
+
+
+def shard_key(product_id, shard):
+    return {'shardId': f'{product_id}#{shard}'}
+
+
+def split_evenly(total, shards):
+    """ Bagi total ke 'shards' bagian yang selisihnya paling banyak 1, misal (10, 3) -> [4, 3, 3] """
+    base, extra = divmod(total, shards)
+    return [base + (1 if shard < extra else 0) for shard in range(shards)]
+
+
+def parse_stock(data):
+    """
+    Field opsional 'stock' (total) dan 'stockShards' dari body produk.
+    Mengembalikan (stock, shards) atau (None, None). Raise ValueError jika tidak valid.
+    """
+    if data.get('stock') is None:
+        if data.get('stockShards') is not None:
+            raise ValueError("Field 'stockShards' hanya bisa dipakai bersama 'stock'")
+        return None, None
+    try:
+        stock = int(data['stock'])
+        shards = int(data['stockShards']) if data.get('stockShards') is not None else None
+    except (TypeError, ValueError):
+        raise ValueError("Field 'stock' dan 'stockShards' harus berupa angka")
+    if stock < 0 or stock != data['stock']:
+        raise ValueError("Field 'stock' harus bilangan bulat >= 0")
+    if shards is not None and not 1 <= shards <= MAX_SHARDS:
+        raise ValueError(f"Field 'stockShards' harus di antara 1 dan {MAX_SHARDS}")
+    return stock, shards
+
+
+def shard_count(product_id, refresh=False):
+    """ Jumlah shard stok produk (0 = stok tidak dilacak); di-cache per container """
+    count = None if refresh else _config_cache.get(product_id)
+    if count is None:
+        item = table.get_item(Key=shard_key(product_id, 0), ProjectionExpression='shardCount').get('Item')
+        count = int(item['shardCount']) if item else 0
+        _config_cache.set(product_id, count)
+    return count
+
+
+def _levels(product_id, count, consistent_read=True):
+    """ {shard: stok tersedia} untuk semua shard (satu BatchGetItem per 100 shard) """
+    keys = [shard_key(product_id, shard) for shard in range(count)]
+    items = ddb.batch_get_items(INVENTORY_TABLE, keys, projection=['shard', 'available'],
+                                consistent_read=consistent_read)
+    return {int(item['shard']): int(item.get('available', 0)) for item in items}
+
+
+def get_stock(product_id):
+    """ Total stok produk (jumlah semua shard), atau None jika stoknya tidak dilacak """
+    stock = _stock_cache.get(product_id)
+    if stock is None:
+        count = shard_count(product_id)
+        if not count:
+            return None
+        stock = sum(_levels(product_id, count, consistent_read=False).values())
+        _stock_cache.set(product_id, stock)
+    return stock
+
+
+def set_stock(product_id, stock, shards=None):
+    """
+    Tetapkan total stok (dari createProduct / PUT produk), dibagi rata ke 'shards' shard
+    (default: jumlah shard sekarang, atau INVENTORY_DEFAULT_SHARDS). Shard lama yang tidak
+    dipakai lagi dihapus dalam transaksi yang sama. Menimpa stok lama.
+    """
+    old_count = shard_count(product_id, refresh=True)
+    shards = shards or old_count or DEFAULT_SHARDS
+    operations = [{'Put': {'TableName': INVENTORY_TABLE, 'Item': dict(
+        shard_key(product_id, shard), productId=product_id, shard=shard, shardCount=shards, available=available
+    )}} for shard, available in enumerate(split_evenly(stock, shards))]
+    operations.extend({'Delete': {'TableName': INVENTORY_TABLE, 'Key': shard_key(product_id, shard)}}
+                      for shard in range(shards, old_count))
+    ddb.transact_write_items(operations)
+    _config_cache.set(product_id, shards)
+    _stock_cache.set(product_id, stock)
+
+
+def _take(product_id, shard, quantity):
+    """ Kurangi stok satu shard HANYA jika cukup. True jika berhasil """
+    try:
+        table.update_item(
+            Key=shard_key(product_id, shard),
+            UpdateExpression='ADD available :take',
+            ConditionExpression='available >= :q',
+            ExpressionAttributeValues={':take': -quantity, ':q': quantity}
+        )
+        return True
+    except Exception as e:
+        if ddb.error_code(e) == 'ConditionalCheckFailedException':
+            return False
+        raise
+
+
+def _give(product_id, shard, quantity):
+    """ Kembalikan stok ke satu shard (hanya jika shard masih ada) """
+    try:
+        table.update_item(
+            Key=shard_key(product_id, shard),
+            UpdateExpression='ADD available :q',
+            ConditionExpression='attribute_exists(shardId)',
+            ExpressionAttributeValues={':q': quantity}
+        )
+        return True
+    except Exception as e:
+        if ddb.error_code(e) == 'ConditionalCheckFailedException':
+            return False
+        raise
+
+
+def reserve(product_id, quantity):
+    """
+    Ambil 'quantity' dari stok produk. Mengembalikan alokasi [(shard, jumlah)]
+    ([] jika stok tidak dilacak). Raise OutOfStock jika total stok tidak cukup.
+    """
+    count = shard_count(product_id)
+    if not count:
+        return []
+
+    # 1. Shard acak (beban tersebar), lalu beberapa shard lain sebagai cadangan
+    shards = random.sample(range(count), min(count, RANDOM_ATTEMPTS))
+    for shard in shards:
+        if _take(product_id, shard, quantity):
+            return [(shard, quantity)]
+
+    # 2. Tidak ada satu shard pun yang cukup: baca semua shard, ambil dari beberapa shard
+    allocations = []
+    remaining = quantity
+    available = 0
+    for _ in range(SPLIT_RETRIES):
+        levels = _levels(product_id, count)
+        available = sum(levels.values())
+        if available < remaining:
+            break
+        for shard, level in sorted(levels.items(), key=lambda entry: -entry[1]):
+            take = min(level, remaining)
+            if take > 0 and _take(product_id, shard, take):
+                allocations.append((shard, take))
+                remaining -= take
+            if not remaining:
+                return allocations
+
+    release(product_id, allocations)
+    raise OutOfStock(product_id, quantity, available + quantity - remaining)
+
+
+def release(product_id, allocations):
+    """ Kembalikan alokasi dari reserve() (misal pesanan gagal disimpan) """
+    for shard, quantity in allocations:
+        if not _give(product_id, shard, quantity) and shard != 0:
+            # Shard sudah dihapus (jumlah shard dikurangi): kembalikan ke shard 0
+            _give(product_id, 0, quantity)
+    if allocations:
+        _stock_cache.delete(product_id)
+
+
+def reserve_items(lines):
+    """
+    Reservasi stok untuk semua baris pesanan. Mengembalikan {productId: [(shard, jumlah)]}
+    untuk produk yang stoknya dilacak. Jika satu produk gagal, semua yang sudah diambil
+    dikembalikan lalu exception (OutOfStock / error DynamoDB) diteruskan.
+    """
+    quantities = {}
+    for line in lines:
+        quantities[line['productId']] = quantities.get(line['productId'], 0) + int(line['quantity'])
+
+    reservation = {}
+    try:
+        for product_id, quantity in quantities.items():
+            allocations = reserve(product_id, quantity)
+            if allocations:
+                reservation[product_id] = allocations
+    except Exception:
+        release_items(reservation)
+        raise
+    return reservation
+
+
+def release_items(reservation):
+    """ Kebalikan reserve_items (kegagalan hanya dicatat: stok lebih baik kurang daripada oversell) """
+    for product_id, allocations in reservation.items():
+        try:
+            release(product_id, allocations)
+        except Exception as e:
+            print(f"ERROR: Gagal mengembalikan stok {product_id} {allocations}: {e}")
+
+
+def reserved_quantities(reservation):
+    """ {productId: jumlah} untuk disimpan di pesanan (field 'reservedStock') """
+    return {product_id: sum(quantity for _, quantity in allocations)
+            for product_id, allocations in reservation.items()}
+
+
+def cancelled_releases(changes):
+    """ {productId: jumlah} yang harus dikembalikan dari pesanan yang baru CANCELLED """
+    quantities = {}
+    for old, new in changes:
+        if not new or new.get('status') != 'CANCELLED' or (old or {}).get('status') == 'CANCELLED':
+            continue
+        for product_id, quantity in (new.get('reservedStock') or {}).items():
+            quantities[product_id] = quantities.get(product_id, 0) + int(quantity)
+    return quantities
+
+
+def release_cancelled(changes, request_id):
+    """
+    Kembalikan stok pesanan yang dibatalkan (dipanggil orderStream.py). Stok dikembalikan
+    ke shard 0 dalam transaksi dengan ClientRequestToken dari request_id, jadi retry batch
+    stream yang sama tidak mengembalikan stok dua kali. Produk yang inventory-nya sudah
+    tidak ada dilewati.
+    """
+    quantities = sorted(cancelled_releases(changes).items())
+    for start in range(0, len(quantities), TRANSACT_LIMIT):
+        chunk = quantities[start:start + TRANSACT_LIMIT]
+        token = str(uuid.uuid5(_TOKEN_NAMESPACE, f'{request_id}#{start}'))
+        while chunk:
+            try:
+                ddb.transact_write_items([{'Update': {
+                    'TableName': INVENTORY_TABLE,
+                    'Key': shard_key(product_id, 0),
+                    'UpdateExpression': 'ADD available :q',
+                    'ConditionExpression': 'attribute_exists(shardId)',
+                    'ExpressionAttributeValues': {':q': quantity}
+                }} for product_id, quantity in chunk], ClientRequestToken=token)
+                break
+            except Exception as e:
+                reasons = getattr(e, 'response', {}).get('CancellationReasons') or []
+                missing = {i for i, reason in enumerate(reasons) if reason.get('Code') == 'ConditionalCheckFailed'}
+                if ddb.error_code(e) != 'TransactionCanceledException' or not missing:
+                    raise
+                chunk = [entry for i, entry in enumerate(chunk) if i not in missing]
+                token = str(uuid.uuid5(_TOKEN_NAMESPACE, f'{request_id}#{start}#{len(chunk)}'))
+
+
+def rebalance(product_id):
+    """
+    Ratakan stok antar shard tanpa mengubah totalnya, agar reservasi di shard acak
+    tetap berhasil menjelang stok habis. Aman dijalankan saat reservasi berlangsung:
+    kelebihan diambil dengan ADD bersyarat yang sama seperti reserve(), lalu
+    dibagikan ke shard yang kekurangan. Jika terhenti di tengah, stok hanya bisa
+    berkurang (tidak pernah oversell). Mengembalikan jumlah stok yang dipindahkan.
+    """
+    count = shard_count(product_id, refresh=True)
+    if count <= 1:
+        return 0
+    levels = _levels(product_id, count)
+    targets = dict(enumerate(split_evenly(sum(levels.values()), count)))
+
+    moved = 0
+    for shard, level in levels.items():
+        surplus = level - targets[shard]
+        if surplus > 0 and _take(product_id, shard, surplus):
+            moved += surplus
+
+    remaining = moved
+    for shard in sorted(targets, key=lambda s: levels.get(s, 0) - targets[s]):
+        deficit = min(targets[shard] - levels.get(shard, 0), remaining)
+        if deficit > 0 and _give(product_id, shard, deficit):
+            remaining -= deficit
+    if remaining:
+        # Shard yang kekurangan hilang di tengah jalan: sisanya ke shard 0
+        _give(product_id, 0, remaining)
+    return moved
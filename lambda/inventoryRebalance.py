@@ -0,0 +1,37 @@
+from boto3.dynamodb.conditions import Attr
+from inventory import rebalance, table
+import metrics
+
+# Dijalankan berkala (misal EventBridge Scheduler, rate(1 minute)) selama flash sale:
+# meratakan stok antar shard untuk semua produk dengan lebih dari satu shard, supaya
+# reservasi tidak sering jatuh ke jalur cadangan saat sebagian shard sudah kosong.
+#
+# Event opsional {"productIds": ["p1", "p2"]} untuk meratakan produk tertentu saja.
+
+def sharded_products():
+    """ productId yang stoknya di-shard (dibaca dari item shard 0; tabel inventory kecil) """
+    kwargs = {
+        'FilterExpression': Attr('shard').eq(0) & Attr('shardCount').gt(1),
+        'ProjectionExpression': 'productId'
+    }
+    while True:
+        response = table.scan(**kwargs)
+        for item in response.get('Items', []):
+            yield item['productId']
+        if 'LastEvaluatedKey' not in response:
+            return
+        kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+
+@metrics.instrument('inventoryRebalance')
+def rebalance_handler(event, context):
+    product_ids = (event or {}).get('productIds') or list(sharded_products())
+    moved = {}
+    failed = []
+    for product_id in product_ids:
+        try:
+            moved[product_id] = rebalance(product_id)
+        except Exception as e:
+            print(f"ERROR: Gagal meratakan stok {product_id}: {e}")
+            failed.append(product_id)
+    return {'products': len(product_ids), 'moved': moved, 'failed': failed}
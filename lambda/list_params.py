@@ -0,0 +1,71 @@
+import base64
+import binascii
+import json
+import re
+from decimal import Decimal
+from api_response import dumps
+
+# Modul bersama (bukan handler Lambda): parameter query string untuk endpoint daftar
+# (paginasi dengan 'limit' + 'nextToken', dan pemilihan field dengan 'fields').
+
+# Batas jumlah item per halaman
+DEFAULT_PAGE_LIMIT = 50
+MAX_PAGE_LIMIT = 100
+
+# Batas pemilihan field (?fields=a,b,c)
+MAX_FIELDS = 20
+_FIELD_NAME = re.compile(r'^[A-Za-z_][A-Za-z0-9_]{0,63}$')
+
+
+def encode_next_token(last_evaluated_key):
+    """ Ubah LastEvaluatedKey DynamoDB menjadi token (string) yang aman untuk URL """
+    if not last_evaluated_key:
+        return None
+    raw = dumps(last_evaluated_key)
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+
+def decode_next_token(token):
+    """ Kebalikan dari encode_next_token. Raise ValueError jika token rusak """
+    try:
+        raw = base64.urlsafe_b64decode(token.encode('ascii'))
+        key = json.loads(raw, parse_float=Decimal, parse_int=Decimal)
+    except (binascii.Error, UnicodeError, json.JSONDecodeError) as e:
+        raise ValueError(f"nextToken tidak valid: {e}")
+    if not isinstance(key, dict):
+        raise ValueError("nextToken tidak valid")
+    return key
+
+
+def parse_limit(value, default=DEFAULT_PAGE_LIMIT, maximum=MAX_PAGE_LIMIT):
+    """ Validasi parameter 'limit' dari query string """
+    if value is None:
+        return default
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        raise ValueError("Parameter 'limit' harus berupa angka")
+    if limit < 1 or limit > maximum:
+        raise ValueError(f"Parameter 'limit' harus di antara 1 dan {maximum}")
+    return limit
+
+
+def parse_fields(value, required=()):
+    """
+    Validasi parameter 'fields' (dipisah koma), misal 'orderId,status,totalPrice'.
+    Field di 'required' (misal key tabel) selalu ikut. None jika parameter tidak ada.
+    """
+    if not value:
+        return None
+    fields = list(required)
+    for field in value.split(','):
+        field = field.strip()
+        if not field:
+            continue
+        if not _FIELD_NAME.match(field):
+            raise ValueError(f"Nama field tidak valid: {field}")
+        if field not in fields:
+            fields.append(field)
+    if len(fields) > MAX_FIELDS:
+        raise ValueError(f"Maksimal {MAX_FIELDS} field")
+    return fields
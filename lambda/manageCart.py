@@ -1,37 +1,38 @@
-import boto3
 import json
 import os
 from decimal import Decimal
-
-# Inisialisasi DynamoDB resource
-dynamodb = boto3.resource('dynamodb')
+from api_response import create_response
+from cart_store import MAX_CHANGES_PER_UPDATE, apply_changes, replace_items
+import ddb
+import metrics
 
 # Ambil nama tabel dari environment variable
 CART_TABLE = os.environ.get('CART_TABLE')
-table = dynamodb.Table(CART_TABLE)
-
-# --- Helper Functions ---
+table = ddb.Table(CART_TABLE)
 
-class DecimalEncoder(json.JSONEncoder):
-    """ Helper untuk mengubah Decimal dari DynamoDB menjadi JSON """
-    def default(self, obj):
-        if isinstance(obj, Decimal):
-            return int(obj) if obj % 1 == 0 else float(obj)
-        return super(DecimalEncoder, self).default(obj)
+# Batas jumlah baris dalam satu request batch. Sinkronisasi penuh (replace) selalu satu
+# update_item; batch biasa (merge) dibatasi MAX_CHANGES_PER_UPDATE produk agar juga tetap
+# SATU update_item (atomik), bukan beberapa update yang bisa gagal di tengah jalan
+MAX_BATCH_LINES = 500
 
-def create_response(status_code, body):
-    """ Helper untuk membuat respon API Gateway """
-    return {
-        'statusCode': status_code,
-        'headers': {
-            'Content-Type': 'application/json',
-            'Access-Control-Allow-Origin': '*',
-        },
-        'body': json.dumps(body, cls=DecimalEncoder)
-    }
+def parse_lines(lines):
+    """ Validasi baris batch [{productId, quantity}, ...] -> {productId: Decimal(quantity)} """
+    if not isinstance(lines, list):
+        raise ValueError('items harus berupa list')
+    if len(lines) > MAX_BATCH_LINES:
+        raise ValueError(f'Maksimal {MAX_BATCH_LINES} baris per request')
+    changes = {}
+    for line in lines:
+        product_id = line['productId']
+        if not isinstance(product_id, str) or not product_id:
+            raise ValueError('productId tidak valid')
+        # Jika productId sama muncul lebih dari sekali, yang terakhir dipakai
+        changes[product_id] = Decimal(str(line['quantity']))
+    return changes
 
 # (Tambahkan kode Prasyarat dari atas di sini)
 
+@metrics.instrument('manageCart')
 def cart_handler(event, context):
     try:
         user_id = event['pathParameters']['userId']
@@ -39,55 +40,40 @@ def cart_handler(event, context):
         return create_response(400, {'message': 'Missing userId di path'})
 
     try:
-        data = json.loads(event['body'])
-        product_id = data['productId']
-        # Ubah quantity menjadi Decimal
-        quantity = Decimal(str(data['quantity']))
-    except (json.JSONDecodeError, KeyError, TypeError):
+        with metrics.phase('parse'):
+            data = json.loads(event['body'])
+        # Mode batch: body berupa array baris, atau {"items": [...], "replace": true/false}
+        batch_mode = isinstance(data, list) or 'items' in data
+        if batch_mode:
+            lines = data if isinstance(data, list) else data['items']
+            replace = (not isinstance(data, list)) and bool(data.get('replace', False))
+            changes = parse_lines(lines)
+        else:
+            product_id = data['productId']
+            # Ubah quantity menjadi Decimal
+            quantity = Decimal(str(data['quantity']))
+            changes = {product_id: quantity}
+    except json.JSONDecodeError:
+        return create_response(400, {'message': 'Body JSON tidak valid atau field (productId, quantity) hilang'})
+    except ValueError as e:
+        return create_response(400, {'message': str(e)})
+    except (KeyError, TypeError, ArithmeticError):
         return create_response(400, {'message': 'Body JSON tidak valid atau field (productId, quantity) hilang'})
 
-    try:
-        # 1. Ambil keranjang yang ada saat ini
-        response = table.get_item(Key={'userId': user_id})
-        cart = response.get('Item', {'userId': user_id, 'items': []})
-        items_list = cart.get('items', [])
-        
-        # 2. Cari apakah produk sudah ada di keranjang
-        item_found = False
-        new_items_list = []
-        
-        for item in items_list:
-            if item['productId'] == product_id:
-                item_found = True
-                if quantity > 0:
-                    # Update quantity jika > 0
-                    item['quantity'] = quantity
-                    new_items_list.append(item)
-                # Jika quantity == 0, kita tidak menambahkannya kembali
-                # (ini sama dengan menghapusnya)
-            else:
-                new_items_list.append(item)
-
-        # 3. Jika produk baru dan quantity > 0, tambahkan ke daftar
-        if not item_found and quantity > 0:
-            new_items_list.append({
-                'productId': product_id,
-                'quantity': quantity
-            })
-
-        # 4. Simpan kembali daftar items yang baru ke DynamoDB
-        # Ini akan menimpa (overwrite) daftar 'items' yang lama
-        response = table.update_item(
-            Key={'userId': user_id},
-            UpdateExpression="SET items = :i",
-            ExpressionAttributeValues={
-                ':i': new_items_list
-            },
-            ReturnValues="ALL_NEW" # Kembalikan item keranjang yang baru
-        )
+    if batch_mode and not replace and len(changes) > MAX_CHANGES_PER_UPDATE:
+        return create_response(400, {'message': f'Maksimal {MAX_CHANGES_PER_UPDATE} produk per batch; '
+                                                'gunakan "replace": true untuk sinkronisasi keranjang penuh'})
 
-        return create_response(200, response.get('Attributes', {}))
+    try:
+        if batch_mode and replace:
+            # Sinkronisasi penuh: isi keranjang diganti dalam satu penulisan
+            cart = replace_items(table, user_id, changes)
+        else:
+            # Satu update_item bersyarat: tidak perlu get_item dulu, dan dua klik
+            # yang bersamaan tidak saling menimpa (quantity <= 0 = hapus produk)
+            cart = apply_changes(table, user_id, changes)
+        return create_response(200, cart)
 
     except Exception as e:
         print(e)
-        return create_response(500, {'message': f"Error internal: {str(e)}"})
\ No newline at end of file
+        return create_response(500, {'message': f"Error internal: {str(e)}"})
@@ -0,0 +1,253 @@
+import functools
+import json
+import os
+import random
+import threading
+import time
+
+# Modul bersama (bukan handler Lambda): instrumentasi ringan per invocation.
+#
+#     @metrics.instrument('getProduct')
+#     def get_prod_handler(event, context):
+#         with metrics.phase('parse'):
+#             data = json.loads(event['body'])
+#
+# Per invocation dicatat: durasi total, cold/warm start, waktu per fase (parse, serialize,
+# compress, ...), jumlah/waktu/retry panggilan DynamoDB dan ConsumedCapacity (dari hook
+# botocore yang dipasang ddb.get_client), serta ukuran response. Hasilnya ditulis ke stdout
+# sebagai satu baris CloudWatch Embedded Metric Format (EMF), jadi langsung menjadi metric
+# CloudWatch per fungsi tanpa APM terpisah.
+#
+# METRICS_SAMPLE_RATE=0 mematikan semua pencatatan. Cold start selalu dicatat walaupun
+# tidak terpilih sampling.
+#
+# Decorator juga mencatat batas waktu invocation (context.get_remaining_time_in_millis)
+# untuk SEMUA invocation, termasuk yang tidak di-sampling; ddb memakainya lewat
+# remaining_time() untuk membatasi timeout dan retry setiap panggilan DynamoDB.
+
+SAMPLE_RATE = float(os.environ.get('METRICS_SAMPLE_RATE', '1'))
+NAMESPACE = os.environ.get('METRICS_NAMESPACE', 'TokoLKS')
+
+_MS = 'Milliseconds'
+
+# Satu container Lambda hanya menjalankan satu invocation pada satu waktu, jadi
+# invocation yang sedang dicatat cukup disimpan global (bukan thread-local), sehingga
+# panggilan DynamoDB dari thread worker (parallel_scan, batch_write_items) ikut terhitung.
+_current = None
+_cold_start = True
+# time.perf_counter() saat invocation yang sedang berjalan akan diputus Lambda (None di luar Lambda)
+_deadline = None
+_lock = threading.Lock()
+
+
+class _Invocation:
+    __slots__ = ('name', 'cold_start', 'start', 'phases', 'ddb_calls', 'ddb_errors', 'ddb_ms',
+                 'capacity', 'retries', 'hedges', 'hedges_won')
+
+    def __init__(self, name, cold_start):
+        self.name = name
+        self.cold_start = cold_start
+        self.start = time.perf_counter()
+        self.phases = {}
+        self.ddb_calls = 0
+        self.ddb_errors = 0
+        self.ddb_ms = 0.0
+        self.capacity = 0.0
+        self.retries = 0
+        self.hedges = 0
+        self.hedges_won = 0
+
+
+class _Phase:
+    __slots__ = ('invocation', 'name', 'start')
+
+    def __init__(self, invocation, name):
+        self.invocation = invocation
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        elapsed = (time.perf_counter() - self.start) * 1000
+        with _lock:
+            self.invocation.phases[self.name] = self.invocation.phases.get(self.name, 0.0) + elapsed
+        return False
+
+
+class _NullPhase:
+    """ Dipakai saat tidak ada invocation yang dicatat: tidak melakukan apa pun """
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_PHASE = _NullPhase()
+
+
+def phase(name):
+    """ Context manager: tambahkan waktu blok ini ke fase 'name' invocation saat ini """
+    invocation = _current
+    if invocation is None:
+        return _NULL_PHASE
+    return _Phase(invocation, name)
+
+
+def remaining_time():
+    """ Sisa waktu invocation saat ini dalam detik, None jika tidak diketahui (di luar Lambda) """
+    deadline = _deadline
+    return None if deadline is None else deadline - time.perf_counter()
+
+
+def _deadline_from(context):
+    get_remaining = getattr(context, 'get_remaining_time_in_millis', None)
+    if not callable(get_remaining):
+        return None
+    return time.perf_counter() + get_remaining() / 1000
+
+
+def instrument(name):
+    """ Decorator untuk handler Lambda: catat batas waktu, invocation, dan tulis baris EMF """
+    def decorator(handler):
+        @functools.wraps(handler)
+        def wrapper(event, context):
+            global _current, _cold_start, _deadline
+            _deadline = _deadline_from(context)
+            try:
+                if SAMPLE_RATE <= 0:
+                    return handler(event, context)
+                cold_start = _cold_start
+                _cold_start = False
+                if not cold_start and SAMPLE_RATE < 1 and random.random() >= SAMPLE_RATE:
+                    return handler(event, context)
+
+                invocation = _Invocation(name, cold_start)
+                _current = invocation
+                response = None
+                try:
+                    response = handler(event, context)
+                    return response
+                finally:
+                    _current = None
+                    emit(invocation, event, context, response)
+            finally:
+                _deadline = None
+        return wrapper
+    return decorator
+
+
+def record_hedge(won):
+    """ Catat satu hedged read (request kedua dikirim); won = request kedua yang menjawab duluan """
+    invocation = _current
+    if invocation is None:
+        return
+    with _lock:
+        invocation.hedges += 1
+        invocation.hedges_won += 1 if won else 0
+
+
+def emit(invocation, event, context, response):
+    """ Tulis satu baris JSON EMF ke stdout (CloudWatch Logs mengubahnya menjadi metric) """
+    duration = (time.perf_counter() - invocation.start) * 1000
+    values = {
+        'Duration': round(duration, 3),
+        'ColdStart': 1 if invocation.cold_start else 0,
+        'DynamoDBCalls': invocation.ddb_calls,
+        'DynamoDBErrors': invocation.ddb_errors,
+        'DynamoDBTime': round(invocation.ddb_ms, 3),
+        'DynamoDBRetries': invocation.retries,
+        'ConsumedCapacity': invocation.capacity,
+        'DynamoDBHedges': invocation.hedges,
+        'DynamoDBHedgesWon': invocation.hedges_won,
+    }
+    units = {'Duration': _MS, 'ColdStart': 'Count', 'DynamoDBCalls': 'Count', 'DynamoDBErrors': 'Count',
+             'DynamoDBTime': _MS, 'DynamoDBRetries': 'Count', 'ConsumedCapacity': 'Count',
+             'DynamoDBHedges': 'Count', 'DynamoDBHedgesWon': 'Count'}
+    for phase_name, elapsed in invocation.phases.items():
+        values[f'Phase_{phase_name}'] = round(elapsed, 3)
+        units[f'Phase_{phase_name}'] = _MS
+
+    record = {
+        '_aws': {
+            'Timestamp': int(time.time() * 1000),
+            'CloudWatchMetrics': [{
+                'Namespace': NAMESPACE,
+                'Dimensions': [['Function']],
+                'Metrics': [{'Name': metric, 'Unit': unit} for metric, unit in units.items()],
+            }],
+        },
+        'Function': invocation.name,
+        'requestId': getattr(context, 'aws_request_id', None),
+        'httpMethod': (event or {}).get('httpMethod') if isinstance(event, dict) else None,
+    }
+    record.update(values)
+    if isinstance(response, dict):
+        record['statusCode'] = response.get('statusCode')
+        if isinstance(response.get('body'), str):
+            record['ResponseBytes'] = len(response['body'])
+            record['_aws']['CloudWatchMetrics'][0]['Metrics'].append({'Name': 'ResponseBytes', 'Unit': 'Bytes'})
+    else:
+        # Handler melempar exception (atau bukan handler API Gateway)
+        record['error'] = response is None
+    print(json.dumps(record))
+
+
+# --- Hook botocore untuk DynamoDB (dipasang oleh ddb.get_client) ---
+
+# Operasi DynamoDB yang mendukung ReturnConsumedCapacity
+_CAPACITY_OPERATIONS = frozenset(('GetItem', 'PutItem', 'UpdateItem', 'DeleteItem', 'Query', 'Scan',
+                                  'BatchGetItem', 'BatchWriteItem', 'TransactWriteItems', 'TransactGetItems'))
+
+
+def install(client):
+    """ Pasang hook pada client DynamoDB; tanpa invocation aktif, hook langsung kembali """
+    if SAMPLE_RATE <= 0:
+        return
+    events = client.meta.events
+    events.register('provide-client-params.dynamodb', _add_capacity_param)
+    events.register('before-call.dynamodb', _before_call)
+    events.register('after-call.dynamodb', _after_call)
+    events.register('after-call-error.dynamodb', _after_call_error)
+
+
+def _add_capacity_param(params, model, **kwargs):
+    if _current is not None and model.name in _CAPACITY_OPERATIONS:
+        params.setdefault('ReturnConsumedCapacity', 'TOTAL')
+
+
+def _before_call(context, **kwargs):
+    if _current is not None:
+        context['metrics_start'] = time.perf_counter()
+
+
+def _after_call(parsed, context, **kwargs):
+    invocation = _current
+    start = context.get('metrics_start')
+    if invocation is None or start is None:
+        return
+    consumed = parsed.get('ConsumedCapacity') or []
+    if isinstance(consumed, dict):
+        consumed = [consumed]
+    with _lock:
+        invocation.ddb_calls += 1
+        if 'Error' in parsed:
+            # Error dari DynamoDB (misal ConditionalCheckFailed, throttling)
+            invocation.ddb_errors += 1
+        invocation.ddb_ms += (time.perf_counter() - start) * 1000
+        invocation.capacity += sum(entry.get('CapacityUnits', 0) for entry in consumed)
+        invocation.retries += parsed.get('ResponseMetadata', {}).get('RetryAttempts', 0)
+
+
+def _after_call_error(context, **kwargs):
+    # Error jaringan/timeout (tidak ada respon dari DynamoDB)
+    invocation = _current
+    start = context.get('metrics_start')
+    if invocation is None or start is None:
+        return
+    with _lock:
+        invocation.ddb_calls += 1
+        invocation.ddb_errors += 1
+        invocation.ddb_ms += (time.perf_counter() - start) * 1000
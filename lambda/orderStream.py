@@ -0,0 +1,76 @@
+import os
+from order_model import archive_record
+from order_stats import apply_deltas, order_deltas
+from inventory import release_cancelled
+import ddb
+import metrics
+
+# Consumer DynamoDB Stream dari tabel pesanan (StreamViewType: NEW_AND_OLD_IMAGES).
+# Efek samping setiap pesanan baru / perubahan status dikerjakan di sini secara batch:
+#   1. Arsip di HISTORY_TABLE (kits-history) diperbarui (BatchWriteItem, idempoten)
+#   2. Statistik di STATS_TABLE (per status, per hari, revenue) diubah dengan ADD
+#      (satu transaksi per batch, lihat order_stats.py)
+#   3. Stok pesanan yang baru dibatalkan ('reservedStock') dikembalikan (lihat inventory.py)
+#
+# Event source mapping harus memakai FunctionResponseTypes: ReportBatchItemFailures.
+# Jika ada yang gagal, hanya record PERTAMA yang gagal dilaporkan, sehingga Lambda
+# mengulang dari record itu dan record sebelumnya tidak diproses (dihitung) dua kali.
+#
+# Coba lokal dengan event rekaman:
+#     cd lambda && python -c "import json, orderStream; \
+#         print(orderStream.stream_handler(json.load(open('../events/orderStream.json')), None))"
+HISTORY_TABLE = os.environ.get('HISTORY_TABLE', 'kits-history')
+
+
+def parse_record(record):
+    """ (old_image, new_image, arsip atau None) dari satu record stream """
+    change = record['dynamodb']
+    old = ddb.deserialize_item(change['OldImage']) if 'OldImage' in change else None
+    new = ddb.deserialize_item(change['NewImage']) if 'NewImage' in change else None
+    # REMOVE: arsip tetap disimpan apa adanya
+    archive = archive_record(new) if new else None
+    return old, new, archive
+
+
+@metrics.instrument('orderStream')
+def stream_handler(event, context):
+    records = event.get('Records', [])
+    failed_at = len(records)  # index record pertama yang gagal
+
+    parsed = []
+    for i, record in enumerate(records):
+        try:
+            parsed.append(parse_record(record))
+        except Exception as e:
+            print(f"ERROR: Record {record.get('eventID')} tidak valid: {e}")
+            failed_at = i
+            break
+
+    # 1. Arsip: cukup image TERBARU per orderId (BatchWriteItem tidak boleh key ganda)
+    latest = {}
+    first_index = {}
+    for i, (_, _, archive) in enumerate(parsed):
+        if archive:
+            latest[archive['orderId']] = archive
+            first_index.setdefault(archive['orderId'], i)
+    for item, message in ddb.batch_write_items(HISTORY_TABLE, list(latest.values())):
+        print(f"ERROR: Gagal mengarsipkan {item['orderId']}: {message}")
+        failed_at = min(failed_at, first_index[item['orderId']])
+
+    # 2. Counter: hanya record sebelum kegagalan pertama (sisanya akan diulang Lambda)
+    counted = parsed[:failed_at]
+    if counted:
+        sequence_numbers = [records[i]['dynamodb']['SequenceNumber'] for i in range(len(counted))]
+        request_id = f'{sequence_numbers[0]}-{sequence_numbers[-1]}'
+        changes = [(old, new) for old, new, _ in counted]
+        try:
+            apply_deltas(order_deltas(changes), request_id=request_id)
+            # 3. Stok pesanan yang dibatalkan (token dari request_id: retry tidak menghitung dua kali)
+            release_cancelled(changes, request_id)
+        except Exception as e:
+            print(f"ERROR: Gagal memperbarui statistik / stok: {e}")
+            failed_at = 0
+
+    if failed_at < len(records):
+        return {'batchItemFailures': [{'itemIdentifier': records[failed_at]['dynamodb']['SequenceNumber']}]}
+    return {'batchItemFailures': []}
@@ -0,0 +1,163 @@
+import datetime
+import operator
+import uuid
+from decimal import Decimal, InvalidOperation
+
+# Modul bersama (bukan handler Lambda): bentuk data pesanan yang dipakai
+# createOrders, placeOrder dan Checkout, supaya ketiganya menyimpan field yang sama.
+
+# Namespace tetap untuk orderId deterministik dari idempotency key
+_ORDER_ID_NAMESPACE = uuid.UUID('6f1c1d52-3c1b-4d8e-9a47-0f0a0e9b7c21')
+
+# Alur status pesanan: status -> status berikutnya yang diizinkan
+ALLOWED_TRANSITIONS = {
+    'PENDING': ('PAID', 'CANCELLED'),
+    'PAID': ('SHIPPED', 'CANCELLED'),
+    'SHIPPED': ('DELIVERED',),
+    'DELIVERED': (),
+    'CANCELLED': (),
+}
+ORDER_STATUSES = tuple(ALLOWED_TRANSITIONS)
+
+# Field untuk tampilan ringkas pesanan (?view=summary) di endpoint daftar
+ORDER_SUMMARY_FIELDS = ['orderId', 'status', 'totalPrice', 'createdAt', 'itemCount']
+
+
+def parse_order_request(data):
+    """
+    Ambil field pesanan dari body request frontend.
+    Raise KeyError/TypeError jika field wajib (userId, items) hilang, ValueError jika
+    baris items tidak valid. Quantity di hasil sudah berupa Decimal.
+    """
+    items = data['items']
+    if not isinstance(items, list) or not items:
+        raise TypeError("Field 'items' harus berupa list yang tidak kosong")
+    return {
+        'user_id': data['userId'],
+        'items': [parse_line(item) for item in items],
+        'customer_name': data.get('nama', 'N/A'),
+        'shipping_address': data.get('alamat', 'N/A'),
+        'payment_method': data.get('metodePembayaran', 'N/A')
+    }
+
+
+def parse_line(item):
+    """ Validasi satu baris {productId, quantity}; quantity harus bilangan bulat > 0 """
+    if not isinstance(item, dict):
+        raise ValueError('Setiap baris items harus berupa objek {productId, quantity}')
+    product_id = item.get('productId')
+    if not isinstance(product_id, str) or not product_id:
+        raise ValueError("Field 'productId' wajib diisi (string)")
+    try:
+        quantity = Decimal(str(item.get('quantity')))
+    except InvalidOperation:
+        quantity = None
+    if quantity is None or not quantity.is_finite() or quantity <= 0 or quantity != quantity.to_integral_value():
+        raise ValueError(f"Quantity untuk produk {product_id} harus bilangan bulat positif")
+    return dict(item, quantity=Decimal(int(quantity)))
+
+
+def order_id_for(user_id, idempotency_key=None):
+    """
+    orderId baru. Jika ada idempotency key, orderId-nya SELALU sama untuk
+    (userId, key) yang sama, jadi retry dari client tidak membuat pesanan ganda.
+    """
+    if idempotency_key:
+        return str(uuid.uuid5(_ORDER_ID_NAMESPACE, f'{user_id}:{idempotency_key}'))
+    return str(uuid.uuid4())
+
+
+def price_line_items(items, products):
+    """
+    Bangun baris pesanan dengan harga dari DATABASE (bukan harga kiriman client).
+    products: {productId: produk} hasil product_lookup.get_products.
+    Raise ValueError jika produk tidak ada atau quantity tidak valid.
+    """
+    lines = []
+    for item in items:
+        product_id = item['productId']
+        quantity = Decimal(str(item['quantity']))
+        if quantity <= 0 or quantity != quantity.to_integral_value():
+            raise ValueError(f"Quantity untuk produk {product_id} harus bilangan bulat positif")
+        product = products.get(product_id)
+        if product is None:
+            raise ValueError(f"Produk tidak ditemukan: {product_id}")
+        lines.append({
+            'productId': product_id,
+            'name': product.get('name', ''),
+            'price': Decimal(str(product['price'])),
+            'quantity': quantity,
+            'imageUrl': product.get('imageUrl', '')
+        })
+    return lines
+
+
+def order_total(lines):
+    """ Total = jumlah (harga x quantity) semua baris, dalam Decimal """
+    prices = [line['price'] for line in lines]
+    quantities = [line['quantity'] for line in lines]
+    return sum(map(operator.mul, prices, quantities), Decimal(0))
+
+
+def previous_statuses(new_status):
+    """
+    Status asal yang boleh berpindah ke new_status (dipakai di ConditionExpression).
+    new_status sendiri ikut diizinkan agar retry update yang sama tetap berhasil.
+    """
+    return [status for status, targets in ALLOWED_TRANSITIONS.items()
+            if new_status in targets or status == new_status]
+
+
+def item_count(lines):
+    """ Jumlah barang dalam pesanan (total quantity semua baris) """
+    return sum(int(line.get('quantity', 0)) for line in lines)
+
+
+def order_summary(order):
+    """ Bentuk ringkas pesanan: hanya ORDER_SUMMARY_FIELDS """
+    return {field: order.get(field) for field in ORDER_SUMMARY_FIELDS}
+
+
+def new_order(user_id, items, customer_name, shipping_address, payment_method, order_id=None):
+    """ Buat item pesanan baru (status PENDING). items = baris dari price_line_items """
+    total_price = order_total(items)
+    return {
+        'orderId': order_id or str(uuid.uuid4()),
+        'userId': user_id,
+        'items': items,
+        'totalPrice': total_price,
+        'itemCount': item_count(items),  # Disimpan agar ?view=summary tidak perlu membaca 'items'
+        'status': 'PENDING',  # Status awal pesanan
+        'createdAt': datetime.datetime.now().isoformat(),
+        'customerName': customer_name,
+        'shippingAddress': shipping_address,
+        'paymentMethod': payment_method
+    }
+
+
+def archive_record(order):
+    """ Item untuk tabel arsip (kits-history) dari sebuah pesanan """
+    return {
+        'orderId': order['orderId'],
+        'userId': order['userId'],
+        'items': order['items'],
+        'totalPrice': Decimal(str(order['totalPrice'])),
+        'createdAt': order['createdAt'],
+        'status': order.get('status', 'PENDING'),
+        'customerName': order.get('customerName', 'N/A'),
+        'shippingAddress': order.get('shippingAddress', 'N/A'),
+        'paymentMethod': order.get('paymentMethod', 'N/A')
+    }
+
+
+def validate_archive_record(record):
+    """
+    Cek tipe field kunci record arsip dari client (Checkout) sebelum ditulis / dikirim
+    ke antrian: orderId dan userId string tidak kosong, items list. Raise ValueError.
+    """
+    for field in ('orderId', 'userId'):
+        if not isinstance(record[field], str) or not record[field]:
+            raise ValueError(f"Field '{field}' harus string yang tidak kosong")
+    if not isinstance(record['items'], list):
+        raise ValueError("Field 'items' harus berupa list")
+    return record
@@ -0,0 +1,123 @@
+import os
+import uuid
+from collections import Counter, defaultdict
+from decimal import Decimal
+import ddb
+
+# Modul bersama (bukan handler Lambda): statistik pesanan yang sudah diagregasi.
+# Satu item per 'scope' di STATS_TABLE (partition key 'scope', String):
+#     {'scope': 'ALL',            'orderCount': 42, 'revenue': 1250000, 'PENDING': 12, 'PAID': 30}
+#     {'scope': 'DAY#2026-10-18', 'orderCount': 5,  'revenue': 300000,  'PENDING': 5}
+# Scope DAY# dihitung dari tanggal 'createdAt' pesanan. 'revenue' = total harga pesanan
+# yang tidak CANCELLED. Nilai hanya diubah dengan ADD (atomik), oleh orderStream.py dari
+# DynamoDB Stream, sehingga setiap penulisan ke tabel pesanan (createOrders, placeOrder,
+# updateOrder) dihitung tepat di satu tempat.
+
+STATS_TABLE = os.environ.get('STATS_TABLE', 'order-stats')
+ALL_SCOPE = 'ALL'
+DAY_SCOPE_PREFIX = 'DAY#'
+
+# Atribut non-status di item statistik
+COUNT_FIELD = 'orderCount'
+REVENUE_FIELD = 'revenue'
+
+# TransactWriteItems dibatasi 100 operasi
+TRANSACT_LIMIT = 100
+
+# Namespace tetap untuk ClientRequestToken transaksi dari nomor urut stream
+_TOKEN_NAMESPACE = uuid.UUID('0b8f4c2e-5d7a-4e61-8f3b-2a9c6d1e7f40')
+
+
+def day_scope(date):
+    """ Scope harian, misal 'DAY#2026-10-18' (date: string YYYY-MM-DD) """
+    return DAY_SCOPE_PREFIX + date
+
+
+def _contribution(order):
+    """ Sumbangan satu pesanan ke statistik: {atribut: nilai} """
+    if not order:
+        return {}
+    status = order.get('status')
+    contribution = {COUNT_FIELD: 1}
+    if status:
+        contribution[status] = 1
+    if status != 'CANCELLED':
+        contribution[REVENUE_FIELD] = Decimal(str(order.get('totalPrice', 0)))
+    return contribution
+
+
+def _scopes(order):
+    scopes = [ALL_SCOPE]
+    created_at = (order or {}).get('createdAt')
+    if created_at:
+        scopes.append(day_scope(created_at[:10]))
+    return scopes
+
+
+def order_deltas(changes):
+    """
+    Perubahan statistik per scope dari daftar (old_image, new_image):
+    sumbangan image baru dikurangi sumbangan image lama. Contoh:
+    INSERT PENDING -> PENDING +1, orderCount +1, revenue +total;
+    MODIFY PENDING -> CANCELLED -> PENDING -1, CANCELLED +1, revenue -total.
+    Mengembalikan {scope: {atribut: delta}} tanpa delta nol.
+    """
+    deltas = defaultdict(Counter)
+    for old, new in changes:
+        for sign, order in ((-1, old), (1, new)):
+            for scope in _scopes(order):
+                for attribute, value in _contribution(order).items():
+                    deltas[scope][attribute] += sign * value
+    return {
+        scope: {attribute: delta for attribute, delta in values.items() if delta}
+        for scope, values in deltas.items()
+        if any(values.values())
+    }
+
+
+def counter_update(scope, deltas):
+    """ Operasi Update untuk transact_write_items: ADD setiap counter di item 'scope' """
+    names = {}
+    values = {}
+    parts = []
+    for i, (attribute, delta) in enumerate(sorted(deltas.items())):
+        names[f'#c{i}'] = attribute
+        values[f':c{i}'] = delta
+        parts.append(f'#c{i} :c{i}')
+    return {'Update': {
+        'TableName': STATS_TABLE,
+        'Key': {'scope': scope},
+        'UpdateExpression': 'ADD ' + ', '.join(parts),
+        'ExpressionAttributeNames': names,
+        'ExpressionAttributeValues': values
+    }}
+
+
+def apply_deltas(deltas_by_scope, request_id=None):
+    """
+    Tulis semua perubahan counter dalam SATU transaksi (semua scope berhasil bersama).
+    request_id (misal nomor urut record stream) dijadikan ClientRequestToken, jadi
+    retry batch yang sama dalam 10 menit tidak menghitung dua kali.
+    """
+    operations = [counter_update(scope, deltas) for scope, deltas in sorted(deltas_by_scope.items()) if deltas]
+    # Lebih dari 100 scope (sangat jarang: batch berisi pesanan dari >99 hari berbeda)
+    # dipecah per 100; retry chunk yang sudah sukses tetap aman karena token-nya sama
+    for start in range(0, len(operations), TRANSACT_LIMIT):
+        kwargs = {}
+        if request_id:
+            kwargs['ClientRequestToken'] = str(uuid.uuid5(_TOKEN_NAMESPACE, f'{request_id}#{start}'))
+        ddb.transact_write_items(operations[start:start + TRANSACT_LIMIT], **kwargs)
+
+
+def stats_view(scope, item):
+    """ Bentuk respon API untuk satu item statistik (item boleh None = belum ada pesanan) """
+    item = item or {}
+    return {
+        'scope': scope,
+        'orderCount': item.get(COUNT_FIELD, 0),
+        'revenue': item.get(REVENUE_FIELD, 0),
+        'statusCounts': {
+            attribute: value for attribute, value in item.items()
+            if attribute not in ('scope', COUNT_FIELD, REVENUE_FIELD)
+        }
+    }
@@ -0,0 +1,111 @@
+import json
+import os
+from decimal import Decimal
+from api_response import create_response, get_header
+from order_model import parse_order_request, price_line_items, new_order, order_id_for, archive_record
+from product_lookup import get_products
+from inventory import OutOfStock, reserve_items, release_items, reserved_quantities
+import ddb
+import metrics
+
+# Satu jalur pemesanan: menggantikan panggilan /orders (createOrders) lalu /checkout (Checkout).
+# Pesanan, arsip (kits-history) dan pengosongan keranjang ditulis dalam SATU TransactWriteItems.
+ORDERS_TABLE = os.environ.get('ORDERS_TABLE')
+CART_TABLE = os.environ.get('CART_TABLE')
+HISTORY_TABLE = os.environ.get('HISTORY_TABLE', 'kits-history')
+orders_table = ddb.Table(ORDERS_TABLE)
+
+def is_duplicate_order(error):
+    """ True jika transaksi batal karena orderId (dari idempotency key) sudah ada """
+    if ddb.error_code(error) != 'TransactionCanceledException':
+        return False
+    reasons = error.response.get('CancellationReasons') or []
+    return bool(reasons) and reasons[0].get('Code') == 'ConditionalCheckFailed'
+
+# --- Fungsi Handler Utama ---
+
+@metrics.instrument('placeOrder')
+def place_order_handler(event, context):
+    try:
+        with metrics.phase('parse'):
+            data = json.loads(event['body'], parse_float=Decimal)
+        order_request = parse_order_request(data)
+        # Idempotency key dari header atau body: retry dengan key yang sama = pesanan yang sama
+        idempotency_key = get_header(event, 'Idempotency-Key') or data.get('idempotencyKey')
+    except Exception as e:
+        print(f"JSON Body tidak valid: {e}")
+        return create_response(400, {'message': f"Body JSON tidak valid: {str(e)}"})
+
+    order_id = order_id_for(order_request['user_id'], idempotency_key)
+    if idempotency_key:
+        # Retry pesanan yang sudah tersimpan: kembalikan pesanan itu SEBELUM stok diambil
+        # lagi (reservasi ulang bisa membuat pembeli lain mendapat 409 palsu)
+        try:
+            existing = orders_table.get_item(Key={'orderId': order_id}, ConsistentRead=True).get('Item')
+        except Exception as e:
+            print(f"Error saat memeriksa pesanan: {e}")
+            return create_response(500, {'message': f"Error internal server: {str(e)}"})
+        if existing:
+            return create_response(200, existing)
+
+    try:
+        # Harga diambil dari tabel produk (satu BatchGetItem), BUKAN dari harga kiriman client
+        products = get_products([item['productId'] for item in order_request['items']])
+        order_request['items'] = price_line_items(order_request['items'], products)
+    except ValueError as e:
+        return create_response(400, {'message': str(e)})
+    except Exception as e:
+        print(f"Error saat membaca produk: {e}")
+        return create_response(500, {'message': f"Error internal server: {str(e)}"})
+
+    try:
+        # Kurangi stok (ADD bersyarat per shard) SEBELUM transaksi pesanan: tidak ada overselling
+        reservation = reserve_items(order_request['items'])
+    except OutOfStock as e:
+        if idempotency_key:
+            # Request pertama dengan key yang sama selesai bersamaan: stoknya memang sudah terpakai pesanan itu
+            existing = orders_table.get_item(Key={'orderId': order_id}, ConsistentRead=True).get('Item')
+            if existing:
+                return create_response(200, existing)
+        return create_response(409, {'message': str(e), 'productId': e.product_id,
+                                     'requested': e.requested, 'available': e.available})
+    except Exception as e:
+        print(f"Error saat reservasi stok: {e}")
+        return create_response(500, {'message': f"Error internal server: {str(e)}"})
+
+    try:
+        order_item = new_order(order_id=order_id, **order_request)
+        if reservation:
+            # Dipakai orderStream.py untuk mengembalikan stok jika pesanan dibatalkan
+            order_item['reservedStock'] = reserved_quantities(reservation)
+
+        ddb.transact_write_items([
+            # 1. Pesanan baru (gagal jika orderId sudah ada = retry dari client)
+            {'Put': {
+                'TableName': ORDERS_TABLE,
+                'Item': order_item,
+                'ConditionExpression': 'attribute_not_exists(orderId)'
+            }},
+            # 2. Arsip checkout
+            {'Put': {
+                'TableName': HISTORY_TABLE,
+                'Item': archive_record(order_item)
+            }},
+            # 3. Kosongkan keranjang pengguna
+            {'Delete': {
+                'TableName': CART_TABLE,
+                'Key': {'userId': order_item['userId']}
+            }}
+        ])
+        return create_response(201, order_item)
+
+    except Exception as e:
+        # Pesanan tidak tersimpan (atau sudah ada dari request sebelumnya): kembalikan stok
+        release_items(reservation)
+        if is_duplicate_order(e):
+            # Pesanan ini sudah pernah dibuat: kembalikan pesanan yang sudah ada
+            existing = orders_table.get_item(Key={'orderId': order_id}, ConsistentRead=True).get('Item')
+            if existing:
+                return create_response(200, existing)
+        print(f"Error saat menyimpan pesanan: {e}")
+        return create_response(500, {'message': f"Error internal server: {str(e)}"})
@@ -0,0 +1,72 @@
+import os
+from ttl_cache import TTLCache
+from catalog_version import CATALOG_VERSION_KEY
+from catalog_sync import is_deleted
+import ddb
+
+# Modul bersama (bukan handler Lambda): ambil data produk (harga, nama, gambar)
+# untuk banyak productId sekaligus, dengan SATU BatchGetItem per 100 produk.
+# Hasilnya disimpan di cache in-memory berumur pendek (container warm),
+# sehingga produk yang sering dipesan tidak dibaca ulang setiap request.
+#
+# Key cache memuat versi katalog (catalog_version.py): setelah PUT/DELETE produk versi
+# naik, jadi harga baru dipakai dan produk yang dihapus ditolak tanpa menunggu TTL harga.
+# Versi itu sendiri di-cache CATALOG_VERSION_CACHE_SECONDS, dan saat perlu dibaca ulang
+# ikut di BatchGetItem produk yang sama (bukan GetItem terpisah): get_products tetap
+# paling banyak satu round trip, dan nol jika semua produk ada di cache.
+
+PRODUCTS_TABLE = os.environ.get('PRODUCTS_TABLE')
+PRICE_CACHE_TTL_SECONDS = float(os.environ.get('PRICE_CACHE_TTL_SECONDS', '30'))
+# Perubahan harga / penghapusan produk terlihat paling lambat setelah sekian detik
+CATALOG_VERSION_CACHE_SECONDS = float(os.environ.get('CATALOG_VERSION_CACHE_SECONDS', '2'))
+
+# Field produk yang dibutuhkan untuk menghitung pesanan / menampilkan keranjang
+PRODUCT_FIELDS = ['productId', 'name', 'price', 'imageUrl']
+
+product_cache = TTLCache(ttl=PRICE_CACHE_TTL_SECONDS)
+_version_cache = TTLCache(maxsize=1, ttl=CATALOG_VERSION_CACHE_SECONDS)
+
+
+def get_products(product_ids):
+    """
+    Kembalikan {productId: produk} untuk produk yang ADA.
+    Produk yang tidak ditemukan (atau sudah dihapus) tidak ada di hasil.
+    """
+    # Buang duplikat (urutan tetap) dan item versi katalog
+    product_ids = [product_id for product_id in dict.fromkeys(product_ids) if product_id != CATALOG_VERSION_KEY]
+    if not product_ids:
+        return {}
+    version = _version_cache.get('version')
+    products = {}
+    missing = product_ids
+    if version is not None:
+        missing = []
+        for product_id in product_ids:
+            cached = product_cache.get((version, product_id))
+            if cached is not None:
+                products[product_id] = cached
+            else:
+                missing.append(product_id)
+    if not missing and version is not None:
+        return products
+
+    keys = [{'productId': product_id} for product_id in missing]
+    read_version = version is None
+    if read_version:
+        keys.append({'productId': CATALOG_VERSION_KEY})
+        # Item versi tidak ada = belum pernah ada penulisan produk
+        version = 0
+    fetched = []
+    # 'deleted' ikut dibaca agar tombstone (produk yang sudah dihapus) dilewati;
+    # 'version' hanya ada di item versi katalog
+    for item in ddb.batch_get_items(PRODUCTS_TABLE, keys, projection=PRODUCT_FIELDS + ['deleted', 'version']):
+        if item['productId'] == CATALOG_VERSION_KEY:
+            version = int(item.get('version', 0))
+        elif not is_deleted(item):
+            fetched.append(item)
+    if read_version:
+        _version_cache.set('version', version)
+    for item in fetched:
+        product_cache.set((version, item['productId']), item)
+        products[item['productId']] = item
+    return products
@@ -0,0 +1,115 @@
+import importlib
+import re
+from api_response import create_response
+
+# Entry point GABUNGAN (opsional): satu fungsi Lambda untuk semua route API.
+#     Handler: router.handler
+#
+# Route dipilih dari tabel ROUTES berdasarkan httpMethod + resource (template path
+# API Gateway, misal /products/{productId}), lalu diteruskan ke handler yang sudah ada
+# TANPA mengubah event. Modul handler di-import saat route-nya pertama kali dipakai
+# (lazy), jadi container tidak membayar biaya import untuk route yang tidak pernah
+# dilayani. Semua route berbagi satu client DynamoDB (ddb.get_client) dan connection
+# pool-nya, sehingga route yang jarang dipakai ikut "warm".
+#
+# Deploy dengan route per endpoint (resource = template di ROUTES), atau dengan satu
+# route proxy (ANY /{proxy+}): resource yang tidak dikenal dicocokkan lewat 'path', dan
+# pathParameters-nya ({'proxy': ...}) diganti dengan parameter dari template.
+#
+# Fungsi per-route yang lama tetap bisa di-deploy seperti biasa.
+
+# (method, resource) -> (modul, fungsi handler)
+ROUTES = {
+    ('GET', '/products'): ('getProduct', 'get_prod_handler'),
+    ('GET', '/products/search'): ('searchProduct', 'search_handler'),
+    ('GET', '/products/{productId}'): ('getProduct', 'get_prod_handler'),
+    ('POST', '/products'): ('createProduct', 'create_Prod_handler'),
+    ('PUT', '/products/{productId}'): ('update_delete_Product', 'prod_handler'),
+    ('DELETE', '/products/{productId}'): ('update_delete_Product', 'prod_handler'),
+    ('GET', '/orders'): ('getOrder', 'get_handler'),
+    ('GET', '/orders/stats'): ('getOrderStats', 'stats_handler'),
+    ('GET', '/orders/{orderId}'): ('getOrder', 'get_handler'),
+    ('GET', '/users/{userId}/orders'): ('getOrder', 'get_handler'),
+    ('POST', '/orders'): ('createOrders', 'lambda_handler'),
+    ('POST', '/orders/place'): ('placeOrder', 'place_order_handler'),
+    ('PUT', '/orders/{orderId}'): ('updateOrder', 'Handler'),
+    ('POST', '/checkout'): ('Checkout', 'checkout_handler'),
+    ('GET', '/cart/{userId}'): ('getCart', 'get_handler'),
+    ('POST', '/cart/{userId}'): ('manageCart', 'cart_handler'),
+}
+
+# Handler yang sudah di-import: (modul, fungsi) -> callable
+_handlers = {}
+
+
+def _compile(resource):
+    """ Template resource -> regex untuk mencocokkan path asli, misal /orders/{orderId} """
+    pattern = re.sub(r'\\\{(\w+)\\\}', r'(?P<\1>[^/]+)', re.escape(resource))
+    return re.compile(f'^{pattern}$')
+
+
+# Template resource yang dikenal (selain itu, misal /{proxy+}, dicocokkan lewat path)
+_RESOURCES = {resource for _, resource in ROUTES}
+
+# Path statis dicoba lebih dulu (/orders/stats sebelum /orders/{orderId})
+_PATTERNS = sorted(
+    {(resource, _compile(resource)) for _, resource in ROUTES},
+    key=lambda entry: (entry[0].count('{'), entry[0])
+)
+
+
+def resolve(event):
+    """
+    Kembalikan (method, resource, pathParameters) untuk event API Gateway.
+    REST API (v1) memakai 'resource'; HTTP API (v2) memakai 'routeKey'.
+    Jika keduanya tidak ada (misal invocation lokal) atau bukan template di ROUTES
+    (route proxy /{proxy+}), 'path' dicocokkan ke ROUTES.
+    """
+    method = event.get('httpMethod') or event.get('requestContext', {}).get('http', {}).get('method')
+    resource = event.get('resource')
+    if not resource and event.get('routeKey') not in (None, '$default'):
+        route_method, _, resource = event['routeKey'].partition(' ')
+        # 'ANY /{proxy+}': method asli ada di requestContext
+        if route_method != 'ANY':
+            method = route_method
+    if resource in _RESOURCES:
+        return method, resource, event.get('pathParameters')
+
+    path = event.get('path') or event.get('rawPath') or ''
+    for template, pattern in _PATTERNS:
+        match = pattern.match(path)
+        if match:
+            return method, template, match.groupdict() or None
+    return method, None, None
+
+
+def get_handler(module_name, function_name):
+    """ Import modul handler saat pertama kali dibutuhkan, lalu di-cache """
+    key = (module_name, function_name)
+    handler = _handlers.get(key)
+    if handler is None:
+        handler = getattr(importlib.import_module(module_name), function_name)
+        _handlers[key] = handler
+    return handler
+
+
+def handler(event, context):
+    method, resource, path_parameters = resolve(event)
+
+    if method == 'OPTIONS':
+        # Preflight CORS untuk semua route
+        return create_response(200, {}, {
+            'Access-Control-Allow-Methods': 'GET,POST,PUT,DELETE,OPTIONS',
+            'Access-Control-Allow-Headers': 'Content-Type,Idempotency-Key,If-None-Match',
+        })
+
+    route = ROUTES.get((method, resource))
+    if route is None:
+        if any(known == resource for _, known in ROUTES):
+            return create_response(405, {'message': f"Method {method} tidak didukung untuk {resource}"})
+        return create_response(404, {'message': 'Route tidak ditemukan'})
+
+    # Handler lama membaca httpMethod & pathParameters gaya REST API (v1)
+    if event.get('httpMethod') != method or path_parameters != event.get('pathParameters'):
+        event = dict(event, httpMethod=method, pathParameters=path_parameters)
+    return get_handler(*route)(event, context)
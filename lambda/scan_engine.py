@@ -0,0 +1,102 @@
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Modul bersama (bukan handler Lambda): mesin Parallel Scan untuk DynamoDB.
+# Ikut di-deploy bersama handler (atau sebagai Lambda Layer) lalu di-import:
+#     from scan_engine import parallel_scan
+
+# Jumlah segmen default untuk Parallel Scan (bisa diatur lewat environment variable)
+DEFAULT_SEGMENTS = int(os.environ.get('SCAN_SEGMENTS', '4'))
+
+# Berapa halaman (page) yang boleh menunggu di antrian sebelum worker berhenti sejenak
+_QUEUE_PAGES_PER_SEGMENT = 2
+
+# Penanda bahwa satu segmen sudah selesai dibaca
+_SEGMENT_DONE = object()
+
+
+def build_projection(fields):
+    """
+    Ubah daftar nama field menjadi ProjectionExpression.
+    Semua nama di-alias (#f0, #f1, ...) karena banyak nama field
+    (misal 'name', 'status') adalah reserved word di DynamoDB.
+    Mengembalikan (expression, expression_attribute_names).
+    """
+    names = {}
+    for i, field in enumerate(fields):
+        names[f'#f{i}'] = field
+    return ', '.join(names.keys()), names
+
+
+def _scan_segment(table, segment, total_segments, scan_kwargs, pages, stop):
+    """ Worker: baca SATU segmen sampai habis (ikuti LastEvaluatedKey) """
+    try:
+        kwargs = dict(scan_kwargs, Segment=segment, TotalSegments=total_segments)
+        while not stop.is_set():
+            response = table.scan(**kwargs)
+            items = response.get('Items', [])
+            if items:
+                _put(pages, items, stop)
+            last_key = response.get('LastEvaluatedKey')
+            if not last_key:
+                break
+            kwargs['ExclusiveStartKey'] = last_key
+        _put(pages, _SEGMENT_DONE, stop)
+    except Exception as e:
+        _put(pages, e, stop)
+
+
+def _put(pages, value, stop):
+    """ Masukkan ke antrian, tapi jangan blok selamanya jika pembaca sudah berhenti """
+    while not stop.is_set():
+        try:
+            pages.put(value, timeout=0.1)
+            return
+        except queue.Full:
+            continue
+
+
+def parallel_scan(table, total_segments=None, projection=None, max_workers=None, **scan_kwargs):
+    """
+    Generator: membaca SELURUH tabel dengan Parallel Scan.
+
+    - Setiap segmen (Segment/TotalSegments) dibaca oleh thread sendiri
+      dan selalu mengikuti LastEvaluatedKey, jadi hasilnya lengkap (tidak
+      berhenti di halaman 1 MB pertama).
+    - Item di-yield begitu halamannya tiba (streaming), urutan antar segmen
+      tidak dijamin.
+    - projection: daftar nama field yang ingin diambil saja (opsional).
+    - scan_kwargs: parameter Scan lain, misal FilterExpression.
+    """
+    total_segments = total_segments or DEFAULT_SEGMENTS
+    scan_kwargs = dict(scan_kwargs)
+
+    if projection:
+        expression, names = build_projection(projection)
+        scan_kwargs['ProjectionExpression'] = expression
+        scan_kwargs['ExpressionAttributeNames'] = dict(scan_kwargs.get('ExpressionAttributeNames', {}), **names)
+
+    # table adalah ddb.Table: client low-level di baliknya aman dipakai bersama antar thread
+    pages = queue.Queue(maxsize=total_segments * _QUEUE_PAGES_PER_SEGMENT)
+    stop = threading.Event()
+
+    executor = ThreadPoolExecutor(max_workers=max_workers or total_segments)
+    try:
+        for segment in range(total_segments):
+            executor.submit(_scan_segment, table, segment, total_segments, scan_kwargs, pages, stop)
+
+        remaining = total_segments
+        while remaining:
+            page = pages.get()
+            if page is _SEGMENT_DONE:
+                remaining -= 1
+            elif isinstance(page, Exception):
+                raise page
+            else:
+                yield from page
+    finally:
+        # Hentikan worker jika pembaca berhenti lebih awal atau terjadi error
+        stop.set()
+        executor.shutdown(wait=False)
@@ -0,0 +1,74 @@
+from decimal import Decimal, InvalidOperation
+from api_response import create_response
+from list_params import decode_next_token, encode_next_token, parse_limit
+from search_index import get_index
+import metrics
+
+# Pencarian produk dari indeks di memori (lihat search_index.py), BUKAN Scan tabel produk.
+# Hasil berisi ringkasan produk (productId, name, price, imageUrl); detail lengkap tetap
+# dari GET /products/{productId}.
+
+DEFAULT_SEARCH_LIMIT = 20
+SORT_OPTIONS = ('relevance', 'name', 'price', '-price')
+
+# --- Helper Functions ---
+
+def parse_price(query_params, name):
+    value = query_params.get(name)
+    if value in (None, ''):
+        return None
+    try:
+        price = Decimal(value)
+    except InvalidOperation:
+        raise ValueError(f"Parameter '{name}' harus berupa angka")
+    if not price.is_finite() or price < 0:
+        raise ValueError(f"Parameter '{name}' harus berupa angka")
+    return price
+
+def parse_offset(token):
+    """ nextToken pencarian berisi posisi (offset) halaman berikutnya """
+    if not token:
+        return 0
+    offset = decode_next_token(token).get('offset')
+    if not isinstance(offset, Decimal) or offset < 0 or offset != int(offset):
+        raise ValueError("nextToken tidak valid")
+    return int(offset)
+
+# --- Fungsi Handler Utama ---
+# GET /products/search?q=kaos pol&minPrice=50000&maxPrice=150000&sort=price&limit=20&nextToken=...
+#   q        : semua kata harus cocok (nama/deskripsi); kata terakhir dicocokkan sebagai prefix
+#   prefix=0 : kata terakhir juga harus cocok persis
+#   sort     : relevance (default jika ada q), name (default tanpa q), price, -price
+
+@metrics.instrument('searchProduct')
+def search_handler(event, context):
+    query_params = event.get('queryStringParameters') or {}
+    query = (query_params.get('q') or '').strip()
+    sort = query_params.get('sort') or None
+    try:
+        min_price = parse_price(query_params, 'minPrice')
+        max_price = parse_price(query_params, 'maxPrice')
+        limit = parse_limit(query_params.get('limit'), default=DEFAULT_SEARCH_LIMIT)
+        offset = parse_offset(query_params.get('nextToken'))
+        if sort is not None and sort not in SORT_OPTIONS:
+            raise ValueError(f"Parameter 'sort' harus salah satu dari: {', '.join(SORT_OPTIONS)}")
+    except ValueError as e:
+        return create_response(400, {'message': str(e)})
+
+    try:
+        index = get_index()
+        with metrics.phase('search'):
+            product_ids = index.search(query, min_price, max_price,
+                                       prefix=query_params.get('prefix') not in ('0', 'false'))
+            ranked = index.rank(product_ids, query, sort)
+            page = ranked[offset:offset + limit]
+            body = {
+                'items': [index.view(product_id) for product_id in page],
+                'total': len(ranked),
+                'facets': {'price': index.price_facets(product_ids)},
+                'nextToken': encode_next_token({'offset': offset + limit}) if offset + limit < len(ranked) else None
+            }
+        return create_response(200, body, event=event)
+    except Exception as e:
+        print(e)
+        return create_response(500, {'message': f"Error internal: {str(e)}"})
@@ -0,0 +1,389 @@
+import json
+import os
+import re
+import time
+import unicodedata
+import zlib
+from bisect import bisect_left, bisect_right
+from decimal import Decimal
+from scan_engine import parallel_scan
+from catalog_version import get_catalog_version
+from catalog_sync import live_products_filter
+import ddb
+
+# Modul bersama (bukan handler Lambda): indeks pencarian produk di memori.
+#
+# - Inverted index: token dari 'name' dan 'description' -> set productId
+# - Daftar harga terurut: filter rentang harga cukup dengan bisect
+# - Ringkasan produk (nama, harga, gambar) ikut disimpan, jadi hasil pencarian
+#   tidak perlu membaca tabel produk sama sekali
+#
+# Seluruh indeks diserialisasi menjadi SATU blob (JSON + zlib) di tabel SEARCH_INDEX_TABLE
+# (key 'indexId'). Blob dipecah per PART_BYTES (batas item DynamoDB 400 KB) dengan key
+# 'products#<generation>#<n>', dan item manifest 'products' menunjuk generation yang
+# berlaku. Setiap penulisan produk memperbarui indeks secara inkremental lalu menulis
+# generation baru dalam SATU transaksi (part baru + manifest bersyarat + hapus part lama),
+# sehingga pembaca tidak pernah melihat campuran dua generation.
+#
+# Jika sebuah penulisan produk gagal memperbarui indeks, sync_after_write menandai
+# manifest ('staleMarks'); penulisan berikutnya melihat tanda itu lalu membangun ulang
+# indeks dari tabel produk. Tanpa tanda, indeks selalu diperbarui inkremental, walaupun
+# beberapa penulis selesai tidak berurutan.
+#
+# Container yang warm menyimpan indeks yang sudah di-load (get_index); manifest dicek
+# paling sering sekali per INDEX_CHECK_SECONDS. Latensi pencarian tidak bergantung pada
+# jumlah produk di katalog (tidak ada Scan).
+
+SEARCH_INDEX_TABLE = os.environ.get('SEARCH_INDEX_TABLE', 'search-index')
+PRODUCTS_TABLE = os.environ.get('PRODUCTS_TABLE')
+INDEX_CHECK_SECONDS = float(os.environ.get('SEARCH_INDEX_CHECK_SECONDS', '5'))
+
+INDEX_NAME = 'products'
+FORMAT_VERSION = 1
+# Ukuran maksimal satu part blob (di bawah batas item 400 KB)
+PART_BYTES = 350 * 1024
+# Transaksi dibatasi 4 MB: part baru + part lama harus muat dalam satu TransactWriteItems
+MAX_PARTS = 10
+WRITE_RETRIES = 5
+
+MIN_TOKEN_LENGTH = 2
+_TOKEN = re.compile(r'[0-9a-z]+')
+
+# Batas bucket harga untuk facet (Rupiah), misal "<50rb", "50rb-100rb", ...
+PRICE_FACET_EDGES = [Decimal(edge) for edge in os.environ.get(
+    'SEARCH_PRICE_FACETS', '50000,100000,250000,500000,1000000').split(',')]
+
+
+def tokenize(text):
+    """ 'Kaos Polos Katun, 100%' -> ['kaos', 'polos', 'katun', '100'] (huruf kecil, tanpa aksen) """
+    if not isinstance(text, str) or not text:
+        return []
+    text = unicodedata.normalize('NFKD', text.lower())
+    text = ''.join(c for c in text if not unicodedata.combining(c))
+    return [token for token in _TOKEN.findall(text) if len(token) >= MIN_TOKEN_LENGTH]
+
+
+def _price(value):
+    try:
+        price = Decimal(str(value))
+    except ArithmeticError:
+        return Decimal(0)
+    return price if price.is_finite() else Decimal(0)
+
+
+class SearchIndex:
+    """
+    Indeks pencarian produk. docs menyimpan bentuk yang diserialisasi
+    ([nama, harga, imageUrl, token deskripsi]); postings dan daftar harga
+    terurut dibangun dari docs.
+    """
+    def __init__(self, docs=None, generation=0, catalog_version=0):
+        self.generation = generation
+        self.catalog_version = catalog_version
+        self.docs = {}
+        self.postings = {}
+        self._name_tokens = {}
+        self._terms = None   # token terurut (untuk pencarian prefix), dibangun saat dibutuhkan
+        self._prices = None  # [(harga, productId)] terurut, dibangun saat dibutuhkan
+        for product_id, doc in (docs or {}).items():
+            self._insert(product_id, doc)
+
+    def __len__(self):
+        return len(self.docs)
+
+    # --- Perubahan (create/update/delete produk) ---
+
+    def _insert(self, product_id, doc):
+        name, _, _, description_tokens = doc
+        self.docs[product_id] = doc
+        name_tokens = set(tokenize(name))
+        self._name_tokens[product_id] = name_tokens
+        for token in name_tokens.union(description_tokens.split()):
+            self.postings.setdefault(token, set()).add(product_id)
+        self._terms = self._prices = None
+
+    def add(self, product):
+        """ Tambah atau ganti satu produk (item DynamoDB) """
+        product_id = product['productId']
+        self.remove(product_id)
+        description_tokens = ' '.join(sorted(set(tokenize(product.get('description')))))
+        self._insert(product_id, [product.get('name') or '', str(_price(product.get('price'))),
+                                  product.get('imageUrl') or '', description_tokens])
+
+    def remove(self, product_id):
+        doc = self.docs.pop(product_id, None)
+        if doc is None:
+            return
+        name_tokens = self._name_tokens.pop(product_id)
+        for token in name_tokens.union(doc[3].split()):
+            ids = self.postings.get(token)
+            if ids is not None:
+                ids.discard(product_id)
+                if not ids:
+                    del self.postings[token]
+        self._terms = self._prices = None
+
+    # --- Pencarian ---
+
+    def _prefix_ids(self, prefix):
+        if self._terms is None:
+            self._terms = sorted(self.postings)
+        ids = set()
+        for i in range(bisect_left(self._terms, prefix), len(self._terms)):
+            term = self._terms[i]
+            if not term.startswith(prefix):
+                break
+            ids |= self.postings[term]
+        return ids
+
+    def _price_ids(self, min_price, max_price):
+        if self._prices is None:
+            self._prices = sorted((Decimal(doc[1]), product_id) for product_id, doc in self.docs.items())
+        prices = self._prices
+        start = 0 if min_price is None else bisect_left(prices, (min_price,))
+        # (harga, '\uffff') berada setelah semua productId dengan harga yang sama
+        end = len(prices) if max_price is None else bisect_right(prices, (max_price, '\uffff'))
+        return {product_id for _, product_id in prices[start:end]}
+
+    def search(self, query='', min_price=None, max_price=None, prefix=True):
+        """
+        productId yang cocok dengan SEMUA kata di query (token terakhir dicocokkan
+        sebagai prefix jika prefix=True, untuk search-as-you-type) dan berada di
+        rentang harga. Mengembalikan set productId.
+        """
+        terms = tokenize(query)
+        candidate_sets = []
+        for i, term in enumerate(terms):
+            if prefix and i == len(terms) - 1:
+                candidate_sets.append(self._prefix_ids(term))
+            else:
+                candidate_sets.append(self.postings.get(term, set()))
+        if min_price is not None or max_price is not None:
+            candidate_sets.append(self._price_ids(min_price, max_price))
+        if not candidate_sets:
+            return set(self.docs)
+        # Mulai dari set terkecil agar irisan murah
+        candidate_sets.sort(key=len)
+        return set(candidate_sets[0]).intersection(*candidate_sets[1:])
+
+    def rank(self, product_ids, query='', sort=None):
+        """
+        Urutkan hasil. sort: 'relevance' (default jika ada query: jumlah kata query
+        yang ada di nama produk), 'name' (default tanpa query), 'price' atau '-price'.
+        """
+        sort = sort or ('relevance' if query else 'name')
+        docs = self.docs
+        if sort == 'price':
+            return sorted(product_ids, key=lambda pid: (Decimal(docs[pid][1]), docs[pid][0].lower(), pid))
+        if sort == '-price':
+            return sorted(product_ids, key=lambda pid: (-Decimal(docs[pid][1]), docs[pid][0].lower(), pid))
+        if sort == 'relevance':
+            terms = tokenize(query)
+
+            def score(pid):
+                name_tokens = self._name_tokens[pid]
+                return sum(1 for term in terms if any(token.startswith(term) for token in name_tokens))
+            return sorted(product_ids, key=lambda pid: (-score(pid), docs[pid][0].lower(), pid))
+        return sorted(product_ids, key=lambda pid: (docs[pid][0].lower(), pid))
+
+    def price_facets(self, product_ids):
+        """ Jumlah hasil per bucket harga: [{'min': .., 'max': .., 'count': ..}] (max None = tak terbatas) """
+        counts = [0] * (len(PRICE_FACET_EDGES) + 1)
+        for product_id in product_ids:
+            counts[bisect_right(PRICE_FACET_EDGES, Decimal(self.docs[product_id][1]))] += 1
+        bounds = [None] + PRICE_FACET_EDGES + [None]
+        return [{'min': bounds[i] or 0, 'max': bounds[i + 1], 'count': count}
+                for i, count in enumerate(counts)]
+
+    def view(self, product_id):
+        """ Ringkasan produk untuk respon API """
+        name, price, image_url, _ = self.docs[product_id]
+        return {'productId': product_id, 'name': name, 'price': ddb.deserialize({'N': price}),
+                'imageUrl': image_url}
+
+    # --- Serialisasi (satu blob) ---
+
+    def to_blob(self):
+        payload = {'format': FORMAT_VERSION, 'docs': self.docs}
+        return zlib.compress(json.dumps(payload, separators=(',', ':'), ensure_ascii=False).encode('utf-8'), 6)
+
+    @classmethod
+    def from_blob(cls, blob, generation=0, catalog_version=0):
+        payload = json.loads(zlib.decompress(blob))
+        if payload.get('format') != FORMAT_VERSION:
+            raise ValueError(f"Format indeks pencarian {payload.get('format')} tidak dikenal")
+        return cls(payload['docs'], generation, catalog_version)
+
+
+# --- Penyimpanan di DynamoDB ---
+
+def _part_key(generation, part):
+    return {'indexId': f'{INDEX_NAME}#{generation}#{part}'}
+
+
+def read_manifest(consistent_read=False):
+    """
+    Item manifest {'generation', 'parts', 'catalogVersion', 'staleMarks'?}, atau None
+    jika indeks belum pernah dibuat
+    """
+    response = ddb.Table(SEARCH_INDEX_TABLE).get_item(Key={'indexId': INDEX_NAME}, ConsistentRead=consistent_read)
+    return response.get('Item')
+
+
+def load_index(manifest):
+    """
+    Baca semua part generation di manifest lalu susun ulang indeksnya.
+    Mengembalikan None jika part tidak lengkap (generation baru saja diganti penulis lain).
+    """
+    generation = int(manifest['generation'])
+    keys = [_part_key(generation, part) for part in range(int(manifest['parts']))]
+    items = ddb.batch_get_items(SEARCH_INDEX_TABLE, keys, consistent_read=True)
+    if len(items) != len(keys):
+        return None
+    items.sort(key=lambda item: int(item['indexId'].rsplit('#', 1)[1]))
+    blob = b''.join(item['data'] for item in items)
+    return SearchIndex.from_blob(blob, generation, int(manifest.get('catalogVersion', 0)))
+
+
+def build_index(catalog_version=0):
+    """ Bangun indeks dari nol dengan Parallel Scan tabel produk (indeks belum ada / tertinggal) """
+    index = SearchIndex(catalog_version=catalog_version)
+    for product in parallel_scan(ddb.Table(PRODUCTS_TABLE),
+                                 projection=['productId', 'name', 'description', 'price', 'imageUrl'],
+                                 FilterExpression=live_products_filter()):
+        index.add(product)
+    return index
+
+
+def save_index(index, manifest):
+    """
+    Tulis index sebagai generation baru dalam SATU transaksi. Gagal dengan
+    TransactionCanceledException jika manifest sudah diganti penulis lain.
+    """
+    blob = index.to_blob()
+    parts = [blob[i:i + PART_BYTES] for i in range(0, len(blob), PART_BYTES)] or [b'']
+    if len(parts) > MAX_PARTS:
+        raise RuntimeError(f'Indeks pencarian terlalu besar ({len(blob)} byte, maksimal {MAX_PARTS} part)')
+
+    old_generation = int(manifest['generation']) if manifest else 0
+    generation = old_generation + 1
+    operations = [{'Put': {'TableName': SEARCH_INDEX_TABLE, 'Item': dict(_part_key(generation, part), data=data)}}
+                  for part, data in enumerate(parts)]
+    manifest_put = {'TableName': SEARCH_INDEX_TABLE,
+                    'Item': {'indexId': INDEX_NAME, 'generation': generation, 'parts': len(parts),
+                             'catalogVersion': index.catalog_version, 'products': len(index),
+                             'updatedAt': int(time.time())}}
+    if manifest:
+        # Tanda stale yang ditambahkan setelah manifest dibaca membatalkan transaksi ini
+        # (lalu dicoba ulang dengan rebuild), jadi tanda itu tidak pernah hilang tertimpa
+        manifest_put['ExpressionAttributeNames'] = {'#g': 'generation', '#s': 'staleMarks'}
+        manifest_put['ExpressionAttributeValues'] = {':g': old_generation}
+        if 'staleMarks' in manifest:
+            manifest_put['ConditionExpression'] = '#g = :g AND #s = :s'
+            manifest_put['ExpressionAttributeValues'][':s'] = manifest['staleMarks']
+        else:
+            manifest_put['ConditionExpression'] = '#g = :g AND attribute_not_exists(#s)'
+    else:
+        manifest_put['ConditionExpression'] = 'attribute_not_exists(indexId)'
+    operations.append({'Put': manifest_put})
+    if manifest:
+        operations.extend({'Delete': {'TableName': SEARCH_INDEX_TABLE, 'Key': _part_key(old_generation, part)}}
+                          for part in range(int(manifest['parts'])))
+    ddb.transact_write_items(operations)
+    index.generation = generation
+    return index
+
+
+def update_index(upserts=(), deletes=(), catalog_version=None):
+    """
+    Terapkan perubahan produk ke indeks yang tersimpan (optimistic locking pada manifest;
+    dicoba ulang jika ada penulis lain). Dipanggil SETELAH produk ditulis dan versi
+    katalog dinaikkan, dengan catalog_version = versi baru tersebut.
+
+    Jika indeks belum ada, atau manifest ditandai stale (penulisan sebelumnya gagal
+    memperbarui indeks, lihat mark_stale), indeks dibangun ulang dari tabel produk.
+    """
+    for attempt in range(WRITE_RETRIES):
+        manifest = read_manifest(consistent_read=True)
+        stale = manifest is not None and 'staleMarks' in manifest
+        index = load_index(manifest) if manifest and not stale else None
+        if index is None:
+            # Hasil scan sudah berisi perubahan produk yang sedang ditulis
+            index = build_index()
+        else:
+            for product in upserts:
+                index.add(product)
+            for product_id in deletes:
+                index.remove(product_id)
+        if catalog_version is not None:
+            index.catalog_version = max(index.catalog_version, catalog_version)
+        try:
+            return save_index(index, manifest)
+        except Exception as e:
+            if ddb.error_code(e) != 'TransactionCanceledException' or attempt == WRITE_RETRIES - 1:
+                raise
+            time.sleep(0.05 * (2 ** attempt))
+
+
+# --- Cache indeks di container yang warm ---
+
+_index = None
+_checked_at = 0.0
+
+
+def get_index():
+    """
+    Indeks untuk melayani pencarian. Container yang warm memakai indeks di memori dan
+    hanya membaca manifest (satu GetItem kecil) paling sering sekali per INDEX_CHECK_SECONDS;
+    blob hanya di-load ulang jika generation berubah.
+    """
+    global _index, _checked_at
+    now = time.monotonic()
+    if _index is not None and now - _checked_at < INDEX_CHECK_SECONDS:
+        return _index
+
+    for _ in range(WRITE_RETRIES):
+        manifest = read_manifest()
+        if manifest is None:
+            # Belum pernah ada indeks (katalog lama): bangun sekali lalu simpan
+            index = update_index(catalog_version=get_catalog_version(ddb.Table(PRODUCTS_TABLE)))
+        elif _index is not None and int(manifest['generation']) == _index.generation:
+            index = _index
+        else:
+            index = load_index(manifest)
+        if index is not None:
+            _index = index
+            _checked_at = now
+            return _index
+    raise RuntimeError('Indeks pencarian sedang diperbarui, coba lagi')
+
+
+def mark_stale():
+    """ Tandai indeks tersimpan tidak lengkap: update_index berikutnya membangunnya ulang """
+    try:
+        ddb.Table(SEARCH_INDEX_TABLE).update_item(
+            Key={'indexId': INDEX_NAME},
+            UpdateExpression='ADD #s :one',
+            ConditionExpression='attribute_exists(indexId)',
+            ExpressionAttributeNames={'#s': 'staleMarks'},
+            ExpressionAttributeValues={':one': 1}
+        )
+    except Exception as e:
+        # Manifest belum ada: penulis berikutnya membangun indeks dari nol
+        if ddb.error_code(e) != 'ConditionalCheckFailedException':
+            raise
+
+
+def sync_after_write(upserts=(), deletes=(), catalog_version=None):
+    """
+    update_index untuk handler penulis produk. Produk sudah tersimpan, jadi kegagalan
+    hanya dicatat dan manifest ditandai stale: penulisan berikutnya membangun ulang indeks.
+    """
+    try:
+        update_index(upserts, deletes, catalog_version)
+    except Exception as e:
+        print(f'Gagal memperbarui indeks pencarian: {e}')
+        try:
+            mark_stale()
+        except Exception as mark_error:
+            print(f'Gagal menandai indeks pencarian stale: {mark_error}')
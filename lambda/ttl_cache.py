@@ -0,0 +1,53 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# Modul bersama (bukan handler Lambda): cache in-memory dengan TTL dan ukuran maksimum.
+# Dibuat di level modul handler, sehingga isinya bertahan selama container
+# Lambda masih "warm" (dipakai ulang antar invocation).
+
+DEFAULT_TTL_SECONDS = float(os.environ.get('CACHE_TTL_SECONDS', '60'))
+DEFAULT_MAX_ENTRIES = int(os.environ.get('CACHE_MAX_ENTRIES', '1024'))
+
+
+class TTLCache:
+    """
+    Cache LRU sederhana: setiap entri kedaluwarsa setelah 'ttl' detik,
+    dan entri yang paling lama tidak dipakai dibuang saat melebihi 'maxsize'.
+    """
+    def __init__(self, maxsize=DEFAULT_MAX_ENTRIES, ttl=DEFAULT_TTL_SECONDS):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
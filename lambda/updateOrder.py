@@ -1,39 +1,18 @@
-import boto3
 import json
 import os
-import uuid
-import datetime
-from decimal import Decimal
-
-# Inisialisasi DynamoDB resource
-dynamodb = boto3.resource('dynamodb')
+from api_response import create_response
+from order_model import ORDER_STATUSES, previous_statuses
+import ddb
+import metrics
 
 # Ambil nama tabel dari environment variable
 ORDERS_TABLE = os.environ.get('ORDERS_TABLE')
-table = dynamodb.Table(ORDERS_TABLE)
-
-# --- Helper Functions ---
-
-class DecimalEncoder(json.JSONEncoder):
-    """ Helper untuk mengubah Decimal dari DynamoDB menjadi JSON """
-    def default(self, obj):
-        if isinstance(obj, Decimal):
-            return int(obj) if obj % 1 == 0 else float(obj)
-        return super(DecimalEncoder, self).default(obj)
-
-def create_response(status_code, body):
-    """ Helper untuk membuat respon API Gateway """
-    return {
-        'statusCode': status_code,
-        'headers': {
-            'Content-Type': 'application/json',
-            'Access-Control-Allow-Origin': '*',
-        },
-        'body': json.dumps(body, cls=DecimalEncoder)
-    }
+table = ddb.Table(ORDERS_TABLE)
 
-# (Tambahkan kode Prasyarat dari atas di sini)
+# Efek samping perubahan status (arsip, statistik) TIDAK dikerjakan di sini,
+# melainkan oleh orderStream.py dari DynamoDB Stream tabel pesanan.
 
+@metrics.instrument('updateOrder')
 def Handler(event, context):
     try:
         order_id = event['pathParameters']['orderId']
@@ -42,27 +21,46 @@ def Handler(event, context):
 
     try:
         # Ambil status baru dari body
-        data = json.loads(event['body'])
+        with metrics.phase('parse'):
+            data = json.loads(event['body'])
         new_status = data['status']
     except Exception:
         return create_response(400, {'message': 'Body JSON tidak valid atau field (status) hilang'})
 
+    if new_status not in ORDER_STATUSES:
+        return create_response(400, {'message': f"Status tidak dikenal: {new_status}. Pilihan: {', '.join(ORDER_STATUSES)}"})
+
+    # Status lama yang boleh berpindah ke status baru, misal PAID hanya dari PENDING
+    allowed = previous_statuses(new_status)
+    values = {f':p{i}': status for i, status in enumerate(allowed)}
+    values[':s'] = new_status
+
     try:
-        # Update hanya field 'status'
+        # Update hanya field 'status', dan HANYA jika transisinya valid (dicek dalam write yang sama)
         response = table.update_item(
             Key={'orderId': order_id},
             UpdateExpression="SET #s = :s",
+            ConditionExpression=f"#s IN ({', '.join(v for v in values if v != ':s')})",
             ExpressionAttributeNames={
                 '#s': 'status'  # 'status' bisa jadi reserved word
             },
-            ExpressionAttributeValues={
-                ':s': new_status
-            },
-            ReturnValues="ALL_NEW"  # Kembalikan item setelah di-update
+            ExpressionAttributeValues=values,
+            ReturnValues="ALL_NEW",  # Kembalikan item setelah di-update
+            ReturnValuesOnConditionCheckFailure="ALL_OLD"
         )
         
         return create_response(200, response.get('Attributes', {}))
         
     except Exception as e:
+        if ddb.error_code(e) == 'ConditionalCheckFailedException':
+            # Item lama ikut dikembalikan DynamoDB (tanpa read tambahan)
+            old_item = e.response.get('Item')
+            if not old_item:
+                return create_response(404, {'message': 'Pesanan tidak ditemukan'})
+            current = ddb.deserialize_item(old_item).get('status')
+            return create_response(409, {
+                'message': f"Transisi status tidak valid: {current} -> {new_status}",
+                'currentStatus': current
+            })
         print(e)
-        return create_response(500, {'message': f"Error internal: {str(e)}"})
\ No newline at end of file
+        return create_response(500, {'message': f"Error internal: {str(e)}"})
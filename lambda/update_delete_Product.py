@@ -1,29 +1,18 @@
-import boto3
 import json
 import os
-import uuid
 from decimal import Decimal
+from catalog_version import CATALOG_VERSION_KEY, bump_catalog_version, reserve_sync_version
+from catalog_sync import sync_attributes, tombstone
+from search_index import sync_after_write
+from inventory import parse_stock, set_stock
+from api_response import create_response
+import ddb
+import metrics
 
-dynamodb = boto3.resource('dynamodb')
 PRODUCTS_TABLE = os.environ.get('PRODUCTS_TABLE')
-table = dynamodb.Table(PRODUCTS_TABLE)
-
-class DecimalEncoder(json.JSONEncoder):
-    def default(self, obj):
-        if isinstance(obj, Decimal):
-            return int(obj) if obj % 1 == 0 else float(obj)
-        return super(DecimalEncoder, self).default(obj)
-
-def create_response(status_code, body):
-    return {
-        'statusCode': status_code,
-        'headers': {
-            'Content-Type': 'application/json',
-            'Access-Control-Allow-Origin': '*',
-        },
-        'body': json.dumps(body, cls=DecimalEncoder)
-    }
+table = ddb.Table(PRODUCTS_TABLE)
 
+@metrics.instrument('update_delete_Product')
 def prod_handler(event, context):
     method = event.get('httpMethod')
 
@@ -33,26 +22,50 @@ def prod_handler(event, context):
     except KeyError:
         return create_response(400, {'message': 'Missing productId di path'})
 
+    # Item versi katalog bukan produk, jangan bisa diubah dari API
+    if product_id == CATALOG_VERSION_KEY:
+        return create_response(404, {'message': 'Produk tidak ditemukan'})
+
     if method == 'PUT':
         try:
-            data = json.loads(event['body'])
+            with metrics.phase('parse'):
+                data = json.loads(event['body'])
+            if not isinstance(data, dict):
+                raise ValueError('Body harus berupa objek JSON')
+            stock, stock_shards = parse_stock(data)
         except json.JSONDecodeError:
             return create_response(400, {'message': 'Body JSON tidak valid'})
+        except ValueError as e:
+            return create_response(400, {'message': str(e)})
 
         try:
+            # Nomor urut sync ikut disimpan; REMOVE menghidupkan lagi produk yang sudah
+            # dihapus (tombstone) jika productId yang sama ditulis ulang
+            sync = sync_attributes(product_id, reserve_sync_version(table))
             response = table.update_item(
                 Key={'productId': product_id},
-                UpdateExpression="SET #nm = :n, description = :d, price = :p",
+                UpdateExpression="SET #nm = :n, description = :d, price = :p, imageUrl = :i, "
+                                 "syncVersion = :sv, updatedAt = :ua, syncBucket = :sb REMOVE deleted, expiresAt",
                 ExpressionAttributeNames={'#nm': 'name'},
                 ExpressionAttributeValues={
                     ':n': data.get('name'),
                     ':d': data.get('description', ''),
                     ':p': Decimal(str(data.get('price'))),
-                    ':i': data.get('imageUrl', '')
+                    ':i': data.get('imageUrl', ''),
+                    ':sv': sync['syncVersion'],
+                    ':ua': sync['updatedAt'],
+                    ':sb': sync['syncBucket']
                 },
                 ReturnValues="ALL_NEW"
             )
-            return create_response(200, response.get('Attributes', {}))
+            # 'stock' (opsional) menimpa total stok; 'stockShards' mengubah jumlah shard
+            if stock is not None:
+                set_stock(product_id, stock, stock_shards)
+            # Naikkan versi katalog agar cache getProduct tidak basi, lalu perbarui indeks pencarian
+            version = bump_catalog_version(table)
+            sync_after_write(upserts=[response['Attributes']], catalog_version=version)
+            attributes = response.get('Attributes', {})
+            return create_response(200, attributes if stock is None else dict(attributes, stock=stock))
 
         except Exception as e:
             print(e)
@@ -60,7 +73,20 @@ def prod_handler(event, context):
 
     if method == 'DELETE':
         try:
-            table.delete_item(Key={'productId': product_id})
+            # Produk diganti tombstone (bukan delete_item) agar klien yang sync dengan
+            # GET /products?since= ikut tahu produk ini dihapus; TTL DynamoDB membersihkannya.
+            # Produk yang tidak ada / sudah dihapus: tidak ada yang berubah
+            try:
+                table.put_item(
+                    Item=tombstone(product_id, reserve_sync_version(table)),
+                    ConditionExpression='attribute_exists(productId) AND attribute_not_exists(deleted)'
+                )
+            except Exception as e:
+                if ddb.error_code(e) != 'ConditionalCheckFailedException':
+                    raise
+                return create_response(200, {'message': 'Produk berhasil dihapus'})
+            version = bump_catalog_version(table)
+            sync_after_write(deletes=[product_id], catalog_version=version)
             return create_response(200, {'message': 'Produk berhasil dihapus'})
         except Exception as e:
             print(e)